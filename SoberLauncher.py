@@ -6,21 +6,81 @@ import subprocess
 import shutil
 import json
 import re
+import time
+
+# `SoberLauncher.py list|launch|stop...` : mode sans interface (cli.py), PyQt6 n'est jamais importé
+if __name__ == "__main__" and len(sys.argv) > 1 and not sys.argv[1].startswith("-"):
+    from cli import main
+    sys.exit(main())
 
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QFileDialog,
-    QLineEdit, QMessageBox, QInputDialog, QLabel, QDialog, QSizePolicy, QListWidget,
-    QAbstractItemView, QCheckBox, QDialogButtonBox, QTabWidget, QMenu
+    QLineEdit, QMessageBox, QInputDialog, QLabel, QDialog, QSizePolicy, QTreeView,
+    QAbstractItemView, QCheckBox, QDialogButtonBox, QTabWidget, QMenu, QProgressDialog,
+    QFormLayout, QSpinBox, QDoubleSpinBox, QComboBox, QPlainTextEdit
+)
+from PyQt6.QtGui import QIcon, QPixmap, QBrush, QPalette, QFontDatabase
+from PyQt6.QtCore import (
+    QThread, pyqtSignal, QTimer, Qt, QObject, QSocketNotifier, QAbstractTableModel, QModelIndex,
+    QSortFilterProxyModel
+)
+
+from profiles import (
+    SOBER_APP_ID, MAIN_PROFILE, ACCOUNT_DATA_SUBPATHS, sober_data_dir, profile_home,
+    natural_sort_key, format_size, format_uptime, select_profiles, place_uri
+)
+from profile_copy import copy_profile_tree, CopyCancelled
+from dedupe import Deduplicator
+from shared_layer import (
+    DEFAULT_SHARED_SUBPATHS, SharedLayerError, check_subpaths, link_profile, unlink_profile, is_linked, shared_root
 )
-from PyQt6.QtGui import QIcon, QPixmap
-from PyQt6.QtCore import QThread, pyqtSignal, QTimer, Qt
+from disk_usage import DiskUsageIndex
+from cache_gc import DEFAULT_EVICTABLE_SUBPATHS, plan_eviction, evict
+from launch_queue import LaunchQueue
+from launch_engine import launch
+from telemetry import TelemetrySampler
+from resource_limits import CpuSpreader, effective_limits, plan_limits, remove_cgroup
+from ksm import ksm_status, ksm_usage
+from supervisor import Supervisor
+from crash_watch import CrashWindowWatcher
+from throttle import FocusTracker, ThrottlePolicy, Throttler, find_owner
+from terminate import Terminator, DEFAULT_STOP_TIMEOUT
+from instance_registry import InstanceRegistry
+from control import ControlServer, RpcError, socket_path
+from fleet import FleetFile, desired_state, reconcile, DEFAULT_FLEET_INTERVAL
+from agent import RemoteAgent, poll_agents, launch_across
+from placement import DEFAULT_INSTANCE_COST
+from instance_logs import LogCapture, log_path
+from profile_index import ProfileIndex
 
 __version__ = "Release V1.4"
 
+# Colonnes de la liste des profils
+PROFILE_COLUMN = 0
+SIZE_COLUMN = 1
+CPU_COLUMN = 2
+MEMORY_COLUMN = 3
+UPTIME_COLUMN = 4
+STATUS_COLUMN = 5
+COLUMN_COUNT = 6
+PROFILE_HEADERS = ["Profile", "Size", "CPU", "Memory", "Uptime", "Status"]
+NUMERIC_COLUMNS = (SIZE_COLUMN, CPU_COLUMN, MEMORY_COLUMN, UPTIME_COLUMN)
+SELECTION_NAMES = 5  # au-delà, l'étiquette de sélection n'affiche que le nombre
+UPTIME_REFRESH_MS = 1000
+
+ALL_PROFILES = "All profiles"  # vue des journaux : toutes les instances mêlées
+MAX_LOG_VIEW_LINES = 20000     # lignes affichées au plus dans l'onglet Logs
+
+# Rôle du modèle de la liste donnant la clé de la ligne : profil (str) ou (agent, profil)
+KEY_ROLE = Qt.ItemDataRole.UserRole.value
+PROFILE_ROW_ROLES = (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole, Qt.ItemDataRole.ForegroundRole)
+REMOTE_ORDER = 1000000  # triées après les profils locaux, agent par agent
+UPDATE_RESTART = 3      # code de sortie d'update.py (EXIT_RESTART) : mise à jour installée, redémarrer
+
 
 class UpdateThread(QThread):
     update_failed = pyqtSignal(str)
-    update_success = pyqtSignal()
+    update_success = pyqtSignal(bool)  # True : fichiers remplacés, le lanceur doit redémarrer
 
     def run(self):
         try:
@@ -28,16 +88,368 @@ class UpdateThread(QThread):
                 ["python3", os.path.join(os.path.dirname(__file__), "update.py")],
                 check=True
             )
-            self.update_success.emit()
+            self.update_success.emit(False)
         except subprocess.CalledProcessError as e:
-            self.update_failed.emit(str(e))
+            if e.returncode == UPDATE_RESTART:
+                self.update_success.emit(True)
+            else:
+                self.update_failed.emit(str(e))
 
     def __init__(self):
         super().__init__()
 
 
-class CreateProfileDialog(QDialog):
+class ProfileCopyThread(QThread):
+    copy_progress = pyqtSignal(object, object)  # octets copiés, total
+    copy_failed = pyqtSignal(str)
+    copy_cancelled = pyqtSignal()
+    copy_success = pyqtSignal(str)
+
+    def __init__(self, src, dst, skip=()):
+        super().__init__()
+        self.src = src
+        self.dst = dst
+        self.skip = skip
+        self._cancel = False
+        self._last_emit = 0.0
+
+    def cancel(self):
+        self._cancel = True
+
+    def _onProgress(self, done, total):
+        now = time.monotonic()
+        if now - self._last_emit >= 0.1 or done >= total:
+            self._last_emit = now
+            self.copy_progress.emit(done, total)
+
+    def run(self):
+        try:
+            copier = copy_profile_tree(
+                self.src, self.dst, self.skip,
+                progress=self._onProgress, is_cancelled=lambda: self._cancel
+            )
+            self.copy_success.emit(
+                f"{copier.reflinked} reflinked, {copier.hardlinked} hardlinked, {copier.copied} copied"
+            )
+        except CopyCancelled:
+            self.copy_cancelled.emit()
+        except Exception as e:
+            self.copy_failed.emit(str(e))
+
+
+class DedupeThread(QThread):
+    dedupe_progress = pyqtSignal(str)
+    dedupe_failed = pyqtSignal(str)
+    dedupe_done = pyqtSignal(object)  # DedupeReport
+
+    def __init__(self, base_dir, dry_run=True):
+        super().__init__()
+        self.base_dir = base_dir
+        self.dry_run = dry_run
+        self._cancel = False
+
+    def cancel(self):
+        self._cancel = True
+
+    def run(self):
+        try:
+            dedupe = Deduplicator(
+                self.base_dir, progress=self.dedupe_progress.emit, is_cancelled=lambda: self._cancel
+            )
+            self.dedupe_done.emit(dedupe.run(dry_run=self.dry_run))
+        except Exception as e:
+            self.dedupe_failed.emit(str(e))
+
+
+class TaskThread(QThread):
+    """Run a blocking function away from the UI thread."""
+    task_done = pyqtSignal(object)
+    task_failed = pyqtSignal(str)
+
+    def __init__(self, func, *args):
+        super().__init__()
+        self.func = func
+        self.args = args
+
+    def run(self):
+        try:
+            self.task_done.emit(self.func(*self.args))
+        except Exception as e:
+            self.task_failed.emit(str(e))
+
+
+class ProcessWatcher(QObject):
+    """
+    Signale la fin d'une instance dès qu'elle arrive, sans polling :
+    un pidfd (Linux >= 5.3) devient lisible à la sortie du processus.
+    Sans pidfd, repli sur un timer actif seulement tant qu'il reste des instances.
+    """
+    process_exited = pyqtSignal(str, object)  # profile_name, Instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.watched = {}   # profile_name -> (pidfd, QSocketNotifier, Instance)
+        self.polled = {}    # profile_name -> Instance (sans pidfd)
+        self.fallback_timer = QTimer(self)
+        self.fallback_timer.setInterval(1000)
+        self.fallback_timer.timeout.connect(self._pollFallback)
+
+    def watch(self, profile, instance):
+        self.unwatch(profile)
+        try:
+            fd = os.pidfd_open(instance.pid)
+        except (AttributeError, OSError):
+            self.polled[profile] = instance
+            self.fallback_timer.start()
+            return
+        notifier = QSocketNotifier(fd, QSocketNotifier.Type.Read, self)
+        notifier.activated.connect(lambda *_, p=profile: self._onExit(p))
+        self.watched[profile] = (fd, notifier, instance)
+
+    def unwatch(self, profile):
+        entry = self.watched.pop(profile, None)
+        if entry:
+            fd, notifier, _ = entry
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+            os.close(fd)
+        self.polled.pop(profile, None)
+        if not self.polled:
+            self.fallback_timer.stop()
+
+    def _onExit(self, profile):
+        entry = self.watched.get(profile)
+        if entry is None:
+            return
+        instance = entry[2]
+        self.unwatch(profile)
+        instance.poll()  # récupère le code de sortie (le processus est déjà terminé)
+        self.process_exited.emit(profile, instance)
+
+    def _pollFallback(self):
+        for profile, instance in list(self.polled.items()):
+            if instance.poll() is not None:
+                self.unwatch(profile)
+                self.process_exited.emit(profile, instance)
+
+
+class ProfileRow:
+    """Ligne de la liste des profils : textes affichés, valeurs brutes pour le tri, infobulles."""
+
+    __slots__ = ("key", "texts", "values", "tooltips", "started_at", "dimmed")
+
+    def __init__(self, key, name, order):
+        self.key = key                        # profil local (str) ou (agent, profil) distant
+        self.texts = [name] + [""] * (COLUMN_COUNT - 1)
+        self.values = [order, -1, -1.0, -1, None, None]  # -1 : pas de valeur ; Uptime et Status triés autrement
+        self.tooltips = [""] * COLUMN_COUNT
+        self.started_at = None                # time.time() du lancement, None si arrêté
+        self.dimmed = False                   # instance bridée : nom grisé
+
+
+class ProfileTableModel(QAbstractTableModel):
+    """
+    Les profils (et les lignes des agents) pour la vue : une liste de ProfileRow
+    et un index clé -> ligne, une mise à jour ne touche que la ligne concernée.
+    Le tri se fait ici (list.sort sur les valeurs brutes, sans un appel à data()
+    par comparaison) et se refait au plus une fois par tour de boucle quand la
+    colonne triée change. La colonne Uptime est calculée à l'affichage,
+    tickUptime() la rafraîchit.
+    """
+
     def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.positions = {}   # clé -> numéro de ligne
+        self.headers = list(PROFILE_HEADERS)
+        self.dimmed_brush = QBrush()
+        self.sort_column = PROFILE_COLUMN
+        self.sort_order = Qt.SortOrder.AscendingOrder
+        self.resort_rows = set()  # lignes changées depuis le dernier tri, None = toutes
+        self.resort_timer = QTimer(self)
+        self.resort_timer.setSingleShot(True)
+        self.resort_timer.timeout.connect(self.resort)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else COLUMN_COUNT
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        row = self.rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == UPTIME_COLUMN:
+                return format_uptime(time.time() - row.started_at) if row.started_at else ""
+            return row.texts[column]
+        if role == KEY_ROLE:
+            return row.key
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return row.tooltips[column] or None
+        if role == Qt.ItemDataRole.TextAlignmentRole and column in NUMERIC_COLUMNS:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        if role == Qt.ItemDataRole.ForegroundRole and column == PROFILE_COLUMN and row.dimmed:
+            return self.dimmed_brush
+        return None
+
+    # ---- tri ----
+
+    def sortKey(self, column):
+        if column == STATUS_COLUMN:
+            return lambda row: (natural_sort_key(row.texts[column]), row.values[PROFILE_COLUMN])
+        if column == UPTIME_COLUMN:
+            # Arrêtées d'abord, puis de la plus récente à la plus ancienne
+            return lambda row: (-row.started_at if row.started_at else float("-inf"), row.values[PROFILE_COLUMN])
+        return lambda row: (row.values[column], row.values[PROFILE_COLUMN])
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sort_column, self.sort_order = column, order
+        self.resort_rows = None
+        self.resort()
+
+    def inOrder(self, changed):
+        """Les lignes changées sont-elles toujours à leur place par rapport à leurs voisines ?"""
+        key = self.sortKey(self.sort_column)
+        reverse = self.sort_order == Qt.SortOrder.DescendingOrder
+        for i in changed:
+            current = key(self.rows[i])
+            for j in (i - 1, i + 1):
+                if 0 <= j < len(self.rows):
+                    neighbour = key(self.rows[j])
+                    if (j < i) != ((neighbour > current) if reverse else (neighbour < current)):
+                        return False
+        return True
+
+    def resort(self):
+        self.resort_timer.stop()
+        changed, self.resort_rows = self.resort_rows, set()
+        if self.sort_column < 0 or (changed is not None and self.inOrder(changed)):
+            return
+        rows = sorted(self.rows, key=self.sortKey(self.sort_column),
+                      reverse=self.sort_order == Qt.SortOrder.DescendingOrder)
+        if all(a is b for a, b in zip(rows, self.rows)):
+            return
+        self.layoutAboutToBeChanged.emit([], QAbstractTableModel.LayoutChangeHint.VerticalSortHint)
+        old = self.persistentIndexList()
+        keys = [self.rows[index.row()].key for index in old]
+        self.rows = rows
+        self._reindex()
+        self.changePersistentIndexList(old, [self.index(self.positions[key], index.column())
+                                             for key, index in zip(keys, old)])
+        self.layoutChanged.emit([], QAbstractTableModel.LayoutChangeHint.VerticalSortHint)
+
+    def scheduleResort(self, first, last, row=None):
+        if first <= self.sort_column <= last:
+            if row is None or self.resort_rows is None:
+                self.resort_rows = None
+            else:
+                self.resort_rows.add(row)
+            self.resort_timer.start(0)
+
+    # ---- lignes ----
+
+    def _reindex(self):
+        self.positions = {row.key: i for i, row in enumerate(self.rows)}
+
+    def row(self, key):
+        i = self.positions.get(key)
+        return None if i is None else self.rows[i]
+
+    def keys(self):
+        return list(self.positions)
+
+    def setRows(self, rows):
+        self.beginResetModel()
+        self.rows = sorted(rows, key=self.sortKey(self.sort_column),
+                           reverse=self.sort_order == Qt.SortOrder.DescendingOrder)
+        self._reindex()
+        self.resort_rows = set()
+        self.endResetModel()
+
+    def appendRows(self, rows):
+        if not rows:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        for i, row in enumerate(rows, first):
+            self.rows.append(row)
+            self.positions[row.key] = i
+        self.endInsertRows()
+        self.resort_rows = None
+        self.resort_timer.start(0)
+
+    def removeKeys(self, keys):
+        indexes = sorted((self.positions[k] for k in keys if k in self.positions), reverse=True)
+        if not indexes:
+            return
+        # Plages contiguës retirées d'un bloc, de la fin vers le début
+        last = first = indexes[0]
+        for i in indexes[1:] + [None]:
+            if i is not None and i == first - 1:
+                first = i
+                continue
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.rows[first:last + 1]
+            self.endRemoveRows()
+            last = first = i
+        self._reindex()
+        self.resort_rows = None
+
+    def renameKey(self, old, new, name):
+        i = self.positions.pop(old, None)
+        if i is None:
+            return
+        row = self.rows[i]
+        row.key = new
+        row.texts[PROFILE_COLUMN] = name
+        self.positions[new] = i
+        self.rowChanged(new, PROFILE_COLUMN, PROFILE_COLUMN)
+
+    # ---- notifications ----
+
+    def rowChanged(self, key, first=0, last=COLUMN_COUNT - 1, roles=()):
+        i = self.positions.get(key)
+        if i is not None:
+            self.dataChanged.emit(self.index(i, first), self.index(i, last), list(roles))
+            self.scheduleResort(first, last, i)
+
+    def columnChanged(self, column, roles=()):
+        """Une colonne entière a changé : un seul signal pour toutes les lignes."""
+        if self.rows:
+            self.dataChanged.emit(self.index(0, column), self.index(len(self.rows) - 1, column), list(roles))
+            self.scheduleResort(column, column)
+
+    def setHeader(self, column, text):
+        if self.headers[column] != text:
+            self.headers[column] = text
+            self.headerDataChanged.emit(Qt.Orientation.Horizontal, column, column)
+
+    def tickUptime(self):
+        """Rafraîchit la colonne Uptime. Renvoie False quand plus aucune ligne ne tourne."""
+        running = [i for i, row in enumerate(self.rows) if row.started_at]
+        if not running:
+            return False
+        # De la première à la dernière ligne en cours ; l'ordre des durées ne change pas : pas de nouveau tri
+        self.dataChanged.emit(self.index(running[0], UPTIME_COLUMN), self.index(running[-1], UPTIME_COLUMN),
+                              [Qt.ItemDataRole.DisplayRole])
+        return True
+
+
+class ProfileFilterProxy(QSortFilterProxyModel):
+    """Recherche dans la liste des profils. Le tri est délégué au modèle (ProfileTableModel.sort)."""
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+
+class CreateProfileDialog(QDialog):
+    def __init__(self, parent=None, shared_default=False):
         super().__init__(parent)
         self.setWindowTitle("Create Profile")
         layout = QVBoxLayout(self)
@@ -53,6 +465,13 @@ class CreateProfileDialog(QDialog):
         )
         layout.addWidget(self.copy_checkbox)
 
+        self.shared_checkbox = QCheckBox(
+            "Use the shared game files (one copy of Roblox for every profile, only account data is per profile)",
+            self
+        )
+        self.shared_checkbox.setChecked(shared_default)
+        layout.addWidget(self.shared_checkbox)
+
         self.buttons = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
             self
@@ -62,7 +481,314 @@ class CreateProfileDialog(QDialog):
         layout.addWidget(self.buttons)
 
     def getData(self):
-        return self.name_input.text().strip(), self.copy_checkbox.isChecked()
+        return self.name_input.text().strip(), self.copy_checkbox.isChecked(), self.shared_checkbox.isChecked()
+
+
+class AgentDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Add Agent")
+        layout = QFormLayout(self)
+
+        self.name_input = QLineEdit(self)
+        self.name_input.setPlaceholderText("Living room PC")
+        layout.addRow("Name:", self.name_input)
+
+        self.address_input = QLineEdit(self)
+        self.address_input.setPlaceholderText("192.168.1.20:7421")
+        layout.addRow("Address:", self.address_input)
+
+        self.token_input = QLineEdit(self)
+        self.token_input.setEchoMode(QLineEdit.EchoMode.Password)
+        self.token_input.setPlaceholderText("Token given to soberlauncher agent")
+        layout.addRow("Token:", self.token_input)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+            self
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def getData(self):
+        return self.name_input.text().strip(), self.address_input.text().strip(), self.token_input.text().strip()
+
+
+class LogSettingsDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Log Settings")
+        layout = QFormLayout(self)
+
+        self.enabled = QCheckBox("Capture the output of launched instances", self)
+        self.enabled.setChecked(settings["enabled"])
+        layout.addRow(self.enabled)
+
+        self.ring_lines = QSpinBox(self)
+        self.ring_lines.setRange(100, 100000)
+        self.ring_lines.setSingleStep(500)
+        self.ring_lines.setValue(settings["ring_lines"])
+        layout.addRow("Lines kept in memory per profile:", self.ring_lines)
+
+        self.to_file = QCheckBox("Also write them to the profile's sober.log", self)
+        self.to_file.setChecked(settings["to_file"])
+        layout.addRow(self.to_file)
+
+        self.max_file_kb = QSpinBox(self)
+        self.max_file_kb.setRange(64, 1024 * 1024)
+        self.max_file_kb.setSuffix(" KB")
+        self.max_file_kb.setValue(settings["max_file_kb"])
+        layout.addRow("Rotate the file past:", self.max_file_kb)
+
+        self.backups = QSpinBox(self)
+        self.backups.setRange(0, 20)
+        self.backups.setValue(settings["backups"])
+        layout.addRow("Old files kept:", self.backups)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+            self
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def getData(self):
+        return {
+            "enabled": self.enabled.isChecked(),
+            "ring_lines": self.ring_lines.value(),
+            "to_file": self.to_file.isChecked(),
+            "max_file_kb": self.max_file_kb.value(),
+            "backups": self.backups.value(),
+        }
+
+
+class LaunchSettingsDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Launch Settings")
+        layout = QFormLayout(self)
+
+        self.max_starting = QSpinBox(self)
+        self.max_starting.setRange(1, 100)
+        self.max_starting.setValue(settings["max_starting"])
+        layout.addRow("Instances starting at once:", self.max_starting)
+
+        self.min_gap = QDoubleSpinBox(self)
+        self.min_gap.setRange(0, 600)
+        self.min_gap.setSuffix(" s")
+        self.min_gap.setValue(settings["min_gap"])
+        layout.addRow("Minimum gap between launches:", self.min_gap)
+
+        self.startup_time = QDoubleSpinBox(self)
+        self.startup_time.setRange(1, 600)
+        self.startup_time.setSuffix(" s")
+        self.startup_time.setValue(settings["startup_time"])
+        layout.addRow("An instance is starting for:", self.startup_time)
+
+        self.max_load = QDoubleSpinBox(self)
+        self.max_load.setRange(0, 1000)
+        self.max_load.setSpecialValueText("Off")
+        self.max_load.setValue(settings["max_load"])
+        layout.addRow("Wait while load average is above:", self.max_load)
+
+        self.min_free_mb = QSpinBox(self)
+        self.min_free_mb.setRange(0, 1024 * 1024)
+        self.min_free_mb.setSuffix(" MB")
+        self.min_free_mb.setSpecialValueText("Off")
+        self.min_free_mb.setValue(settings["min_free_mb"])
+        layout.addRow("Wait while free memory is below:", self.min_free_mb)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+            self
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def getData(self):
+        return {
+            "max_starting": self.max_starting.value(),
+            "min_gap": self.min_gap.value(),
+            "startup_time": self.startup_time.value(),
+            "max_load": self.max_load.value(),
+            "min_free_mb": self.min_free_mb.value(),
+        }
+
+
+class SupervisorSettingsDialog(QDialog):
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Auto-Restart")
+        layout = QFormLayout(self)
+
+        self.enabled = QCheckBox("Restart instances that crash", self)
+        self.enabled.setChecked(settings["enabled"])
+        layout.addRow(self.enabled)
+
+        self.base_delay = QDoubleSpinBox(self)
+        self.base_delay.setRange(0, 3600)
+        self.base_delay.setSuffix(" s")
+        self.base_delay.setValue(settings["base_delay"])
+        layout.addRow("First restart after:", self.base_delay)
+
+        self.max_delay = QDoubleSpinBox(self)
+        self.max_delay.setRange(1, 86400)
+        self.max_delay.setSuffix(" s")
+        self.max_delay.setValue(settings["max_delay"])
+        layout.addRow("Longest wait between restarts:", self.max_delay)
+
+        self.max_restarts = QSpinBox(self)
+        self.max_restarts.setRange(1, 1000)
+        self.max_restarts.setValue(settings["max_restarts"])
+        layout.addRow("Give up after restarts:", self.max_restarts)
+
+        self.window = QDoubleSpinBox(self)
+        self.window.setRange(1, 86400)
+        self.window.setSuffix(" s")
+        self.window.setValue(settings["window"])
+        layout.addRow("...within:", self.window)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+            self
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def getData(self):
+        return {
+            "enabled": self.enabled.isChecked(),
+            "base_delay": self.base_delay.value(),
+            "max_delay": self.max_delay.value(),
+            "max_restarts": self.max_restarts.value(),
+            "window": self.window.value(),
+        }
+
+
+class ThrottleSettingsDialog(QDialog):
+    MODES = [("Cap CPU", "cap"), ("Freeze", "freeze")]
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Background Throttling")
+        layout = QFormLayout(self)
+
+        self.enabled = QCheckBox("Throttle instances running in the background", self)
+        self.enabled.setChecked(settings["enabled"])
+        layout.addRow(self.enabled)
+
+        self.mode = QComboBox(self)
+        for label, value in self.MODES:
+            self.mode.addItem(label, value)
+        self.mode.setCurrentIndex(max(self.mode.findData(settings["mode"]), 0))
+        layout.addRow("Mode:", self.mode)
+
+        self.cpu_quota = QSpinBox(self)
+        self.cpu_quota.setRange(1, 100)
+        self.cpu_quota.setSuffix(" %")
+        self.cpu_quota.setValue(settings["cpu_quota"])
+        layout.addRow("CPU left to a capped instance:", self.cpu_quota)
+
+        self.unfocused_after = QDoubleSpinBox(self)
+        self.unfocused_after.setRange(0, 3600)
+        self.unfocused_after.setSuffix(" s")
+        self.unfocused_after.setValue(settings["unfocused_after"])
+        layout.addRow("Throttle after losing focus for:", self.unfocused_after)
+
+        self.idle_after = QDoubleSpinBox(self)
+        self.idle_after.setRange(0, 86400)
+        self.idle_after.setSuffix(" s")
+        self.idle_after.setSpecialValueText("Off")
+        self.idle_after.setValue(settings["idle_after"])
+        layout.addRow("Throttle all when idle for:", self.idle_after)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+            self
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def getData(self):
+        return {
+            "enabled": self.enabled.isChecked(),
+            "mode": self.mode.currentData(),
+            "cpu_quota": self.cpu_quota.value(),
+            "unfocused_after": self.unfocused_after.value(),
+            "idle_after": self.idle_after.value(),
+        }
+
+
+class ResourceLimitsDialog(QDialog):
+    IONICE_CLASSES = [("Default", 0), ("Realtime", 1), ("Best-effort", 2), ("Idle", 3)]
+
+    def __init__(self, title, limits, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        layout = QFormLayout(self)
+
+        self.cpus = QLineEdit(str(limits.get("cpus", "")), self)
+        self.cpus.setPlaceholderText("All cores (e.g. 0-3,8 or auto)")
+        layout.addRow("CPU cores:", self.cpus)
+
+        self.auto_cores = QSpinBox(self)
+        self.auto_cores.setRange(1, 1024)
+        self.auto_cores.setValue(int(limits.get("auto_cores", 2)))
+        layout.addRow("Cores per instance (auto):", self.auto_cores)
+
+        self.nice = QSpinBox(self)
+        self.nice.setRange(0, 19)
+        self.nice.setValue(int(limits.get("nice", 0)))
+        layout.addRow("Nice level:", self.nice)
+
+        self.ionice_class = QComboBox(self)
+        for label, value in self.IONICE_CLASSES:
+            self.ionice_class.addItem(label, value)
+        self.ionice_class.setCurrentIndex(max(self.ionice_class.findData(int(limits.get("ionice_class", 0))), 0))
+        layout.addRow("IO priority class:", self.ionice_class)
+
+        self.ionice_level = QSpinBox(self)
+        self.ionice_level.setRange(0, 7)
+        self.ionice_level.setValue(int(limits.get("ionice_level", 4)))
+        layout.addRow("IO priority level:", self.ionice_level)
+
+        self.memory_max = QLineEdit(str(limits.get("memory_max", "")), self)
+        self.memory_max.setPlaceholderText("No limit (e.g. 3G)")
+        layout.addRow("Memory limit:", self.memory_max)
+
+        self.cpu_quota = QSpinBox(self)
+        self.cpu_quota.setRange(0, 100000)
+        self.cpu_quota.setSuffix(" %")
+        self.cpu_quota.setSpecialValueText("No limit")
+        self.cpu_quota.setValue(int(limits.get("cpu_quota", 0)))
+        layout.addRow("CPU limit (100% = 1 core):", self.cpu_quota)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel,
+            self
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def getData(self):
+        limits = {
+            "cpus": self.cpus.text().strip(),
+            "auto_cores": self.auto_cores.value(),
+            "nice": self.nice.value(),
+            "ionice_class": self.ionice_class.currentData(),
+            "ionice_level": self.ionice_level.value(),
+            "memory_max": self.memory_max.text().strip(),
+            "cpu_quota": self.cpu_quota.value(),
+        }
+        # Champ texte vide = pas de réglage (le défaut global s'applique) ; 0 reste une valeur
+        # explicite, pour qu'un profil puisse annuler un nice ou un quota par défaut
+        return {k: v for k, v in limits.items() if v != ""}
 
 
 class SoberLauncher(QWidget):
@@ -71,30 +797,154 @@ class SoberLauncher(QWidget):
         # État
         self.base_dir = None
         self.profiles = []
-        self.selected_profiles = []
-        self.processes = {}            # profile_name -> subprocess.Popen
+        self.profile_index = None      # profile_index.ProfileIndex du dossier de base (persisté, suivi par inotify)
+        self.profile_notifier = None
+        self.selection = set()         # clés sélectionnées dans la liste, tenues à jour par plages
+        self.selection_cache = None    # (locaux, distants) triés, recalculés au premier besoin
+        self.processes = {}            # profile_name -> launch_engine.Instance
         self.launched_profiles = set() # profils lancés durant cette session
-        self.settings_json = "SL_Settings.json"
+        self.exit_history = {}         # profile_name -> (code de sortie, durée en secondes)
+        # Chemin absolu fixé au démarrage : une mise à jour ne déplace jamais les réglages
+        self.settings_json = os.path.abspath("SL_Settings.json")
         self.legacy_settings_txt = "SL_Settings.txt"
         self.legacy_last_dir_txt = "last_directory.txt"
 
         # Réglages
         self.display_name = "[Name]"
         self.privateServers = []  # liste de tuples (name, parameter)
+        self.shared_layer = False  # nouveaux profils liés aux fichiers de jeu partagés
+        self.shared_layer_paths = list(DEFAULT_SHARED_SUBPATHS)
+        self.disk_budget_gb = 0.0  # 0 = pas de limite
+        self.gc_paths = list(DEFAULT_EVICTABLE_SUBPATHS)
+        self.last_launched = {}    # profile_name -> timestamp du dernier lancement
+        self.launch_queue = LaunchQueue()
+        self.telemetry_interval_ms = 2000  # 0 = pas de télémétrie
+        self.telemetry_history = 300       # échantillons gardés par instance
+        self.resource_defaults = {}        # limites appliquées à toutes les instances
+        self.resource_profiles = {}        # profile_name -> limites propres au profil
+        self.cpu_spreader = CpuSpreader()
+        self.launch_plans = {}             # profile_name -> resource_limits.LaunchPlan
+        self.supervisor = Supervisor()
+        self.supervised_restarts = set()   # profils relancés par le superviseur (pas par l'utilisateur)
+        self.crash_counts = {}             # profile_name -> fenêtres de crash détectées
+        self.crashed_profiles = set()      # crash vu, la prochaine sortie compte comme un crash
+        self.memory_merge = False          # KSM activé pour les instances lancées
+        self.memory_merge_status = None    # (possible, message), évalué au premier besoin
+        self.throttle_policy = ThrottlePolicy()
+        self.throttler = Throttler()
+        self.focus_tracker = None          # créé au premier besoin (connexion X)
+        self.focus_owner = (None, None)    # (fenêtre active, pid) -> profil, mis en cache
+        self.terminator = Terminator()     # arrêts en cours (SIGTERM envoyé, SIGKILL à l'échéance)
+        self.restart_after_stop = {}       # profile_name -> URI relancée une fois l'instance arrêtée
+        self.control_server = None         # socket de contrôle JSON-RPC (control.py)
+        self.fleet_path = None             # fichier de flotte suivi (fleet.py), None = pas de flotte
+        self.fleet = None
+        self.fleet_interval = DEFAULT_FLEET_INTERVAL
+        self.agents = []                   # agent.RemoteAgent : machines qui lancent des profils pour ce lanceur
+        self.agent_interval = 5.0          # secondes entre deux relevés des agents
+        self.instance_cost = dict(DEFAULT_INSTANCE_COST)  # coût supposé d'une instance, pour le placement
+        self.agent_hosts = {}              # nom de l'agent -> dernier relevé (poll_agents)
+        self.agent_thread = None
+        self.agent_tasks = set()           # requêtes aux agents en cours (TaskThread)
+        self.log_capture = LogCapture()    # sorties des instances (tubes -> anneau par profil)
+        self.log_notifiers = {}            # fd de lecture -> QSocketNotifier
+        self.log_view_seq = 0              # dernière ligne affichée dans l'onglet Logs
 
         # Charger réglages (JSON + migration auto)
         self.loadSettings()
 
+        # Instances en cours gardées sur disque : un lanceur relancé s'y rattache
+        self.instance_registry = InstanceRegistry(self.statePath("SL_Instances.json"))
+
+        # Tailles des profils (indexées en arrière-plan)
+        self.disk_usage = DiskUsageIndex(self.statePath("SL_DiskUsage.json"))
+        self.profile_sizes = {}
+        self.profiles_total_size = 0
+        self.size_thread = None
+        self.size_rescan_pending = False
+        self.gc_thread = None
+
+        # Sauvegarde groupée des réglages (ex: horodatage de 30 lancements d'affilée)
+        self.settings_save_timer = QTimer(self)
+        self.settings_save_timer.setSingleShot(True)
+        self.settings_save_timer.setInterval(1000)
+        self.settings_save_timer.timeout.connect(self.saveSettings)
+
+        # Relances automatiques (réarmé sur la prochaine relance prévue)
+        self.restart_timer = QTimer(self)
+        self.restart_timer.setSingleShot(True)
+        self.restart_timer.timeout.connect(self.restartCrashedInstances)
+
+        # Arrêts : un seul délai de grâce pour toutes les instances arrêtées ensemble
+        self.stop_timer = QTimer(self)
+        self.stop_timer.setSingleShot(True)
+        self.stop_timer.timeout.connect(self.escalateStops)
+
+        # File de lancement (réarmée selon le délai demandé par la file)
+        self.queue_timer = QTimer(self)
+        self.queue_timer.setSingleShot(True)
+        self.queue_timer.timeout.connect(self.pumpLaunchQueue)
+
+        # Liste des profils : modèle (une ProfileRow par ligne), tri et recherche par le proxy
+        self.profileModel = ProfileTableModel(self)
+        self.profileModel.dimmed_brush = self.palette().brush(QPalette.ColorRole.PlaceholderText)
+        self.profileProxy = ProfileFilterProxy(self)
+        self.profileProxy.setSourceModel(self.profileModel)
+        self.profileProxy.setFilterKeyColumn(PROFILE_COLUMN)
+        self.profileProxy.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+        # Colonne Uptime, rafraîchie seulement quand des instances tournent
+        self.uptime_timer = QTimer(self)
+        self.uptime_timer.setInterval(UPTIME_REFRESH_MS)
+        self.uptime_timer.timeout.connect(self.refreshUptime)
+
+        # Télémétrie CPU / mémoire / IO, active seulement quand des instances tournent
+        self.telemetry = TelemetrySampler(self.telemetry_history)
+        self.telemetry_timer = QTimer(self)
+        self.telemetry_timer.timeout.connect(self.sampleTelemetry)
+
+        # Fin des instances notifiée par le noyau (plus de polling toutes les 2 s)
+        self.process_watcher = ProcessWatcher(self)
+        self.process_watcher.process_exited.connect(self.onProcessExited)
+
+        # Flotte déclarative : fichier relu s'il change, écarts corrigés à chaque passage
+        self.fleet_timer = QTimer(self)
+        self.fleet_timer.timeout.connect(self.reconcileFleet)
+
+        # Agents distants : relevé périodique (hôte + statut) hors du thread de l'UI
+        self.agent_timer = QTimer(self)
+        self.agent_timer.timeout.connect(self.pollAgents)
+
+        # Bridage des instances en arrière-plan (focus vérifié toutes les 500 ms)
+        self.throttle_timer = QTimer(self)
+        self.throttle_timer.setInterval(500)
+        self.throttle_timer.timeout.connect(self.checkThrottle)
+
+        self.control_notifier = None
+        self.crash_watcher = None
+        self.crash_notifier = None
+
         # UI
         self.initUI()
 
-        # Charger profils si base_dir connu
-        self.scanForProfiles()
+        # Charger profils si base_dir connu (index persisté : un stat() si rien n'a changé)
+        self.loadProfiles()
 
-        # Timer pour checker les processus
-        self.process_timer = QTimer(self)
-        self.process_timer.timeout.connect(self.checkProcesses)
-        self.process_timer.start(2000)
+        # Instances laissées par un lanceur précédent (fermé ou planté). Les minuteries et
+        # la télémétrie existent déjà : le rattachement, le socket et la flotte suivent des instances
+        self.reattachInstances()
+
+        # Pilotage par scripts : socket Unix servi par la boucle Qt
+        self.startControlServer()
+
+        # Flotte déclarative
+        self.followFleet(self.fleet_path)
+
+        # Agents distants
+        self.updateAgentPolling()
+
+        # Fenêtres de crash surveillées en continu (une connexion X, événements)
+        self.startCrashWatcher()
 
     # ------------- Réglages (JSON + migration) -------------
 
@@ -170,12 +1020,76 @@ class SoberLauncher(QWidget):
             elif isinstance(item, (list, tuple)) and len(item) == 2:
                 normalized.append((item[0], item[1]))
         self.privateServers = normalized
+        self.shared_layer = bool(data.get("SharedLayer", False))
+        try:
+            self.shared_layer_paths = check_subpaths(data.get("SharedLayerPaths") or DEFAULT_SHARED_SUBPATHS)
+        except SharedLayerError:
+            # Chemin absolu, "..", ou données du compte : jamais partagé, on revient aux dossiers par défaut
+            self.shared_layer_paths = list(DEFAULT_SHARED_SUBPATHS)
+        try:
+            self.disk_budget_gb = max(float(data.get("DiskBudgetGB", 0) or 0), 0.0)
+        except (TypeError, ValueError):
+            self.disk_budget_gb = 0.0
+        self.gc_paths = data.get("GCPaths") or list(DEFAULT_EVICTABLE_SUBPATHS)
+        self.last_launched = dict(data.get("LastLaunched") or {})
+        self.launch_queue.configure(data.get("LaunchQueue") or {})
+        self.resource_defaults = dict(data.get("ResourceDefaults") or {})
+        self.resource_profiles = dict(data.get("ResourceProfiles") or {})
+        self.throttle_policy.configure(data.get("Throttle") or {})
+        self.memory_merge = bool(data.get("MemoryMerge", False))
+        self.log_capture.configure(data.get("Logs") or {})
+        self.supervisor.configure(data.get("Supervisor") or {})
+        try:
+            self.terminator.timeout = max(float(data.get("StopTimeout", DEFAULT_STOP_TIMEOUT)), 0.0)
+        except (TypeError, ValueError):
+            pass
+        self.fleet_path = data.get("FleetFile") or None
+        try:
+            self.fleet_interval = max(float(data.get("FleetInterval", DEFAULT_FLEET_INTERVAL)), 1.0)
+        except (TypeError, ValueError):
+            pass
+        self.agents = RemoteAgent.from_settings(data.get("Agents"))
+        try:
+            self.agent_interval = max(float(data.get("AgentInterval", self.agent_interval)), 1.0)
+        except (TypeError, ValueError):
+            pass
+        if isinstance(data.get("InstanceCost"), dict):
+            self.instance_cost.update(data["InstanceCost"])
+        try:
+            self.telemetry_interval_ms = max(int(data.get("TelemetryIntervalMs", self.telemetry_interval_ms)), 0)
+            self.telemetry_history = max(int(data.get("TelemetryHistory", self.telemetry_history)), 1)
+        except (TypeError, ValueError):
+            pass
+
+    def statePath(self, name):
+        # Fichiers d'état rangés à côté de SL_Settings.json
+        return os.path.join(os.path.dirname(os.path.abspath(self.settings_json)), name)
 
     def saveSettings(self):
         data = {
             "last_directory": self.base_dir,
             "Name": self.display_name,
             "PrivateServers": [{"name": n, "parameter": p} for (n, p) in self.privateServers],
+            "SharedLayer": self.shared_layer,
+            "SharedLayerPaths": self.shared_layer_paths,
+            "DiskBudgetGB": self.disk_budget_gb,
+            "GCPaths": self.gc_paths,
+            "LastLaunched": self.last_launched,
+            "LaunchQueue": self.launch_queue.settings,
+            "TelemetryIntervalMs": self.telemetry_interval_ms,
+            "TelemetryHistory": self.telemetry_history,
+            "ResourceDefaults": self.resource_defaults,
+            "ResourceProfiles": self.resource_profiles,
+            "Throttle": self.throttle_policy.settings,
+            "MemoryMerge": self.memory_merge,
+            "Logs": self.log_capture.settings,
+            "Supervisor": self.supervisor.settings,
+            "StopTimeout": self.terminator.timeout,
+            "FleetFile": self.fleet_path,
+            "FleetInterval": self.fleet_interval,
+            "Agents": [agent.to_settings() for agent in self.agents],
+            "AgentInterval": self.agent_interval,
+            "InstanceCost": self.instance_cost,
             "version": __version__
         }
         try:
@@ -191,9 +1105,9 @@ class SoberLauncher(QWidget):
             QMessageBox.warning(self, "Error", "Please select a base directory first.")
             return
 
-        dialog = CreateProfileDialog(self)
+        dialog = CreateProfileDialog(self, self.shared_layer)
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            profile_name, copy_main = dialog.getData()
+            profile_name, copy_main, use_shared = dialog.getData()
             if not profile_name:
                 QMessageBox.warning(self, "Error", "Enter a valid profile name.")
                 return
@@ -204,80 +1118,289 @@ class SoberLauncher(QWidget):
             try:
                 os.makedirs(profile_path, exist_ok=True)
                 os.makedirs(local_path, exist_ok=True)
-                if copy_main:
-                    import getpass
-                    user = getpass.getuser()
-                    src = f"/home/{user}/.var/app/org.vinegarhq.Sober/"
-                    dst_parent = os.path.join(profile_path, ".var/app/")
-                    os.makedirs(dst_parent, exist_ok=True)
-                    subprocess.run(["cp", "-r", src, dst_parent], check=True)
-                    appdata_path = os.path.join(dst_parent, "org.vinegarhq.Sober/data/sober/appData")
-                    if os.path.exists(appdata_path):
-                        subprocess.run(["rm", "-rf", appdata_path], check=True)
-                self.scanForProfiles()
-                QMessageBox.information(self, "Profile Created", f"Profile '{profile_name}' created successfully!")
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Failed to create profile directory: {e}")
+                return
 
-    def launchGame(self):
-        if not self.selected_profiles:
-            QMessageBox.warning(self, "Error", "No profiles selected.")
+            if use_shared != self.shared_layer:
+                self.shared_layer = use_shared
+                self.saveSettings()
+
+            if copy_main:
+                self.copyMainProfile(profile_name, use_shared)
+            elif use_shared:
+                self.linkSharedLayer([profile_name], f"Profile '{profile_name}' created successfully!")
+            else:
+                self.scanForProfiles()
+                QMessageBox.information(self, "Profile Created", f"Profile '{profile_name}' created successfully!")
+
+    def copyMainProfile(self, profile_name, use_shared=False):
+        # Copie en arrière-plan (reflink > hardlink > copie), sans appData
+        src = sober_data_dir(self.base_dir, MAIN_PROFILE)
+        dst = sober_data_dir(self.base_dir, profile_name)
+        dst_existed = os.path.exists(dst)
+        if not os.path.isdir(src):
+            self.scanForProfiles()
+            QMessageBox.warning(self, "Error", f"Main profile folder not found: {src}")
             return
 
-        for profile in self.selected_profiles:
-            if profile in self.processes and self.processes[profile].poll() is None:
-                continue  # déjà lancé
+        progress = QProgressDialog("Copying the main profile...", "Cancel", 0, 1000, self)
+        progress.setWindowTitle("Create Profile")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        progress.setValue(0)
+
+        # Les fichiers partagés ne sont pas copiés, ils seront liés ensuite
+        skip = tuple(ACCOUNT_DATA_SUBPATHS) + (tuple(self.shared_layer_paths) if use_shared else ())
+        thread = ProfileCopyThread(src, dst, skip)
+        started = time.monotonic()
+
+        def onProgress(done, total):
+            elapsed = max(time.monotonic() - started, 0.001)
+            progress.setValue(int(done * 1000 / total) if total else 1000)
+            progress.setLabelText(
+                f"Copying the main profile...\n{format_size(done)} / {format_size(total)}"
+                f" ({format_size(done / elapsed)}/s)"
+            )
+
+        def cleanup():
+            progress.close()
+            self.scanForProfiles()
 
-            if profile == "Main Profile":
-                proc = subprocess.Popen("flatpak run org.vinegarhq.Sober", shell=True)
+        def onSuccess(summary):
+            cleanup()
+            message = f"Profile '{profile_name}' created successfully!\n({summary})"
+            if use_shared:
+                self.linkSharedLayer([profile_name], message)
             else:
-                profile_path = os.path.join(self.base_dir, profile)
-                command = f'env HOME="{profile_path}" flatpak run org.vinegarhq.Sober'
-                proc = subprocess.Popen(command, shell=True)
-            self.processes[profile] = proc
-            self.launched_profiles.add(profile)
-        self.updateMissingInstancesLabel()
+                QMessageBox.information(self, "Profile Created", message)
+
+        def onCancelled():
+            if not dst_existed:
+                shutil.rmtree(dst, ignore_errors=True)
+            cleanup()
+            QMessageBox.information(self, "Create Profile", f"Copy cancelled, profile '{profile_name}' has no game files.")
+
+        def onFailed(error):
+            cleanup()
+            QMessageBox.warning(self, "Error", f"Failed to copy the main profile: {error}")
+
+        thread.copy_progress.connect(onProgress)
+        thread.copy_success.connect(onSuccess)
+        thread.copy_cancelled.connect(onCancelled)
+        thread.copy_failed.connect(onFailed)
+        progress.canceled.connect(thread.cancel)
+        self.copy_thread = thread
+        thread.start()
+
+    def deduplicateProfiles(self, dry_run=True):
+        if not self.base_dir:
+            QMessageBox.warning(self, "Error", "Please select a base directory first.")
+            return
 
-    def checkProcesses(self):
-        closed = [p for p, proc in self.processes.items() if proc.poll() is not None]
-        for p in closed:
-            del self.processes[p]
-        self.updateMissingInstancesLabel()
+        title = "Deduplicate Profiles"
+        progress = QProgressDialog("Looking for duplicate game files..." if dry_run else "Deduplicating...",
+                                   "Cancel", 0, 0, self)
+        progress.setWindowTitle(title)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
 
-    def runWithConsole(self):
-        if not self.selected_profiles:
-            QMessageBox.warning(self, "Error", "No profiles selected.")
-            return
+        thread = DedupeThread(self.base_dir, dry_run)
 
-        terminal_command = None
-        if shutil.which("konsole"):
-            terminal_command = "konsole -e"
-        elif shutil.which("x-terminal-emulator"):
-            terminal_command = "x-terminal-emulator -e"
-        elif shutil.which("gnome-terminal"):
-            terminal_command = "gnome-terminal --"
-        else:
-            QMessageBox.critical(self, "Error", "No compatible terminal emulator found.")
+        def onDone(report):
+            cancelled = progress.wasCanceled()
+            progress.close()
+            if cancelled:
+                return
+            if not dry_run:
+                QMessageBox.information(self, title, report.summary())
+            elif not report.actions:
+                QMessageBox.information(self, title, report.summary() + "\n\nNothing to deduplicate.")
+            elif QMessageBox.question(
+                self, title, report.summary() + "\n\nReplace the duplicates now? Account data is never touched.",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            ) == QMessageBox.StandardButton.Yes:
+                self.deduplicateProfiles(dry_run=False)
+
+        def onFailed(error):
+            progress.close()
+            QMessageBox.warning(self, "Error", f"Deduplication failed: {error}")
+
+        thread.dedupe_progress.connect(progress.setLabelText)
+        thread.dedupe_done.connect(onDone)
+        thread.dedupe_failed.connect(onFailed)
+        progress.canceled.connect(thread.cancel)
+        self.dedupe_thread = thread
+        thread.start()
+
+    # ------------- Fichiers de jeu partagés -------------
+
+    def linkSharedLayer(self, profiles, done_message=None, unlink=False):
+        profiles = [p for p in profiles if p != MAIN_PROFILE]
+        if not self.base_dir or not profiles:
+            QMessageBox.warning(self, "Error", "Select one or more profiles (the main profile can't be shared).")
+            return
+        running = [p for p in profiles if p in self.processes and self.processes[p].poll() is None]
+        if running:
+            QMessageBox.warning(self, "Error", f"Close these profiles first: {', '.join(running)}")
             return
 
-        for profile in self.selected_profiles:
-            if profile in self.processes and self.processes[profile].poll() is None:
-                continue
+        base_dir, paths = self.base_dir, list(self.shared_layer_paths)
+        action = unlink_profile if unlink else link_profile
 
-            if profile == "Main Profile":
-                proc = subprocess.Popen(f"{terminal_command} flatpak run org.vinegarhq.Sober", shell=True)
-            else:
-                profile_path = os.path.join(self.base_dir, profile)
-                command = f'{terminal_command} env HOME="{profile_path}" flatpak run org.vinegarhq.Sober'
-                proc = subprocess.Popen(command, shell=True)
-            self.processes[profile] = proc
-            self.launched_profiles.add(profile)
+        def work():
+            for profile in profiles:
+                action(base_dir, profile, paths)
+            return len(profiles)
+
+        thread = TaskThread(work)
+
+        def onDone(count):
+            self.scanForProfiles()
+            verb = "unlinked from" if unlink else "linked to"
+            QMessageBox.information(self, "Shared Game Files",
+                                    done_message or f"{count} profile(s) {verb} the shared game files.")
+
+        def onFailed(error):
+            self.scanForProfiles()
+            QMessageBox.warning(self, "Error", f"Shared game files: {error}")
+
+        thread.task_done.connect(onDone)
+        thread.task_failed.connect(onFailed)
+        self.shared_thread = thread
+        thread.start()
+
+    def showSharedLayerMenu(self):
+        menu = QMenu(self)
+        link_action = menu.addAction("Link selected profiles")
+        unlink_action = menu.addAction("Unlink selected profiles (private copy)")
+        link_all_action = menu.addAction("Link all profiles")
+        menu.addSeparator()
+        default_action = menu.addAction("Use for new profiles")
+        default_action.setCheckable(True)
+        default_action.setChecked(self.shared_layer)
+
+        action = menu.exec(self.sharedLayerButton.mapToGlobal(self.sharedLayerButton.rect().bottomLeft()))
+        if action == link_action:
+            self.linkSharedLayer(self.selected_profiles)
+        elif action == unlink_action:
+            linked = [p for p in self.selected_profiles
+                      if p != MAIN_PROFILE and is_linked(self.base_dir, p, self.shared_layer_paths)]
+            self.linkSharedLayer(linked, unlink=True)
+        elif action == link_all_action:
+            self.linkSharedLayer(self.profiles)
+        elif action == default_action:
+            self.shared_layer = default_action.isChecked()
+            self.saveSettings()
+
+    def launchGame(self):
+        if not self.selected_profiles and not self.selected_remote:
+            QMessageBox.warning(self, "Error", "No profiles selected.")
+            return
+        if self.selected_remote:
+            self.launchRemote(self.selected_remote)
+        if self.selected_profiles:
+            self.queueLaunches(self.selected_profiles)
+
+    def onProcessExited(self, profile, instance):
+        if self.processes.get(profile) is instance:
+            del self.processes[profile]
+            self.instance_registry.remove(profile)
+        self.exit_history[profile] = (instance.returncode, instance.runtime())
+        if self.control_server is not None:
+            self.control_server.publish("exited", profile=profile, code=instance.returncode,
+                                        runtime=instance.runtime())
+        if profile in self.launched_profiles:
+            self.supervisor.on_exit(profile, instance.returncode, instance.runtime(), instance.uri,
+                                    crashed=profile in self.crashed_profiles)
+            self.scheduleRestarts()
+        self.crashed_profiles.discard(profile)
+        self.terminator.forget(profile)
+        self.scheduleStopEscalation()
+        self.launch_queue.mark_exited(profile)
+        self.telemetry.forget(profile)
+        self.throttler.restore(profile)
+        self.throttle_policy.forget(profile)
+        self.releaseLimits(profile)
+        if not self.processes:
+            self.telemetry_timer.stop()
+            self.throttle_timer.stop()
+        self.updateProfileStatus(profile)
+        self.applyTelemetry(profile, None)
         self.updateMissingInstancesLabel()
+        if profile in self.restart_after_stop:
+            self.queueLaunches([profile], self.restart_after_stop.pop(profile))
+        else:
+            self.pumpLaunchQueue()
 
-    def runSpecificGame(self):
+    def updateProfileStatus(self, profile):
+        row = self.profileModel.row(profile)
+        if row is None:
+            return
+        status = self.profileStatusText(profile)
+        if self.control_server is not None and row.texts[STATUS_COLUMN] != status:
+            self.control_server.publish("status", profile=profile, status=status)
+        self.fillProfileRow(row, status)
+        self.profileModel.rowChanged(profile, roles=PROFILE_ROW_ROLES)
+        if row.started_at and not self.uptime_timer.isActive():
+            self.uptime_timer.start()
+
+    def fillProfileRow(self, row, status=None):
+        # Statut, infobulles et durée de la ligne d'un profil local (sans notifier la vue)
+        profile = row.key
+        tooltip = ""
+        if profile in self.exit_history:
+            code, runtime = self.exit_history[profile]
+            tooltip = f"Last exit: code {code} after {format_uptime(runtime)}"
+        if self.crash_counts.get(profile):
+            tooltip = "\n".join(filter(None, [tooltip, f"Crash windows closed: {self.crash_counts[profile]}"]))
+        supervision = self.supervisor.status(profile)
+        if supervision:
+            tooltip = "\n".join(filter(None, [tooltip, supervision]))
+        plan = self.launch_plans.get(profile)
+        if plan is not None and plan.methods:
+            tooltip = "\n".join(filter(None, [tooltip, "Limits: " + ", ".join(plan.methods)]))
+        row.dimmed = self.throttler.is_throttled(profile)
+        if row.dimmed:
+            tooltip = "\n".join(filter(None, [tooltip, "Throttled: " + self.throttler.method(profile)]))
+        row.tooltips[PROFILE_COLUMN] = tooltip
+        row.texts[STATUS_COLUMN] = self.profileStatusText(profile) if status is None else status
+        row.tooltips[STATUS_COLUMN] = tooltip
+        instance = self.processes.get(profile)
+        row.started_at = instance.started_at if instance is not None else None
+
+    def profileStatusText(self, profile):
+        if self.terminator.is_stopping(profile):
+            status = "Restarting" if profile in self.restart_after_stop else "Stopping"
+        elif profile in self.processes:
+            status = "Throttled" if self.throttler.is_throttled(profile) else "Running"
+        elif self.supervisor.is_pending(profile):
+            status = "Restart pending"
+        elif profile in self.exit_history:
+            status = f"Exited ({self.exit_history[profile][0]})"
+        else:
+            status = ""
+        record = self.supervisor.records.get(profile)
+        if record and record["given_up"] and profile not in self.processes:
+            status = f"Crash loop ({self.exit_history.get(profile, (None,))[0]})"
+        if record and record["restarts"]:
+            status += f", {record['restarts']} restarts"
+        return status
+
+    def runWithLogs(self):
         if not self.selected_profiles:
             QMessageBox.warning(self, "Error", "No profiles selected.")
             return
+        self.queueLaunches(self.selected_profiles)
+        self.showLogs(self.selected_profiles[0] if len(self.selected_profiles) == 1 else ALL_PROFILES)
+
+    def runSpecificGame(self):
+        if not self.selected_profiles and not self.selected_remote:
+            QMessageBox.warning(self, "Error", "No profiles selected.")
+            return
 
         url, ok = QInputDialog.getText(self, "Game Link", "Enter the game link:")
         if ok and url.strip():
@@ -288,43 +1411,258 @@ class SoberLauncher(QWidget):
 
             place_id = match.group(1)
             roblox_command = f'roblox://experience?placeId={place_id}'
+            if self.selected_remote:
+                self.launchRemote(self.selected_remote, roblox_command)
+            if self.selected_profiles:
+                self.queueLaunches(self.selected_profiles, roblox_command)
+
+    def loadProfiles(self):
+        # Liste reconstruite entièrement : au démarrage et au changement de dossier de base
+        if self.profile_notifier is not None:
+            self.profile_notifier.setEnabled(False)
+            self.profile_notifier.deleteLater()
+            self.profile_notifier = None
+        if self.profile_index is not None:
+            self.profile_index.close()
+        self.profile_index = None
+        if self.base_dir:
+            self.profile_index = ProfileIndex(self.statePath("SL_Profiles.json"), self.base_dir)
+            self.profile_index.revalidate()
+            if self.profile_index.watch():
+                self.profile_notifier = QSocketNotifier(self.profile_index.fileno(), QSocketNotifier.Type.Read, self)
+                self.profile_notifier.activated.connect(self.onProfileEvents)
+
+        profiles = self.profile_index.profiles() if self.profile_index else [MAIN_PROFILE]
+        self.profiles = profiles
+
+        # Lignes remplies avant d'être données à la vue : une seule réinitialisation du modèle
+        rows = []
+        for i, profile in enumerate(profiles):
+            row = ProfileRow(profile, profile, i)  # ordre naturel, Main Profile en tête
+            self.fillProfileRow(row)
+            rows.append(row)
+        self.profileModel.setRows(rows)
+        if any(row.started_at for row in rows) and not self.uptime_timer.isActive():
+            self.uptime_timer.start()
+        self.applyProfileSizes()
+        self.updateMissingInstancesLabel(profiles)
+        self.applyAgentStatus(self.agent_hosts)
+        self.refreshLogProfiles()
+        self.refreshProfileSizes()
+
+    def scanForProfiles(self, force=False):
+        # Rafraîchissement : simple revalidation de l'index, seuls les changements touchent la liste.
+        # force (bouton) revérifie aussi le .local de chaque profil connu : un .local supprimé le retire
+        if self.profile_index is None or self.profile_index.base_dir != os.path.abspath(self.base_dir or ""):
+            self.loadProfiles()
+            return
+        self.applyProfileChanges(*self.profile_index.revalidate(force=force))
+        self.refreshProfileSizes()
 
-            for profile in self.selected_profiles:
-                if profile in self.processes and self.processes[profile].poll() is None:
-                    continue
-
-                if profile == "Main Profile":
-                    proc = subprocess.Popen(f'flatpak run org.vinegarhq.Sober "{roblox_command}"', shell=True)
-                else:
-                    profile_path = os.path.join(self.base_dir, profile)
-                    command = f'env HOME="{profile_path}" flatpak run org.vinegarhq.Sober "{roblox_command}"'
-                    proc = subprocess.Popen(command, shell=True)
-                self.processes[profile] = proc
-                self.launched_profiles.add(profile)
-            self.updateMissingInstancesLabel()
+    def onProfileEvents(self, *args):
+        added, removed, renamed = self.profile_index.process_events()
+        if added or removed or renamed:
+            self.applyProfileChanges(added, removed, renamed)
+            self.refreshProfileSizes()
 
-    def scanForProfiles(self):
-        self.profileList.clear()
-        profiles = []
+    def applyProfileChanges(self, added, removed, renamed):
+        if not (added or removed or renamed):
+            return
+        model = self.profileModel
+        for old, new in renamed:
+            model.renameKey(old, new, new)
+            if old in self.selection:
+                self.selection.discard(old)
+                self.selection.add(new)
+        model.removeKeys(removed)
+        self.profiles = self.profile_index.profiles()
+        order = {p: i for i, p in enumerate(self.profiles)}
+        rows = []
+        for profile in added:
+            row = ProfileRow(profile, profile, order.get(profile, len(order)))
+            self.fillProfileRow(row)
+            rows.append(row)
+        model.appendRows(rows)
+
+        # Ordre naturel recalculé pour les profils locaux, la vue retrie en une fois
+        for row in model.rows:
+            if isinstance(row.key, str):
+                row.values[PROFILE_COLUMN] = order.get(row.key, len(order))
+        model.columnChanged(PROFILE_COLUMN, [Qt.ItemDataRole.DisplayRole])
+        for _, new in renamed:
+            self.updateProfileStatus(new)
+        self.applyProfileSizes()
+        self.updateMissingInstancesLabel()
+        self.refreshLogProfiles()
+        self.updateSelectedProfiles()
 
-        if self.base_dir and os.path.exists(self.base_dir):
-            with os.scandir(self.base_dir) as entries:
-                for entry in entries:
-                    if entry.is_dir():
-                        local_path = os.path.join(entry.path, ".local")
-                        if os.path.exists(local_path) and os.path.isdir(local_path):
-                            profiles.append(entry.name)
+    def refreshUptime(self):
+        if not self.profileModel.tickUptime():
+            self.uptime_timer.stop()
 
-        def natural_sort_key(s):
-            return [int(text) if text.isdigit() else text.lower() for text in re.split(r'(\d+)', s)]
+    # ------------- Télémétrie -------------
 
-        profiles.sort(key=natural_sort_key)
-        if "Main Profile" in profiles:
-            profiles.remove("Main Profile")
-        profiles.insert(0, "Main Profile")
+    def sampleTelemetry(self):
+        roots = {p: inst.pid for p, inst in self.processes.items()}
+        if not roots:
+            self.telemetry_timer.stop()
+            return
+        for profile, sample in self.telemetry.sample(roots).items():
+            self.applyTelemetry(profile, sample)
 
-        self.profileList.addItems(profiles)
-        self.updateMissingInstancesLabel(profiles)
+    def applyTelemetry(self, profile, sample):
+        row = self.profileModel.row(profile)
+        if row is None:
+            return
+        if sample is None:
+            for column in (CPU_COLUMN, MEMORY_COLUMN):
+                row.texts[column] = ""
+                row.values[column] = -1
+                row.tooltips[column] = ""
+        else:
+            peak = self.telemetry.peaks.get(profile, {})
+            row.texts[CPU_COLUMN] = f"{sample['cpu']:.0f}% (peak {peak.get('cpu', 0):.0f}%)"
+            row.values[CPU_COLUMN] = float(sample["cpu"])
+            row.texts[MEMORY_COLUMN] = f"{format_size(sample['rss'])} (peak {format_size(peak.get('rss', 0))})"
+            row.values[MEMORY_COLUMN] = sample["rss"]
+            io = (f"{sample['procs']} processes\n"
+                  f"Disk read: {format_size(sample['read_bps'])}/s\n"
+                  f"Disk write: {format_size(sample['write_bps'])}/s")
+            row.tooltips[CPU_COLUMN] = io
+            memory = io
+            if self.memory_merge:
+                memory += "\n" + self.memoryMergeText(profile)
+            row.tooltips[MEMORY_COLUMN] = memory
+        self.profileModel.rowChanged(profile, CPU_COLUMN, MEMORY_COLUMN, PROFILE_ROW_ROLES)
+
+    def memoryMergeText(self, profile):
+        possible, message = self.memoryMergeStatus()
+        if not possible:
+            return f"KSM: unavailable ({message})"
+        plan = self.launch_plans.get(profile)
+        if plan is None or "KSM" not in plan.methods:
+            return "KSM: off for this instance (launched before it was enabled)"
+        usage = ksm_usage(self.telemetry.pids.get(profile, ()))
+        if usage is None:
+            return "KSM: no statistics (/proc/<pid>/ksm_stat needs Linux 6.1+)"
+        text = f"KSM: {format_size(usage['merging'])} merged, {format_size(max(usage['profit'], 0))} saved"
+        if not usage["merge_any"]:
+            text += "\nKSM flag lost at exec (needs Linux 6.10+)"
+        if message != "KSM running":
+            text += f"\n{message}"
+        return text
+
+    # ------------- Taille des profils -------------
+
+    def profileSizeRoot(self, profile):
+        # Pour le profil principal, seul le dossier de Sober compte (pas tout le HOME)
+        if profile == MAIN_PROFILE:
+            return sober_data_dir(self.base_dir, profile)
+        return profile_home(self.base_dir, profile)
+
+    def refreshProfileSizes(self, force=False):
+        if not self.base_dir:
+            return
+        if self.size_thread is not None and self.size_thread.isRunning():
+            self.size_rescan_pending = True
+            return
+
+        index = self.disk_usage
+        roots = {p: self.profileSizeRoot(p) for p in self.profiles}
+        shared = shared_root(self.base_dir)
+
+        def work():
+            sizes = {p: index.scan(root, force) for p, root in roots.items()}
+            index.scan(shared, force)
+            total = index.unique_total(list(roots.values()) + [shared])
+            index.save()
+            return sizes, total
+
+        thread = TaskThread(work)
+        thread.task_done.connect(self.onProfileSizes)
+        thread.finished.connect(self.onProfileSizesFinished)
+        self.size_thread = thread
+        thread.start()
+
+    def onProfileSizes(self, result):
+        self.profile_sizes, total = result
+        self.profiles_total_size = total
+        header = f"Size (total {format_size(total)})"
+        if self.disk_budget_gb:
+            header = f"Size (total {format_size(total)} / {self.disk_budget_gb:g} GB)"
+        self.profileModel.setHeader(SIZE_COLUMN, header)
+        self.applyProfileSizes()
+        self.collectCaches(total)
+
+    def onProfileSizesFinished(self):
+        if self.size_rescan_pending:
+            self.size_rescan_pending = False
+            self.refreshProfileSizes()
+
+    def applyProfileSizes(self):
+        for row in self.profileModel.rows:
+            size = self.profile_sizes.get(row.key) if isinstance(row.key, str) else None
+            if size is not None:
+                row.texts[SIZE_COLUMN] = format_size(size)
+                row.values[SIZE_COLUMN] = size
+        self.profileModel.columnChanged(SIZE_COLUMN, [Qt.ItemDataRole.DisplayRole])
+
+    # ------------- Budget disque -------------
+
+    def markLaunched(self, profile):
+        self.launched_profiles.add(profile)
+        self.last_launched[profile] = time.time()
+        self.settings_save_timer.start()
+
+    def isProfileRunning(self, profile):
+        return profile in self.processes and self.processes[profile].poll() is None
+
+    def collectCaches(self, used_bytes, force=False):
+        # Vide les caches des profils lancés le moins récemment tant que le budget est dépassé
+        if not self.disk_budget_gb or (self.gc_thread is not None and self.gc_thread.isRunning()):
+            return
+        budget = int(self.disk_budget_gb * 1024 ** 3)
+        plan = plan_eviction(
+            self.disk_usage, self.base_dir, self.profiles, self.last_launched,
+            used_bytes, budget, self.isProfileRunning, self.gc_paths
+        )
+        if not plan:
+            if force:
+                QMessageBox.information(self, "Disk Budget", "The profiles fit in the disk budget, nothing to clean.")
+            return
+
+        # Relu depuis le thread de nettoyage (et /proc) : un profil lancé entre-temps est épargné
+        thread = TaskThread(evict, plan, lambda p: p in self.processes, self.base_dir)
+
+        def onDone(freed):
+            self.refreshProfileSizes()
+            if force:
+                QMessageBox.information(self, "Disk Budget", f"Freed {format_size(freed)} of caches.")
+
+        thread.task_done.connect(onDone)
+        thread.task_failed.connect(lambda error: QMessageBox.warning(self, "Error", f"Cache cleanup failed: {error}"))
+        self.gc_thread = thread
+        thread.start()
+
+    def showDiskBudgetMenu(self):
+        menu = QMenu(self)
+        budget_action = menu.addAction("Set disk budget...")
+        clean_action = menu.addAction("Clean caches now")
+        action = menu.exec(self.diskBudgetButton.mapToGlobal(self.diskBudgetButton.rect().bottomLeft()))
+        if action == budget_action:
+            value, ok = QInputDialog.getDouble(
+                self, "Disk Budget", "Maximum size of all profiles in GB (0 = no limit):",
+                self.disk_budget_gb, 0, 100000, 1
+            )
+            if ok:
+                self.disk_budget_gb = value
+                self.saveSettings()
+                self.refreshProfileSizes()
+        elif action == clean_action:
+            if not self.disk_budget_gb:
+                QMessageBox.information(self, "Disk Budget", "Set a disk budget first.")
+                return
+            self.collectCaches(self.profiles_total_size, force=True)
 
     def updateMissingInstancesLabel(self, profiles=None):
         running = list(self.processes.keys())
@@ -350,17 +1688,360 @@ class SoberLauncher(QWidget):
         if not missing:
             QMessageBox.information(self, "Info", "No missing instances to run.")
             return
-        for profile in missing:
-            if profile == "Main Profile":
-                proc = subprocess.Popen("flatpak run org.vinegarhq.Sober", shell=True)
-            else:
-                profile_path = os.path.join(self.base_dir, profile)
-                command = f'env HOME="{profile_path}" flatpak run org.vinegarhq.Sober'
-                proc = subprocess.Popen(command, shell=True)
-            self.processes[profile] = proc
+        self.queueLaunches(missing)
+
+    # ------------- File de lancement -------------
+
+    # ------------- Relance automatique -------------
+
+    def scheduleRestarts(self):
+        delay = self.supervisor.next_delay()
+        if delay is None:
+            self.restart_timer.stop()
+        else:
+            self.restart_timer.start(max(int(delay * 1000), 50))
+
+    def restartCrashedInstances(self):
+        for profile, uri in self.supervisor.due():
+            # Passer par la file : les relances respectent les mêmes limites que les lancements
+            if profile in self.launched_profiles and not self.isProfileRunning(profile):
+                self.supervised_restarts.add(profile)
+                self.launch_queue.enqueue(profile, uri)
+            self.updateProfileStatus(profile)
+        self.scheduleRestarts()
+        self.pumpLaunchQueue()
+
+    def editSupervisorSettings(self):
+        dialog = SupervisorSettingsDialog(self.supervisor.settings, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.supervisor.configure(dialog.getData())
+            if not self.supervisor.settings["enabled"]:
+                self.supervisor.cancel()
+                self.scheduleRestarts()
+                for profile in list(self.supervisor.records):
+                    self.updateProfileStatus(profile)
+            self.saveSettings()
+            self.updateSupervisorButton()
+
+    def updateSupervisorButton(self):
+        state = "On" if self.supervisor.settings["enabled"] else "Off"
+        self.supervisorButton.setText(f"Auto-Restart: {state}")
+
+    def queueLaunches(self, profiles, uri=None):
+        for profile in profiles:
+            if self.isProfileRunning(profile):
+                continue  # déjà lancé
+            self.launch_queue.enqueue(profile, uri)
+        self.pumpLaunchQueue()
+
+    def pumpLaunchQueue(self):
+        while True:
+            item, delay = self.launch_queue.next_ready()
+            if item is None:
+                break
+            profile, uri = item
+            if not self.isProfileRunning(profile):
+                self.spawnProfile(profile, uri)
+        if delay is not None:
+            self.queue_timer.start(max(int(delay * 1000), 50))
+        else:
+            self.queue_timer.stop()
+        self.updateLaunchQueueLabel()
+        self.updateMissingInstancesLabel()
+
+    def spawnProfile(self, profile, uri=None, prefix=(), **launch_kwargs):
+        if profile in self.supervised_restarts:
+            self.supervised_restarts.discard(profile)
+        else:
+            # Lancement demandé par l'utilisateur : la boucle de crash repart de zéro
+            self.supervisor.reset(profile)
+        try:
+            limits = effective_limits(self.resource_defaults, self.resource_profiles.get(profile))
+            # Un cgroup propre à l'instance permet de la brider sans toucher au lanceur
+            plan = plan_limits(profile, limits, self.cpu_spreader, self.throttle_policy.settings["enabled"])
+            if self.memory_merge and self.memoryMergeStatus()[0]:
+                plan.merge_memory()
+            capture = self.log_capture.settings["enabled"] and "stdout" not in launch_kwargs
+            if capture:
+                self.unwatchLogs(profile)
+                stdout, stderr = self.log_capture.open(profile, log_path(self.base_dir, profile))
+                # SIGPIPE reste ignoré (hérité de Python) : une instance survit à la fermeture du lanceur
+                launch_kwargs.update(stdout=stdout, stderr=stderr, restore_signals=False)
+            try:
+                instance = launch(self.base_dir, profile, uri, plan.prefix + list(prefix), **launch_kwargs)
+            finally:
+                if capture:
+                    self.log_capture.started(profile)
+            if capture:
+                self.watchLogs(profile)
+        except (OSError, ValueError) as e:
+            self.unwatchLogs(profile)
+            self.releaseLimits(profile)
+            self.launch_queue.cancel()
+            QMessageBox.critical(self, "Error", f"Failed to launch '{profile}': {e}")
+            return None
+        self.launch_plans[profile] = plan
+        self.trackInstance(profile, instance)
+        self.markLaunched(profile)
+        self.updateProfileStatus(profile)
+        return instance
+
+    def trackInstance(self, profile, instance):
+        self.processes[profile] = instance
+        if self.control_server is not None:
+            self.control_server.publish("launched", profile=profile, pid=instance.pid, uri=instance.uri)
+        self.instance_registry.add(profile, instance)
+        self.process_watcher.watch(profile, instance)
+        self.telemetry.clear(profile)
+        if self.telemetry_interval_ms and not self.telemetry_timer.isActive():
+            self.telemetry_timer.start(self.telemetry_interval_ms)
+        self.throttle_policy.wake(profile)
+        if self.throttle_policy.settings["enabled"] and not self.throttle_timer.isActive():
+            self.throttle_timer.start()
+
+    def reattachInstances(self):
+        # Registre de ce démarrage : simple vérification des pids connus, sinon un passage sur /proc
+        for profile, instance in self.instance_registry.discover(self.base_dir).items():
+            if profile in self.processes:
+                continue
+            self.trackInstance(profile, instance)
             self.launched_profiles.add(profile)
+            self.updateProfileStatus(profile)
         self.updateMissingInstancesLabel()
 
+    def releaseLimits(self, profile):
+        plan = self.launch_plans.pop(profile, None)
+        if plan is not None:
+            remove_cgroup(plan.cgroup)
+        self.cpu_spreader.release(profile)
+
+    def showResourcesMenu(self):
+        menu = QMenu(self)
+        defaults_action = menu.addAction("Default limits...")
+        profile_action = menu.addAction("Limits for selected profiles...")
+        clear_action = menu.addAction("Reset selected profiles to defaults")
+        menu.addSeparator()
+        merge_action = menu.addAction("Merge identical memory (KSM)")
+        merge_action.setCheckable(True)
+        merge_action.setChecked(self.memory_merge)
+        action = menu.exec(self.resourcesButton.mapToGlobal(self.resourcesButton.rect().bottomLeft()))
+        if action == merge_action:
+            self.toggleMemoryMerge(merge_action.isChecked())
+            return
+        if action == defaults_action:
+            dialog = ResourceLimitsDialog("Default Resource Limits", self.resource_defaults, self)
+            if dialog.exec() == QDialog.DialogCode.Accepted:
+                self.resource_defaults = dialog.getData()
+                self.saveSettings()
+        elif action in (profile_action, clear_action):
+            if not self.selected_profiles:
+                QMessageBox.warning(self, "Error", "No profiles selected.")
+                return
+            if action == clear_action:
+                for profile in self.selected_profiles:
+                    self.resource_profiles.pop(profile, None)
+            else:
+                first = self.selected_profiles[0]
+                current = effective_limits(self.resource_defaults, self.resource_profiles.get(first))
+                dialog = ResourceLimitsDialog(f"Resource Limits: {', '.join(self.selected_profiles)}", current, self)
+                if dialog.exec() != QDialog.DialogCode.Accepted:
+                    return
+                for profile in self.selected_profiles:
+                    self.resource_profiles[profile] = dialog.getData()
+            self.saveSettings()
+        else:
+            return
+        QMessageBox.information(self, "Resource Limits", "Limits apply to the next launch of each instance.")
+
+    def memoryMergeStatus(self):
+        if self.memory_merge_status is None:
+            self.memory_merge_status = ksm_status()
+        return self.memory_merge_status
+
+    def toggleMemoryMerge(self, enabled):
+        if enabled:
+            self.memory_merge_status = None
+            possible, message = self.memoryMergeStatus()
+            if not possible:
+                QMessageBox.warning(self, "Memory Merging", f"Memory merging is not available: {message}.")
+                return
+            QMessageBox.information(
+                self, "Memory Merging",
+                f"Identical memory pages of instances launched from now on will be merged.\n\n{message}."
+            )
+        self.memory_merge = enabled
+        self.saveSettings()
+
+    # ------------- Bridage en arrière-plan -------------
+
+    def focusedProfile(self, roots):
+        # Retourne (profil au premier plan, focus connu)
+        if self.focus_tracker is None:
+            self.focus_tracker = FocusTracker()
+        active = self.focus_tracker.active() if self.focus_tracker.available else None
+        if active is None:
+            return None, False
+        if not active[1]:
+            return None, True
+        cached_active, owner = self.focus_owner
+        if cached_active != active or (owner is not None and owner not in roots):
+            self.telemetry.table.refresh()
+            owner = find_owner(active[1], roots, self.telemetry.table)
+            self.focus_owner = (active, owner)
+        return owner, True
+
+    def checkThrottle(self):
+        settings = self.throttle_policy.settings
+        if not settings["enabled"] or not self.processes:
+            self.throttle_timer.stop()
+            return
+        roots = {profile: instance.pid for profile, instance in self.processes.items()}
+        focused, focus_known = self.focusedProfile(roots)
+        idle = self.focus_tracker.user_idle() if settings["idle_after"] > 0 else None
+        wanted = self.throttle_policy.decide(roots, focused, focus_known, idle)
+
+        children = None
+        for profile, root in roots.items():
+            if profile in wanted and not self.throttler.is_throttled(profile):
+                if children is None:
+                    self.telemetry.table.refresh()
+                    children = self.telemetry.table.children_map()
+                pids = self.telemetry.table.tree(root, children)
+                self.throttler.throttle(profile, pids, settings["mode"], settings["cpu_quota"])
+            elif profile not in wanted and self.throttler.is_throttled(profile):
+                self.throttler.restore(profile)
+            else:
+                continue
+            self.updateProfileStatus(profile)
+
+    def wakeProfiles(self, profiles):
+        for profile in profiles:
+            self.throttle_policy.wake(profile)
+            if self.throttler.is_throttled(profile):
+                self.throttler.restore(profile)
+                self.updateProfileStatus(profile)
+
+    def showThrottleMenu(self):
+        menu = QMenu(self)
+        toggle_action = menu.addAction("Throttle background instances")
+        toggle_action.setCheckable(True)
+        toggle_action.setChecked(self.throttle_policy.settings["enabled"])
+        settings_action = menu.addAction("Throttle settings...")
+        menu.addSeparator()
+        wake_action = menu.addAction("Wake selected instances")
+        wake_action.setEnabled(bool(self.selected_profiles))
+        wake_all_action = menu.addAction("Wake all instances")
+        action = menu.exec(self.throttleButton.mapToGlobal(self.throttleButton.rect().bottomLeft()))
+        if action == toggle_action:
+            self.applyThrottleSettings({"enabled": toggle_action.isChecked()})
+        elif action == settings_action:
+            dialog = ThrottleSettingsDialog(self.throttle_policy.settings, self)
+            if dialog.exec() == QDialog.DialogCode.Accepted:
+                self.applyThrottleSettings(dialog.getData())
+        elif action == wake_action:
+            self.wakeProfiles(self.selected_profiles)
+        elif action == wake_all_action:
+            self.wakeProfiles(list(self.processes))
+
+    def applyThrottleSettings(self, settings):
+        self.throttle_policy.configure(settings)
+        self.saveSettings()
+        # Tout relâcher : le prochain passage rebride avec les nouveaux réglages
+        self.wakeProfiles(list(self.throttler.state))
+        if self.throttle_policy.settings["enabled"] and self.processes:
+            self.throttle_timer.start()
+        else:
+            self.throttle_timer.stop()
+
+    def closeEvent(self, event):
+        # Ne jamais laisser une instance gelée derrière soi
+        self.throttler.restore_all()
+        for fd in list(self.log_notifiers):
+            self.unwatchLog(fd)
+        self.log_capture.close_all()
+        if self.control_server is not None:
+            self.control_notifier.setEnabled(False)
+            self.control_server.close()
+            self.control_server = None
+        super().closeEvent(event)
+
+    def cancelLaunchQueue(self):
+        self.launch_queue.cancel()
+        self.pumpLaunchQueue()
+
+    def updateLaunchQueueLabel(self):
+        queue = self.launch_queue
+        if not queue.pending:
+            self.launchQueueLabel.setText("Launch queue: empty")
+        else:
+            text = f"Launch queue: {len(queue.pending)} waiting, {len(queue.starting)} starting"
+            if queue.blocked_reason:
+                text += f" (waiting for {queue.blocked_reason})"
+            self.launchQueueLabel.setText(text)
+        self.cancelQueueButton.setEnabled(bool(queue.pending))
+
+    def editLaunchSettings(self):
+        dialog = LaunchSettingsDialog(self.launch_queue.settings, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.launch_queue.configure(dialog.getData())
+            self.saveSettings()
+            self.pumpLaunchQueue()
+
+    # ------------- Arrêt des instances -------------
+
+    def stopProfiles(self, profiles, restart=False):
+        running = [p for p in profiles if self.isProfileRunning(p)]
+        if not running:
+            return []
+        self.telemetry.table.refresh()
+        children = self.telemetry.table.children_map()
+        for profile in running:
+            instance = self.processes[profile]
+            self.launch_queue.cancel(profile)
+            self.supervisor.mark_user_stop(profile)
+            # Une instance gelée ne traiterait pas SIGTERM
+            self.throttler.restore(profile)
+            if restart:
+                self.restart_after_stop[profile] = instance.uri
+            else:
+                self.launched_profiles.discard(profile)
+            pids = self.telemetry.table.tree(instance.pid, children)
+            self.terminator.stop(profile, instance.pid, pids)
+            self.updateProfileStatus(profile)
+        self.scheduleRestarts()
+        self.scheduleStopEscalation()
+        self.updateMissingInstancesLabel()
+        return running
+
+    def scheduleStopEscalation(self):
+        delay = self.terminator.next_delay()
+        if delay is None:
+            self.stop_timer.stop()
+        else:
+            self.stop_timer.start(max(int(delay * 1000), 50))
+
+    def escalateStops(self):
+        # Délai de grâce écoulé : SIGKILL, la sortie arrive ensuite par le ProcessWatcher
+        self.terminator.escalate()
+        self.scheduleStopEscalation()
+
+    def stopSelectedProfiles(self):
+        if not self.selected_profiles and not self.selected_remote:
+            QMessageBox.warning(self, "Error", "No profiles selected.")
+            return
+        stopped = self.stopProfiles(self.selected_profiles)
+        if self.selected_remote:
+            self.stopRemote(self.selected_remote)
+        elif not stopped:
+            QMessageBox.information(self, "Info", "None of the selected profiles is running.")
+
+    def restartSelectedProfiles(self):
+        if not self.selected_profiles:
+            QMessageBox.warning(self, "Error", "No profiles selected.")
+            return
+        if not self.stopProfiles(self.selected_profiles, restart=True):
+            QMessageBox.information(self, "Info", "None of the selected profiles is running.")
+
     def exitAllSessions(self):
         result = QMessageBox.question(
             self, "Confirm Exit",
@@ -368,7 +2049,13 @@ class SoberLauncher(QWidget):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         if result == QMessageBox.StandardButton.Yes:
-            subprocess.run("flatpak kill org.vinegarhq.Sober", shell=True)
+            self.throttler.restore_all()
+            for profile in self.processes:
+                self.supervisor.mark_user_stop(profile)
+            self.supervisor.cancel()
+            self.scheduleRestarts()
+            self.restart_after_stop.clear()
+            subprocess.run(["flatpak", "kill", SOBER_APP_ID])
             self.launched_profiles.clear()
             self.updateMissingInstancesLabel()
             QMessageBox.information(self, "Exit", "All Sober sessions have been forcibly closed.")
@@ -399,23 +2086,518 @@ class SoberLauncher(QWidget):
     def runUpdateScript(self):
         self.update_thread = UpdateThread()
         self.update_thread.update_failed.connect(lambda error: QMessageBox.critical(self, "Error", f"Failed to run update script: {error}"))
-        self.update_thread.update_success.connect(lambda: QMessageBox.information(self, "Update", "Update completed successfully."))
+        self.update_thread.update_success.connect(self.updateFinished)
         self.update_thread.start()
 
+    def updateFinished(self, restart):
+        if not restart:
+            QMessageBox.information(self, "Update", "Update completed successfully.")
+            return
+        reply = QMessageBox.question(self, "Update", "Restart Sober Launcher now to use the new version?\n"
+                                     "Running instances are picked up again after the restart.")
+        if reply == QMessageBox.StandardButton.Yes:
+            self.restartLauncher()
+
+    def restartLauncher(self):
+        # Fermeture propre (socket de contrôle libérée, instances dégelées) puis même commande
+        if self.close():
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+
+    # ------------- Flotte -------------
+
+    def followFleet(self, path):
+        self.fleet_path = path
+        self.fleet = FleetFile(path, self.privateServers) if path else None
+        if self.fleet is None:
+            self.fleet_timer.stop()
+        else:
+            self.fleet_timer.start(int(self.fleet_interval * 1000))
+            self.reconcileFleet()
+        self.updateFleetButton()
+
+    def reconcileFleet(self):
+        fleet = self.fleet
+        if fleet is None or not self.base_dir:
+            return
+        force = fleet.private_servers != self.privateServers
+        fleet.private_servers = list(self.privateServers)
+        fleet.reload(force)
+        self.updateFleetButton()
+        if fleet.error and not fleet.rules:
+            return
+
+        running = {p: inst.uri for p, inst in self.processes.items() if not self.terminator.is_stopping(p)}
+        # Déjà en cours de changement : on laisse la file, l'arrêt ou le superviseur finir
+        busy = {p for p, _ in self.launch_queue.pending} | set(self.terminator.stopping)
+        for profile, record in self.supervisor.records.items():
+            if record["given_up"] or record["next_restart"] is not None:
+                busy.add(profile)
+        start, stop, restart = reconcile(desired_state(fleet.rules, self.profiles), running, busy)
+
+        if stop:
+            self.stopProfiles(stop)
+        if restart:
+            self.stopProfiles([p for p, _ in restart], restart=True)
+            for profile, uri in restart:
+                self.restart_after_stop[profile] = uri
+        for profile, uri in start:
+            self.launch_queue.enqueue(profile, uri)
+        if start:
+            self.pumpLaunchQueue()
+
+    def updateFleetButton(self):
+        if self.fleet is None:
+            self.fleetButton.setText("Fleet: Off")
+            self.fleetButton.setToolTip("Keep profiles running from a fleet file")
+            return
+        self.fleetButton.setText(f"Fleet: {os.path.basename(self.fleet_path)}" + (" (error)" if self.fleet.error else ""))
+        self.fleetButton.setToolTip(self.fleet.error or f"Following {self.fleet_path}")
+
+    def showFleetMenu(self):
+        menu = QMenu(self)
+        open_action = menu.addAction("Follow a fleet file...")
+        reconcile_action = menu.addAction("Reconcile now")
+        reconcile_action.setEnabled(self.fleet is not None)
+        off_action = menu.addAction("Stop following")
+        off_action.setEnabled(self.fleet is not None)
+        action = menu.exec(self.fleetButton.mapToGlobal(self.fleetButton.rect().bottomLeft()))
+        if action == open_action:
+            path, _ = QFileDialog.getOpenFileName(self, "Fleet File", "", "Fleet files (*.json *.toml)")
+            if path:
+                self.followFleet(path)
+                self.saveSettings()
+                if self.fleet.error:
+                    QMessageBox.warning(self, "Fleet", self.fleet.error)
+        elif action == reconcile_action:
+            self.fleet.reload(force=True)
+            self.reconcileFleet()
+            if self.fleet.error:
+                QMessageBox.warning(self, "Fleet", self.fleet.error)
+        elif action == off_action:
+            # Les instances restent lancées, elles ne sont simplement plus suivies
+            self.followFleet(None)
+            self.saveSettings()
+
+    # ------------- Journaux des instances -------------
+
+    def watchLogs(self, profile):
+        for fd in self.log_capture.fds(profile):
+            notifier = QSocketNotifier(fd, QSocketNotifier.Type.Read, self)
+            notifier.activated.connect(lambda *_, fd=fd: self.readLog(fd))
+            self.log_notifiers[fd] = notifier
+
+    def unwatchLog(self, fd):
+        notifier = self.log_notifiers.pop(fd, None)
+        if notifier is not None:
+            notifier.setEnabled(False)
+            notifier.deleteLater()
+        self.log_capture.release(fd)
+
+    def unwatchLogs(self, profile):
+        for fd in self.log_capture.fds(profile):
+            self.unwatchLog(fd)
+
+    def readLog(self, fd):
+        # Fin du tube : tous les processus de l'instance ont fermé leur sortie
+        if fd in self.log_notifiers and not self.log_capture.read(fd):
+            self.unwatchLog(fd)
+
+    def refreshLogProfiles(self):
+        current = self.logProfileCombo.currentText() or ALL_PROFILES
+        self.logProfileCombo.blockSignals(True)
+        self.logProfileCombo.clear()
+        self.logProfileCombo.addItem(ALL_PROFILES)
+        self.logProfileCombo.addItems(self.profiles)
+        index = self.logProfileCombo.findText(current)
+        self.logProfileCombo.setCurrentIndex(max(index, 0))
+        self.logProfileCombo.blockSignals(False)
+        if index < 0:
+            self.refreshLogView(rebuild=True)
+
+    def showLogs(self, profile):
+        index = self.logProfileCombo.findText(profile)
+        self.logProfileCombo.setCurrentIndex(max(index, 0))
+        self.main_tab_widget.setCurrentWidget(self.logs_tab)
+
+    def onTabChanged(self, index):
+        # L'onglet n'est rafraîchi que quand il est visible
+        if self.main_tab_widget.widget(index) is self.logs_tab:
+            self.refreshLogView(rebuild=True)
+            self.log_timer.start()
+        else:
+            self.log_timer.stop()
+
+    def refreshLogView(self, rebuild=False):
+        profile = self.logProfileCombo.currentText()
+        show_all = profile in ("", ALL_PROFILES)
+        if rebuild:
+            self.logView.clear()
+            self.log_view_seq = 0
+        lines = self.log_capture.lines(None if show_all else [profile], self.log_view_seq)
+        self.log_view_seq = self.log_capture.seq
+        needle = self.logFilterInput.text().strip().lower()
+        errors_only = self.logErrorsOnlyCheck.isChecked()
+        shown = []
+        for _, when, stream, text, owner in lines:
+            if errors_only and stream == "out":
+                continue
+            if needle and needle not in text.lower():
+                continue
+            stamp = time.strftime("%H:%M:%S", time.localtime(when))
+            mark = " [err]" if stream == "err" else ""
+            shown.append(f"{stamp}{' ' + owner + ':' if show_all else ''}{mark} {text}")
+        if not shown:
+            return
+        scrollbar = self.logView.verticalScrollBar()
+        position = scrollbar.value()
+        self.logView.appendPlainText("\n".join(shown[-MAX_LOG_VIEW_LINES:]))
+        if self.logFollowCheck.isChecked():
+            scrollbar.setValue(scrollbar.maximum())
+        else:
+            scrollbar.setValue(position)
+
+    def clearLogs(self):
+        profile = self.logProfileCombo.currentText()
+        self.log_capture.clear(None if profile in ("", ALL_PROFILES) else profile)
+        self.refreshLogView(rebuild=True)
+
+    def editLogSettings(self):
+        dialog = LogSettingsDialog(self.log_capture.settings, self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self.log_capture.configure(dialog.getData())
+            self.saveSettings()
+
+    # ------------- Agents distants -------------
+
+    def updateAgentPolling(self):
+        if self.agents:
+            self.agent_timer.start(int(self.agent_interval * 1000))
+            self.pollAgents()
+        else:
+            self.agent_timer.stop()
+        self.applyAgentStatus({n: h for n, h in self.agent_hosts.items() if n in {a.name for a in self.agents}})
+
+    def pollAgents(self):
+        if self.agent_thread is not None or not self.agents:
+            return  # relevé précédent pas fini (agent lent ou injoignable)
+        thread = TaskThread(poll_agents, list(self.agents))
+        thread.task_done.connect(self.applyAgentStatus)
+        thread.finished.connect(self.onAgentPollFinished)
+        self.agent_thread = thread
+        thread.start()
+
+    def onAgentPollFinished(self):
+        self.agent_thread = None
+
+    def applyAgentStatus(self, hosts):
+        self.agent_hosts = hosts
+        model = self.profileModel
+        remote = [k for k in model.keys() if isinstance(k, tuple)]
+        seen, added = set(), []
+        now = time.time()
+        for a_index, agent in enumerate(self.agents):
+            host = hosts.get(agent.name)
+            if host is None:
+                continue
+            if host["error"]:
+                # Agent injoignable : ses lignes restent, marquées comme telles
+                for key in remote:
+                    if key[0] == agent.name:
+                        seen.add(key)
+                        row = model.row(key)
+                        row.texts[STATUS_COLUMN] = "Host unreachable"
+                        row.tooltips[STATUS_COLUMN] = host["error"]
+                        row.started_at = None
+                        model.rowChanged(key, roles=PROFILE_ROW_ROLES)
+                continue
+            for j, (profile, status) in enumerate(host["status"].items()):
+                key = (agent.name, profile)
+                seen.add(key)
+                row = model.row(key)
+                if row is None:
+                    row = ProfileRow(key, f"{profile} @ {agent.name}", REMOTE_ORDER * (a_index + 1) + j)
+                    row.tooltips[PROFILE_COLUMN] = f"On {host['host']['hostname']} ({agent.address})"
+                    added.append(row)
+                cpu, rss = status.get("cpu"), status.get("rss")
+                row.texts[CPU_COLUMN] = f"{cpu:.0f}%" if cpu is not None else ""
+                row.values[CPU_COLUMN] = float(cpu) if cpu is not None else -1.0
+                row.texts[MEMORY_COLUMN] = format_size(rss) if rss is not None else ""
+                row.values[MEMORY_COLUMN] = rss if rss is not None else -1
+                row.texts[STATUS_COLUMN] = status["status"]
+                row.tooltips[STATUS_COLUMN] = status["uri"] or ""
+                uptime = status.get("uptime")
+                row.started_at = now - uptime if status.get("running") and uptime is not None else None
+                model.rowChanged(key, roles=PROFILE_ROW_ROLES)
+        model.appendRows(added)
+        model.removeKeys([k for k in remote if k not in seen])
+        if any(model.row(k).started_at for k in seen) and not self.uptime_timer.isActive():
+            self.uptime_timer.start()
+        self.updateHostsButton()
+
+    def updateHostsButton(self):
+        if not self.agents:
+            self.hostsButton.setText("Hosts: Local")
+            self.hostsButton.setToolTip("Launch profiles on other machines running `soberlauncher agent`")
+            return
+        lines = []
+        up = 0
+        for agent in self.agents:
+            host = self.agent_hosts.get(agent.name)
+            if host is None:
+                lines.append(f"{agent.name}: waiting for the first status")
+            elif host["error"]:
+                lines.append(f"{agent.name}: {host['error']}")
+            else:
+                up += 1
+                stats = host["host"]
+                lines.append(f"{agent.name} ({stats['hostname']}): {stats['running']} running, "
+                             f"load {stats['load']:.1f} / {stats['cpus']} CPUs, "
+                             f"{stats['mem_available_mb']} MB free")
+        self.hostsButton.setText(f"Hosts: {up}/{len(self.agents)} up")
+        self.hostsButton.setToolTip("\n".join(lines))
+
+    def showHostsMenu(self):
+        menu = QMenu(self)
+        add_action = menu.addAction("Add agent...")
+        remove_menu = menu.addMenu("Remove agent")
+        remove_menu.setEnabled(bool(self.agents))
+        remove_actions = [(remove_menu.addAction(agent.name), agent) for agent in self.agents]
+        menu.addSeparator()
+        spread_action = menu.addAction("Launch selected across hosts")
+        spread_link_action = menu.addAction("Launch selected across hosts with game link...")
+        refresh_action = menu.addAction("Refresh now")
+        for entry in (spread_action, spread_link_action, refresh_action):
+            entry.setEnabled(bool(self.agents))
+
+        action = menu.exec(self.hostsButton.mapToGlobal(self.hostsButton.rect().bottomLeft()))
+        if action is None:
+            return
+        if action == add_action:
+            self.addAgent()
+        elif action == spread_action:
+            self.launchAcrossHosts(self.selected_profiles)
+        elif action == spread_link_action:
+            url, ok = QInputDialog.getText(self, "Game Link", "Enter the game link:")
+            if ok and url.strip():
+                try:
+                    uri = place_uri(url)
+                except ValueError:
+                    QMessageBox.warning(self, "Error", "Invalid Roblox game link.")
+                    return
+                self.launchAcrossHosts(self.selected_profiles, uri)
+        elif action == refresh_action:
+            self.pollAgents()
+        else:
+            for entry, agent in remove_actions:
+                if action == entry:
+                    self.agents.remove(agent)
+                    self.agent_hosts.pop(agent.name, None)
+                    self.saveSettings()
+                    self.updateAgentPolling()
+
+    def addAgent(self):
+        dialog = AgentDialog(self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        name, address, token = dialog.getData()
+        if not address:
+            QMessageBox.warning(self, "Error", "The agent needs an address (host:port).")
+            return
+        name = name or address
+        if any(agent.name == name for agent in self.agents):
+            QMessageBox.warning(self, "Error", f"An agent named '{name}' already exists.")
+            return
+        self.agents.append(RemoteAgent(name, address, token))
+        self.saveSettings()
+        self.updateAgentPolling()
+
+    def runOnAgents(self, work, on_done):
+        thread = TaskThread(work)
+        thread.task_done.connect(on_done)
+        thread.task_failed.connect(lambda error: QMessageBox.warning(self, "Hosts", error))
+        thread.finished.connect(lambda: self.agent_tasks.discard(thread))
+        self.agent_tasks.add(thread)
+        thread.start()
+
+    def callRemote(self, items, method, **params):
+        # Requêtes groupées par agent, hors du thread de l'UI ; le statut suit au prochain relevé
+        agents = {agent.name: agent for agent in self.agents}
+        groups = {}
+        for name, profile in items:
+            if name in agents:
+                groups.setdefault(name, []).append(profile)
+
+        def work():
+            errors = []
+            for name, profiles in groups.items():
+                try:
+                    agents[name].call(method, profiles=profiles, **params)
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+            return errors
+
+        def onDone(errors):
+            if errors:
+                QMessageBox.warning(self, "Hosts", "\n".join(errors))
+            self.pollAgents()
+
+        self.runOnAgents(work, onDone)
+
+    def launchRemote(self, items, uri=None):
+        self.callRemote(items, "launch", uri=uri)
+
+    def stopRemote(self, items):
+        self.callRemote(items, "stop")
+
+    def launchAcrossHosts(self, profiles, uri=None):
+        if not profiles:
+            QMessageBox.warning(self, "Error", "No profiles selected.")
+            return
+        agents, cost = list(self.agents), dict(self.instance_cost)
+
+        def onDone(result):
+            queued, unplaced, errors = result
+            lines = [f"{name}: {', '.join(group) or 'nothing new'}" for name, group in queued.items()]
+            if unplaced:
+                lines.append(f"Not placed (no host with room): {', '.join(unplaced)}")
+            lines += [f"{name}: {error}" for name, error in errors.items()]
+            QMessageBox.information(self, "Hosts", "\n".join(lines) or "Every profile is already running.")
+            self.pollAgents()
+
+        self.runOnAgents(lambda: launch_across(agents, profiles, uri, cost), onDone)
+
+    # ------------- Socket de contrôle -------------
+
+    def startControlServer(self):
+        handlers = {
+            "profiles": lambda: self.profiles,
+            "status": self.rpcStatus,
+            "launch": self.rpcLaunch,
+            "stop": self.rpcStop,
+            "fleet": self.rpcFleet,
+        }
+        try:
+            self.control_server = ControlServer(socket_path(), handlers)
+        except OSError:
+            return  # un autre lanceur tourne déjà (ou pas de socket possible) : pas de pilotage
+        self.control_notifier = QSocketNotifier(self.control_server.fileno(), QSocketNotifier.Type.Read, self)
+        self.control_notifier.activated.connect(lambda *_: self.control_server.process())
+
+    def rpcSelect(self, profiles, candidates):
+        if isinstance(profiles, str):
+            profiles = [profiles]
+        try:
+            return select_profiles(candidates, profiles)
+        except ValueError as e:
+            raise RpcError(str(e))
+
+    def rpcStatus(self, profiles=None):
+        chosen = self.rpcSelect(profiles, self.profiles) if profiles else self.profiles
+        status = {}
+        for profile in chosen:
+            instance = self.processes.get(profile)
+            status[profile] = {
+                "running": instance is not None,
+                "pid": instance.pid if instance else None,
+                "uptime": instance.runtime() if instance else None,
+                "uri": instance.uri if instance else None,
+                "queued": self.launch_queue.is_queued(profile),
+                "status": self.profileStatusText(profile),
+            }
+        return status
+
+    def rpcLaunch(self, profiles, place=None, uri=None):
+        chosen = self.rpcSelect(profiles, self.profiles)
+        try:
+            uri = uri or place_uri(place)
+        except ValueError as e:
+            raise RpcError(str(e))
+        running = [p for p in chosen if self.isProfileRunning(p)]
+        self.queueLaunches(chosen, uri)
+        return {"queued": [p for p in chosen if p not in running], "running": running}
+
+    def rpcFleet(self, path=None):
+        self.followFleet(os.path.abspath(path) if path else None)
+        self.saveSettings()
+        return {"path": self.fleet_path, "error": self.fleet.error if self.fleet else ""}
+
+    def rpcStop(self, profiles=(), all=False, restart=False, uri=None):
+        if all:
+            chosen = list(self.processes)
+        elif profiles:
+            chosen = self.rpcSelect(profiles, sorted(self.processes, key=natural_sort_key))
+        else:
+            raise RpcError("name the profiles to stop, or pass all")
+        stopping = self.stopProfiles(chosen, restart)
+        if restart and uri is not None:
+            # Relancer ailleurs (flotte) plutôt que sur le même jeu
+            for profile in stopping:
+                self.restart_after_stop[profile] = uri
+        return {"stopping": stopping}
+
     # ------------- Crash windows -------------
 
+    def startCrashWatcher(self):
+        try:
+            watcher = CrashWindowWatcher()
+        except Exception:
+            return  # pas de python-xlib ou pas de serveur X : bouton Remove Crash seulement
+        self.crash_watcher = watcher
+        self.crash_notifier = QSocketNotifier(watcher.fileno(), QSocketNotifier.Type.Read, self)
+        self.crash_notifier.activated.connect(self.onCrashWindowEvents)
+        # Des événements peuvent déjà attendre dans le tampon de python-xlib
+        QTimer.singleShot(0, self.onCrashWindowEvents)
+
+    def crashWindowOwners(self, windows):
+        # Associe chaque fenêtre (window, pid) au profil dont l'arbre de processus la possède
+        roots = {profile: instance.pid for profile, instance in self.processes.items()}
+        if not roots:
+            return []
+        self.telemetry.table.refresh()
+        owned = []
+        for window, pid in windows:
+            owner = find_owner(pid, roots, self.telemetry.table) if pid else None
+            if owner is not None:
+                owned.append((window, owner))
+        return owned
+
+    def onCrashWindowEvents(self, *args):
+        try:
+            found = self.crash_watcher.pending()
+        except Exception:
+            # Connexion X perdue : on retombe sur le bouton
+            self.crash_notifier.setEnabled(False)
+            self.crash_watcher = None
+            return
+        owned = self.crashWindowOwners(found)
+        if not owned:
+            return
+        self.crash_watcher.close([window for window, _ in owned])
+        for _, profile in owned:
+            self.crash_counts[profile] = self.crash_counts.get(profile, 0) + 1
+            self.crashed_profiles.add(profile)
+            self.updateProfileStatus(profile)
+
     def removeCrashWindows(self):
+        if self.crash_watcher is not None:
+            found = self.crash_watcher.scan()
+            if not found:
+                QMessageBox.information(self, "Info", "No 'Crash' windows found.")
+                return
+            for _, profile in self.crashWindowOwners(found):
+                self.crash_counts[profile] = self.crash_counts.get(profile, 0) + 1
+                self.crashed_profiles.add(profile)
+                self.updateProfileStatus(profile)
+            self.crash_watcher.close([window for window, _ in found])
+            return
         try:
+            # Une seule commande pour toutes les fenêtres
             result = subprocess.run(
-                ["xdotool", "search", "--name", "Crash"], capture_output=True, text=True
+                ["xdotool", "search", "--name", "Crash", "windowkill", "%@"], capture_output=True, text=True
             )
-            if result.returncode != 0 or not result.stdout.strip():
+            if result.returncode != 0:
                 QMessageBox.information(self, "Info", "No 'Crash' windows found.")
                 return
-
-            window_ids = result.stdout.strip().split("\n")
-            for window_id in window_ids:
-                subprocess.run(["xdotool", "windowkill", window_id])
         except FileNotFoundError:
             QMessageBox.critical(
                 self, "Error", "The 'xdotool' command is not available. Please ensure it is installed."
@@ -441,26 +2623,14 @@ class SoberLauncher(QWidget):
 
         place_id = match.group(1)
         roblox_command = f'roblox://experience?placeId={place_id}'
-
-        for profile in missing:
-            if profile == "Main Profile":
-                proc = subprocess.Popen(f'flatpak run org.vinegarhq.Sober "{roblox_command}"', shell=True)
-            else:
-                profile_path = os.path.join(self.base_dir, profile)
-                command = f'env HOME="{profile_path}" flatpak run org.vinegarhq.Sober "{roblox_command}"'
-                proc = subprocess.Popen(command, shell=True)
-            self.processes[profile] = proc
-            self.launched_profiles.add(profile)
-        self.updateMissingInstancesLabel()
+        self.queueLaunches(missing, roblox_command)
 
     def launchMainProfile(self):
-        profile = "Main Profile"
-        if profile in self.processes and self.processes[profile].poll() is None:
+        profile = MAIN_PROFILE
+        if self.isProfileRunning(profile):
             QMessageBox.information(self, "Info", "Main Profile is already running.")
             return
-        proc = subprocess.Popen("flatpak run org.vinegarhq.Sober", shell=True)
-        self.processes[profile] = proc
-        self.launched_profiles.add(profile)
+        self.spawnProfile(profile)
         self.updateMissingInstancesLabel()
 
     # ------------- Nom affiché -------------
@@ -537,8 +2707,10 @@ class SoberLauncher(QWidget):
         self.refreshPrivateServerButtons()
 
     def runParameter(self, parameter):
-        command = f'flatpak run org.vinegarhq.Sober "{parameter}"'
-        subprocess.Popen(command, shell=True)
+        try:
+            launch(self.base_dir, MAIN_PROFILE, parameter)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to launch Sober: {e}")
 
     def quickLaunch(self):
         parameter, ok = QInputDialog.getText(self, "Parameter", "Enter the parameter:")
@@ -581,13 +2753,28 @@ class SoberLauncher(QWidget):
         self.refreshButton = QPushButton()
         self.refreshButton.setIcon(QIcon.fromTheme("view-refresh"))
         self.refreshButton.setToolTip("Refresh Profiles")
-        self.refreshButton.clicked.connect(self.scanForProfiles)
+        self.refreshButton.clicked.connect(lambda: self.scanForProfiles(force=True))
         top_bar.addWidget(self.refreshButton)
 
         self.createProfileButton = QPushButton("Create Profile")
         self.createProfileButton.clicked.connect(self.createProfile)
         top_bar.addWidget(self.createProfileButton)
 
+        self.dedupeButton = QPushButton("Deduplicate")
+        self.dedupeButton.setToolTip("Share identical game files between profiles")
+        self.dedupeButton.clicked.connect(lambda: self.deduplicateProfiles())
+        top_bar.addWidget(self.dedupeButton)
+
+        self.sharedLayerButton = QPushButton("Shared Files")
+        self.sharedLayerButton.setToolTip("Keep one copy of the game files for every profile")
+        self.sharedLayerButton.clicked.connect(self.showSharedLayerMenu)
+        top_bar.addWidget(self.sharedLayerButton)
+
+        self.diskBudgetButton = QPushButton("Disk Budget")
+        self.diskBudgetButton.setToolTip("Clean the caches of the least recently launched profiles when over budget")
+        self.diskBudgetButton.clicked.connect(self.showDiskBudgetMenu)
+        top_bar.addWidget(self.diskBudgetButton)
+
         self.exitAllButton = QPushButton("Exit All Sessions")
         self.exitAllButton.clicked.connect(self.exitAllSessions)
         top_bar.addWidget(self.exitAllButton)
@@ -602,9 +2789,23 @@ class SoberLauncher(QWidget):
 
         left_layout.addLayout(top_bar)
 
-        self.profileList = QListWidget()
+        self.profileSearch = QLineEdit()
+        self.profileSearch.setPlaceholderText("Search profiles")
+        self.profileSearch.setClearButtonEnabled(True)
+        self.profileSearch.textChanged.connect(self.profileProxy.setFilterFixedString)
+        left_layout.addWidget(self.profileSearch)
+
+        # Vue virtualisée : seules les lignes visibles sont dessinées, même avec des milliers de profils
+        self.profileList = QTreeView()
+        self.profileList.setModel(self.profileProxy)
+        self.profileList.setRootIsDecorated(False)
+        self.profileList.setUniformRowHeights(True)
+        self.profileList.setAllColumnsShowFocus(True)
+        self.profileList.setSortingEnabled(True)
+        self.profileList.sortByColumn(PROFILE_COLUMN, Qt.SortOrder.AscendingOrder)
         self.profileList.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
-        self.profileList.itemSelectionChanged.connect(self.updateSelectedProfiles)
+        self.profileList.selectionModel().selectionChanged.connect(self.onProfileSelectionChanged)
+        self.profileProxy.modelReset.connect(self.onProfileModelReset)
         left_layout.addWidget(self.profileList)
 
         right_layout = QVBoxLayout()
@@ -620,14 +2821,52 @@ class SoberLauncher(QWidget):
         self.launchButton.clicked.connect(self.launchGame)
         right_layout.addWidget(self.launchButton)
 
-        self.consoleLaunchButton = QPushButton("Run with Console")
-        self.consoleLaunchButton.clicked.connect(self.runWithConsole)
-        right_layout.addWidget(self.consoleLaunchButton)
+        self.logsLaunchButton = QPushButton("Run and Show Logs")
+        self.logsLaunchButton.setToolTip("Launch the selected profiles and follow their output in the Logs tab")
+        self.logsLaunchButton.clicked.connect(self.runWithLogs)
+        right_layout.addWidget(self.logsLaunchButton)
 
         self.runSpecificGameButton = QPushButton("Run Specific Game")
         self.runSpecificGameButton.clicked.connect(self.runSpecificGame)
         right_layout.addWidget(self.runSpecificGameButton)
 
+        stop_row = QHBoxLayout()
+        self.stopButton = QPushButton("Stop")
+        self.stopButton.setToolTip("Close the selected instances (killed if they don't exit in time)")
+        self.stopButton.clicked.connect(self.stopSelectedProfiles)
+        stop_row.addWidget(self.stopButton)
+
+        self.restartButton = QPushButton("Restart")
+        self.restartButton.setToolTip("Close the selected instances and launch them again")
+        self.restartButton.clicked.connect(self.restartSelectedProfiles)
+        stop_row.addWidget(self.restartButton)
+        right_layout.addLayout(stop_row)
+
+        self.launchQueueLabel = QLabel("Launch queue: empty")
+        self.launchQueueLabel.setWordWrap(True)
+        right_layout.addWidget(self.launchQueueLabel)
+
+        queue_row = QHBoxLayout()
+        self.cancelQueueButton = QPushButton("Cancel Queue")
+        self.cancelQueueButton.setEnabled(False)
+        self.cancelQueueButton.clicked.connect(self.cancelLaunchQueue)
+        queue_row.addWidget(self.cancelQueueButton)
+
+        self.launchSettingsButton = QPushButton("Launch Settings")
+        self.launchSettingsButton.clicked.connect(self.editLaunchSettings)
+        queue_row.addWidget(self.launchSettingsButton)
+
+        self.resourcesButton = QPushButton("Resources")
+        self.resourcesButton.setToolTip("CPU cores, priorities and memory/CPU limits per profile")
+        self.resourcesButton.clicked.connect(self.showResourcesMenu)
+        queue_row.addWidget(self.resourcesButton)
+
+        self.throttleButton = QPushButton("Background")
+        self.throttleButton.setToolTip("Freeze or CPU-cap instances whose window is not focused")
+        self.throttleButton.clicked.connect(self.showThrottleMenu)
+        queue_row.addWidget(self.throttleButton)
+        right_layout.addLayout(queue_row)
+
         right_panel_widget = QWidget()
         right_panel_widget.setLayout(right_layout)
         right_panel_widget.setFixedWidth(300)
@@ -651,6 +2890,20 @@ class SoberLauncher(QWidget):
         self.runMissingWithLinkButton.clicked.connect(self.runMissingInstancesWithLink)
         bottom_layout.addWidget(self.runMissingWithLinkButton)
 
+        self.supervisorButton = QPushButton()
+        self.supervisorButton.setToolTip("Restart crashed instances with increasing delays")
+        self.supervisorButton.clicked.connect(self.editSupervisorSettings)
+        self.updateSupervisorButton()
+        bottom_layout.addWidget(self.supervisorButton)
+
+        self.fleetButton = QPushButton("Fleet: Off")
+        self.fleetButton.clicked.connect(self.showFleetMenu)
+        bottom_layout.addWidget(self.fleetButton)
+
+        self.hostsButton = QPushButton("Hosts: Local")
+        self.hostsButton.clicked.connect(self.showHostsMenu)
+        bottom_layout.addWidget(self.hostsButton)
+
         instances_layout.addLayout(main_layout)
         instances_layout.addLayout(bottom_layout)
         instances_tab.setLayout(instances_layout)
@@ -710,9 +2963,58 @@ class SoberLauncher(QWidget):
         QTimer.singleShot(0, self.refreshPrivateServerButtons)
 
         # Tabs
+        # ----- Onglet Logs -----
+        self.logs_tab = QWidget()
+        logs_layout = QVBoxLayout(self.logs_tab)
+
+        logs_bar = QHBoxLayout()
+        self.logProfileCombo = QComboBox()
+        self.logProfileCombo.addItem(ALL_PROFILES)
+        self.logProfileCombo.currentIndexChanged.connect(lambda *_: self.refreshLogView(rebuild=True))
+        logs_bar.addWidget(self.logProfileCombo)
+
+        self.logFilterInput = QLineEdit()
+        self.logFilterInput.setPlaceholderText("Filter")
+        self.logFilterInput.setClearButtonEnabled(True)
+        self.logFilterInput.textChanged.connect(lambda *_: self.refreshLogView(rebuild=True))
+        logs_bar.addWidget(self.logFilterInput, 1)
+
+        self.logErrorsOnlyCheck = QCheckBox("Errors only")
+        self.logErrorsOnlyCheck.toggled.connect(lambda *_: self.refreshLogView(rebuild=True))
+        logs_bar.addWidget(self.logErrorsOnlyCheck)
+
+        self.logFollowCheck = QCheckBox("Follow")
+        self.logFollowCheck.setChecked(True)
+        logs_bar.addWidget(self.logFollowCheck)
+
+        clear_logs_button = QPushButton("Clear")
+        clear_logs_button.clicked.connect(self.clearLogs)
+        logs_bar.addWidget(clear_logs_button)
+
+        log_settings_button = QPushButton("Log Settings")
+        log_settings_button.clicked.connect(self.editLogSettings)
+        logs_bar.addWidget(log_settings_button)
+        logs_layout.addLayout(logs_bar)
+
+        self.logView = QPlainTextEdit()
+        self.logView.setReadOnly(True)
+        self.logView.setMaximumBlockCount(MAX_LOG_VIEW_LINES)
+        self.logView.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.logView.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        logs_layout.addWidget(self.logView)
+
+        # Nouvelles lignes ajoutées par lots, seulement quand l'onglet est affiché
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(250)
+        self.log_timer.timeout.connect(self.refreshLogView)
+
+        # Tabs
+        self.main_tab_widget = main_tab_widget
         main_tab_widget.addTab(instances_tab, "Instances")
         main_tab_widget.addTab(roblox_tab, "Roblox Player")
+        main_tab_widget.addTab(self.logs_tab, "Logs")
         main_tab_widget.setCurrentIndex(0)
+        main_tab_widget.currentChanged.connect(self.onTabChanged)
 
         wrapper_layout = QVBoxLayout()
         wrapper_layout.addLayout(global_top_bar)
@@ -731,13 +3033,60 @@ class SoberLauncher(QWidget):
             self.base_dir = os.path.abspath(dir_selected)
             self.saveSettings()
             QMessageBox.information(self, "Directory Selected", f"Base Directory: {self.base_dir}")
-            self.scanForProfiles()
+            self.loadProfiles()
+
+    def onProfileSelectionChanged(self, selected, deselected):
+        # Seules les plages qui changent sont lues : tout sélectionner n'est qu'une plage
+        self.selection.difference_update(self.selectionRangeKeys(deselected))
+        self.selection.update(self.selectionRangeKeys(selected))
+        self.updateSelectedProfiles()
+
+    def selectionRangeKeys(self, ranges):
+        model, proxy = self.profileModel, self.profileProxy
+        # Le proxy ne trie pas (le modèle s'en charge) : sans filtre, ses lignes sont celles du modèle
+        unfiltered = proxy.rowCount() == len(model.rows)
+        for selection_range in ranges:
+            if unfiltered:
+                for row in model.rows[selection_range.top():selection_range.bottom() + 1]:
+                    yield row.key
+                continue
+            for row in range(selection_range.top(), selection_range.bottom() + 1):
+                yield proxy.index(row, PROFILE_COLUMN).data(KEY_ROLE)
+
+    def onProfileModelReset(self):
+        # Une réinitialisation vide la sélection sans signal
+        self.selection = set()
+        self.updateSelectedProfiles()
+
+    def selectedKeys(self):
+        """(profils locaux, (agent, profil) distants) sélectionnés, dans l'ordre de la liste."""
+        if self.selection_cache is None:
+            model = self.profileModel
+            keys = sorted((k for k in self.selection if k in model.positions),
+                          key=lambda k: model.row(k).values[PROFILE_COLUMN])
+            self.selection_cache = ([k for k in keys if isinstance(k, str)],
+                                    [k for k in keys if isinstance(k, tuple)])
+        return self.selection_cache
+
+    @property
+    def selected_profiles(self):
+        return self.selectedKeys()[0]
+
+    @property
+    def selected_remote(self):
+        return self.selectedKeys()[1]
 
     def updateSelectedProfiles(self):
-        self.selected_profiles = [item.text() for item in self.profileList.selectedItems()]
-        self.selectedProfileLabel.setText(
-            f"Selected Profiles: {', '.join(self.selected_profiles) if self.selected_profiles else 'None'}"
-        )
+        self.selection_cache = None
+        count = len(self.selection)
+        if not count:
+            text = "None"
+        elif count <= SELECTION_NAMES:
+            local, remote = self.selectedKeys()
+            text = ", ".join(local + [f"{profile} @ {agent}" for agent, profile in remote])
+        else:
+            text = f"{count} profiles"
+        self.selectedProfileLabel.setText(f"Selected Profiles: {text}")
 
 
 if __name__ == "__main__":
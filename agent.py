@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Launch agent: the launch, stop and status primitives of the launcher served
+over the network, so one GUI can spread its profiles over several machines.
+
+    soberlauncher --base-dir ~/Sober agent --listen 0.0.0.0:7421 --token <secret>
+
+It speaks the control protocol (control.py) over TCP and never imports
+PyQt6. Instances get the same launch queue, resource limits and graceful
+stop as in the GUI, and keep running when the agent stops: the next agent
+re-attaches to them from its registry.
+
+The launcher side (RemoteAgent, poll_agents, launch_across) polls the agents
+and places profiles on them by free CPU and memory (placement.py).
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from control import ControlClient, ControlServer, RpcError
+from cli import CliError, create_profile, local_spawner
+from instance_registry import InstanceRegistry
+from launch_queue import LaunchQueue
+from placement import host_stats, place
+from profiles import natural_sort_key, place_uri, scan_profiles, select_profiles
+from telemetry import TelemetrySampler
+from terminate import Terminator, DEFAULT_STOP_TIMEOUT
+
+DEFAULT_AGENT_PORT = 7421
+STATE_NAME = ".soberlauncher-agent.json"   # registry, inside the base directory
+GLOB_CHARS = "*?["
+
+
+class Agent:
+    def __init__(self, address, base_dir, settings, token=None, state_path=None, log=None):
+        self.base_dir = base_dir
+        self.settings = settings
+        self.log = log or (lambda message: None)
+        self.spawn = local_spawner(settings, base_dir)
+        self.queue = LaunchQueue(settings.get("LaunchQueue") or {})
+        self.terminator = Terminator(float(settings.get("StopTimeout", DEFAULT_STOP_TIMEOUT)))
+        self.telemetry = TelemetrySampler(history=1)
+        self.registry = InstanceRegistry(state_path or os.path.join(base_dir, STATE_NAME))
+        self.instances = {}      # profile -> Instance
+        self.pidfds = {}         # profile -> pidfd watched by the server
+        self.polled = set()      # profiles without pidfd, checked every second
+        self.exit_history = {}   # profile -> (code, runtime)
+        self.server = ControlServer(address, {
+            "host": self.rpc_host,
+            "profiles": lambda: scan_profiles(self.base_dir),
+            "status": self.rpc_status,
+            "launch": self.rpc_launch,
+            "stop": self.rpc_stop,
+        }, token)
+        for profile, instance in self.registry.discover(base_dir).items():
+            self.log(f"{profile}: re-attached (pid {instance.pid})")
+            self.track(profile, instance)
+
+    # ---- instances ----
+
+    def track(self, profile, instance):
+        self.instances[profile] = instance
+        try:
+            fd = os.pidfd_open(instance.pid)
+        except (AttributeError, OSError):
+            self.polled.add(profile)
+            return
+        self.pidfds[profile] = fd
+        self.server.watch(fd, lambda p=profile: self.on_exit(p))
+
+    def on_exit(self, profile):
+        fd = self.pidfds.pop(profile, None)
+        if fd is not None:
+            self.server.unwatch(fd)
+            os.close(fd)
+        self.polled.discard(profile)
+        instance = self.instances.pop(profile, None)
+        if instance is None:
+            return
+        instance.poll()
+        self.exit_history[profile] = (instance.returncode, instance.runtime())
+        self.registry.remove(profile)
+        self.terminator.forget(profile)
+        self.queue.mark_exited(profile)
+        self.telemetry.clear(profile)
+        self.server.publish("exited", profile=profile, code=instance.returncode, runtime=instance.runtime())
+        self.log(f"{profile}: exited ({instance.returncode})")
+
+    def pump(self):
+        """Spawn what the queue allows, escalate overdue stops. Return the delay before the next pass."""
+        while True:
+            item, queue_delay = self.queue.next_ready()
+            if item is None:
+                break
+            profile, uri = item
+            try:
+                instance = self.spawn(profile, uri)
+            except (OSError, ValueError) as e:
+                self.queue.mark_exited(profile)
+                self.server.publish("failed", profile=profile, error=str(e))
+                self.log(f"{profile}: failed to launch: {e}")
+                continue
+            self.track(profile, instance)
+            self.registry.add(profile, instance)
+            self.server.publish("launched", profile=profile, pid=instance.pid, uri=uri)
+            self.log(f"{profile}: launched (pid {instance.pid})")
+
+        for profile in self.terminator.escalate():
+            self.log(f"{profile}: killed")
+        for profile in list(self.polled):
+            if self.instances[profile].poll() is not None:
+                self.on_exit(profile)
+
+        delays = [d for d in (queue_delay, self.terminator.next_delay(), 1.0 if self.polled else None)
+                  if d is not None]
+        return min(delays) if delays else None
+
+    def serve_forever(self):
+        while True:
+            self.server.process(self.pump())
+
+    def close(self):
+        # The instances keep running, the registry lets the next agent find them
+        for fd in self.pidfds.values():
+            self.server.unwatch(fd)
+            os.close(fd)
+        self.pidfds.clear()
+        self.server.close()
+
+    def status_text(self, profile):
+        if self.terminator.is_stopping(profile):
+            return "Stopping"
+        if profile in self.instances:
+            return "Running"
+        if self.queue.is_queued(profile):
+            return "Queued"
+        if profile in self.exit_history:
+            return f"Exited ({self.exit_history[profile][0]})"
+        return ""
+
+    # ---- RPC ----
+
+    def select(self, profiles, candidates):
+        if isinstance(profiles, str):
+            profiles = [profiles]
+        try:
+            return select_profiles(candidates, profiles)
+        except ValueError as e:
+            raise RpcError(str(e))
+
+    def rpc_host(self):
+        samples = self.telemetry.sample({p: i.pid for p, i in self.instances.items()})
+        return host_stats(len(self.instances),
+                          sum(s["cpu"] for s in samples.values()) / 100,
+                          sum(s["rss"] for s in samples.values()))
+
+    def rpc_status(self, profiles=None):
+        candidates = scan_profiles(self.base_dir)
+        chosen = self.select(profiles, candidates) if profiles else candidates
+        status = {}
+        for profile in chosen:
+            instance = self.instances.get(profile)
+            last = self.telemetry.history.get(profile)
+            status[profile] = {
+                "running": instance is not None,
+                "pid": instance.pid if instance else None,
+                "uptime": instance.runtime() if instance else None,
+                "uri": instance.uri if instance else None,
+                "queued": self.queue.is_queued(profile),
+                "status": self.status_text(profile),
+                "cpu": last[-1]["cpu"] if last and instance else None,
+                "rss": last[-1]["rss"] if last and instance else None,
+            }
+        return status
+
+    def rpc_launch(self, profiles, place=None, uri=None, create=False):
+        if isinstance(profiles, str):
+            profiles = [profiles]
+        try:
+            uri = uri or place_uri(place)
+        except ValueError as e:
+            raise RpcError(str(e))
+        if create:
+            # Placement picks any host: a plain name missing here is created first
+            existing = set(scan_profiles(self.base_dir))
+            for name in profiles:
+                if name not in existing and not any(c in name for c in GLOB_CHARS):
+                    try:
+                        create_profile(self.base_dir, name, self.settings)
+                    except (CliError, OSError) as e:
+                        raise RpcError(f"can't create {name}: {e}")
+                    self.log(f"{name}: profile created")
+        chosen = self.select(profiles, scan_profiles(self.base_dir))
+        running = [p for p in chosen if p in self.instances]
+        queued = []
+        for profile in chosen:
+            if profile not in running and self.queue.enqueue(profile, uri):
+                queued.append(profile)
+        return {"queued": queued, "running": running}
+
+    def rpc_stop(self, profiles=(), all=False):
+        if all:
+            chosen = list(self.instances)
+        elif profiles:
+            chosen = self.select(profiles, sorted(self.instances, key=natural_sort_key))
+        else:
+            raise RpcError("name the profiles to stop, or pass all")
+        if chosen:
+            self.telemetry.table.refresh()
+            children = self.telemetry.table.children_map()
+        stopping = []
+        for profile in chosen:
+            pid = self.instances[profile].pid
+            if self.terminator.stop(profile, pid, self.telemetry.table.tree(pid, children)):
+                stopping.append(profile)
+        return {"stopping": stopping}
+
+
+# ---- launcher side ----
+
+class RemoteAgent:
+    """An agent registered in the launcher ("Agents" setting: name, address, token)."""
+
+    def __init__(self, name, address, token=None, timeout=5.0):
+        self.name = name
+        self.address = address
+        self.token = token or None
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls, entries):
+        agents = []
+        for entry in entries or []:
+            if isinstance(entry, dict) and entry.get("address"):
+                agents.append(cls(entry.get("name") or entry["address"], entry["address"], entry.get("token")))
+        return agents
+
+    def to_settings(self):
+        return {"name": self.name, "address": self.address, "token": self.token or ""}
+
+    def call(self, method, **params):
+        """One request on a fresh connection. Raises OSError when unreachable, RpcError on refusal."""
+        with ControlClient(self.address, self.timeout, self.token) as client:
+            return client.call(method, **params)
+
+
+def _each(agents, work):
+    """Run work(agent) for every agent at once: {name: (result, error message)}."""
+    def run(agent):
+        try:
+            return work(agent), ""
+        except (OSError, ValueError, RpcError) as e:
+            return None, str(e) or type(e).__name__
+    if not agents:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(len(agents), 16)) as pool:
+        return dict(zip((a.name for a in agents), pool.map(run, agents)))
+
+
+def poll_agents(agents):
+    """{name: {"host": host stats, "status": {profile: status}, "error": ""}} of every agent."""
+    results = _each(agents, lambda agent: (agent.call("host"), agent.call("status")))
+    return {name: {"host": value[0] if value else None, "status": value[1] if value else {}, "error": error}
+            for name, (value, error) in results.items()}
+
+
+def launch_across(agents, profiles, uri=None, cost=None, hosts=None):
+    """
+    Place profiles on the reachable agents by free CPU and memory and launch
+    them there. A profile an agent already has stays on such an agent; a new
+    one is created where it lands. `hosts` reuses a recent
+    poll_agents() result. Return ({agent: queued profiles}, unplaced, {agent: error}).
+    """
+    if hosts is None:
+        hosts = poll_agents(agents)
+    errors = {name: h["error"] for name, h in hosts.items() if h["error"]}
+    stats = {name: h["host"] for name, h in hosts.items() if not h["error"]}
+    # Already running somewhere: left where it is
+    running = {p for h in hosts.values() for p, s in h["status"].items() if s["running"] or s["queued"]}
+    homes = {}
+    for name, h in hosts.items():
+        for profile in h["status"]:
+            homes.setdefault(profile, []).append(name)
+    placed, unplaced = place([p for p in profiles if p not in running], stats, cost, homes)
+
+    groups = {}
+    for profile, name in placed.items():
+        groups.setdefault(name, []).append(profile)
+    chosen = [a for a in agents if a.name in groups]
+    results = _each(chosen, lambda agent: agent.call("launch", profiles=groups[agent.name], uri=uri, create=True))
+    queued = {}
+    for name, (result, error) in results.items():
+        if error:
+            errors[name] = error
+            unplaced.extend(groups[name])
+        else:
+            queued[name] = result["queued"]
+    return queued, unplaced, errors
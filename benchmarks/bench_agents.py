@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Several launch agents on localhost, driven the way the launcher drives them.
+
+Starts N `soberlauncher agent` processes (each with its own base directory,
+token and a stub `flatpak` that just sleeps, see tests/agent_stub.py), then
+times a poll of every host, the placement + launch of the profiles across
+them, the wait until every instance reported "launched", and a stop of
+everything. Placement and the events themselves are checked by
+tests/test_agents.py.
+
+    python3 benchmarks/bench_agents.py [-a 3] [-p 12]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from agent import poll_agents, launch_across  # noqa: E402
+from agent_stub import STUB_COST, stub_flatpak_env, start_agent, stop_agents, EventListener  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-a", "--agents", type=int, default=3)
+    parser.add_argument("-p", "--profiles", type=int, default=12)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = stub_flatpak_env(tmp)
+        procs, agents, listener = [], [], None
+        try:
+            for i in range(args.agents):
+                proc, agent = start_agent(tmp, i, env)
+                procs.append(proc)
+                agents.append(agent)
+            # Events of every agent, to know when the launches really happened
+            listener = EventListener(agents)
+
+            start = time.perf_counter()
+            hosts = poll_agents(agents)
+            poll_ms = (time.perf_counter() - start) * 1000
+
+            profiles = [f"Bot {i}" for i in range(1, args.profiles + 1)]
+            start = time.perf_counter()
+            queued, unplaced, errors = launch_across(agents, profiles, "roblox://experience?placeId=1818",
+                                                     STUB_COST, hosts)
+            place_ms = (time.perf_counter() - start) * 1000
+            expected = {(name, p) for name, group in queued.items() for p in group}
+            listener.wait("launched", expected)
+            launched_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            for agent in agents:
+                agent.call("stop", all=True)
+            listener.wait("exited", expected)
+            stop_ms = (time.perf_counter() - start) * 1000
+        finally:
+            if listener is not None:
+                listener.close()
+            stop_agents(procs)
+
+    print(f"{args.agents} agents on localhost, {args.profiles} profiles\n")
+    print(f"  {poll_ms:8.1f} ms  poll of every host (host + status)")
+    print(f"  {place_ms:8.1f} ms  placement + launch requests")
+    print(f"  {launched_ms:8.1f} ms  until every instance reported launched")
+    print(f"  {stop_ms:8.1f} ms  stop of everything until every exit was reported")
+    for name in sorted(queued):
+        print(f"  {name}: {len(queued[name])} instances")
+    if unplaced:
+        print(f"  unplaced: {', '.join(unplaced)}")
+    for name, error in errors.items():
+        print(f"  {name}: {error}")
+
+
+if __name__ == "__main__":
+    main()
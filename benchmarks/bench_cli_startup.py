@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Startup time of the headless CLI, checked against a budget.
+
+Runs `soberlauncher list` and `soberlauncher status` on a throwaway base
+directory, compares them with a bare `python3 -c pass`, and fails (exit 1)
+when a command's median is over the budget. That PyQt6 is never imported
+is checked by tests/test_cli.py.
+
+    python3 benchmarks/bench_cli_startup.py [-n 30] [--budget-ms 100]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests"))
+
+from cli_stub import ENTRY, make_workdir  # noqa: E402
+
+
+def measure(argv, runs, cwd):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=30)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_workdir(tmp)
+        baseline = measure([sys.executable, "-c", "pass"], args.runs, tmp)
+        results = {command: measure([sys.executable, ENTRY, command], args.runs, tmp)
+                   for command in ("list", "status")}
+
+    print(f"{args.runs} runs per command, 50 profiles, budget {args.budget_ms:g} ms\n")
+    print(f"  {'python3 -c pass':<22} median {baseline:7.1f} ms")
+    failed = False
+    for command, median in results.items():
+        over = median > args.budget_ms
+        failed |= over
+        print(f"  {'soberlauncher ' + command:<22} median {median:7.1f} ms"
+              f"   (+{median - baseline:.1f} ms over the interpreter){'  OVER BUDGET' if over else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Throughput of the control socket, and how long the event loop is held.
+
+The server runs the way the GUI drives it: a loop waits on its fd and calls
+process(0) once per wake-up. Client threads send "status" requests on 200
+profiles back to back; a subscriber receives an event per request. The
+longest process() call is what a Qt event loop would stall for.
+
+    python3 benchmarks/bench_control.py [-c 4] [-n 2000]
+"""
+
+import os
+import sys
+import time
+import select
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from control import ControlServer, ControlClient  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-c", "--clients", type=int, default=4)
+    parser.add_argument("-n", "--requests", type=int, default=2000, help="requests per client")
+    args = parser.parse_args()
+
+    status = {f"Bot {i}": {"running": True, "pid": 1000 + i, "uptime": 12.5, "uri": None,
+                           "queued": False, "status": "Running"} for i in range(200)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "control.sock")
+        server = None
+
+        def handle_status():
+            server.publish("status", profile="Bot 1", status="Running")
+            return status
+
+        server = ControlServer(path, {"status": handle_status})
+        stop = threading.Event()
+        longest = [0.0]
+
+        def loop():
+            while not stop.is_set():
+                if select.select([server.fileno()], [], [], 0.1)[0]:
+                    start = time.perf_counter()
+                    server.process(0)
+                    longest[0] = max(longest[0], time.perf_counter() - start)
+
+        threading.Thread(target=loop, daemon=True).start()
+
+        events = [0]
+        subscriber = ControlClient(path)
+
+        def listen():
+            try:
+                for _ in subscriber.events():
+                    events[0] += 1
+            except (OSError, ValueError):
+                pass
+
+        threading.Thread(target=listen, daemon=True).start()
+        time.sleep(0.1)
+
+        def work():
+            with ControlClient(path) as client:
+                for _ in range(args.requests):
+                    client.call("status")
+
+        workers = [threading.Thread(target=work) for _ in range(args.clients)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        time.sleep(0.2)
+        stop.set()
+        subscriber.close()
+        server.close()
+
+    total = args.clients * args.requests
+    print(f"{args.clients} clients x {args.requests} status requests (200 profiles each)\n")
+    print(f"  {total / elapsed:10.0f} requests/s")
+    print(f"  {events[0]:10d} events delivered to the subscriber")
+    print(f"  {longest[0] * 1000:10.2f} ms longest process() call (event loop held)")
+
+
+if __name__ == "__main__":
+    main()
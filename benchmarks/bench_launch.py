@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Spawn latency of the old shell launch path against launch_engine.
+
+A stub `flatpak` that exits at once is put first in PATH, so only the cost of
+starting the process chain is measured (sh + env + flatpak versus flatpak alone).
+
+    python3 benchmarks/bench_launch.py [-n 200]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from launch_engine import launch  # noqa: E402
+
+STUB = "#!/bin/sh\nexit 0\n"
+
+
+def shell_launch(profile_path):
+    # The command every launch button built before launch_engine
+    command = f'env HOME="{profile_path}" flatpak run org.vinegarhq.Sober'
+    return subprocess.Popen(command, shell=True)
+
+
+def measure(spawn, runs):
+    spawn_times, total_times = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = spawn()
+        spawned = time.perf_counter()
+        proc.wait()
+        done = time.perf_counter()
+        spawn_times.append((spawned - start) * 1000)
+        total_times.append((done - start) * 1000)
+    return spawn_times, total_times
+
+
+def describe(name, values):
+    values = sorted(values)
+    p95 = values[int(len(values) * 0.95) - 1]
+    return f"{name:<22} median {statistics.median(values):7.3f} ms   p95 {p95:7.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_dir = os.path.join(tmp, "bin")
+        base_dir = os.path.join(tmp, "profiles")
+        os.makedirs(bin_dir)
+        os.makedirs(os.path.join(base_dir, "Bench Profile", ".local"))
+        stub = os.path.join(bin_dir, "flatpak")
+        with open(stub, "w") as f:
+            f.write(STUB)
+        os.chmod(stub, 0o755)
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+
+        profile_path = os.path.join(base_dir, "Bench Profile")
+        results = {
+            "shell (sh + env)": measure(lambda: shell_launch(profile_path), args.runs),
+            "launch_engine": measure(lambda: launch(base_dir, "Bench Profile").proc, args.runs),
+        }
+
+    print(f"{args.runs} launches per path, stub flatpak\n")
+    print("Spawn (Popen returns):")
+    for name, (spawn_times, _) in results.items():
+        print("  " + describe(name, spawn_times))
+    print("Until exit (whole process chain):")
+    for name, (_, total_times) in results.items():
+        print("  " + describe(name, total_times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Log capture under a chatty client: throughput and memory.
+
+Runs N writers that flood stdout (and a bit of stderr) into the launcher's
+pipes, read the way the GUI reads them (poll on the fds, read() per
+wake-up). Reports the lines/s captured, the longest read() call (what the
+Qt event loop would stall for) and the memory the rings hold, which must
+stay the same whether the writers print 10k or 1M lines.
+
+    python3 benchmarks/bench_log_capture.py [-w 4] [-n 200000] [--file]
+"""
+
+import os
+import sys
+import time
+import select
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from instance_logs import LogCapture  # noqa: E402
+
+WRITER = (
+    "import sys\n"
+    "for i in range(%d):\n"
+    "    print('frame', i, 'render', 'x' * 60)\n"
+    "    if i %% 1000 == 0: print('warning', i, file=sys.stderr)\n"
+)
+
+
+def ring_bytes(capture):
+    return sum(sys.getsizeof(text) + 80 for ring in capture.rings.values() for _, _, _, text in ring.lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-w", "--writers", type=int, default=4)
+    parser.add_argument("-n", "--lines", type=int, default=200000, help="lines per writer")
+    parser.add_argument("--file", action="store_true", help="also write the rotated log files")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        capture = LogCapture({"to_file": args.file, "max_file_kb": 1024, "backups": 2})
+        procs = []
+        for i in range(args.writers):
+            out, err = capture.open(f"Bot {i}", os.path.join(tmp, f"Bot {i}", "sober.log"))
+            procs.append(subprocess.Popen([sys.executable, "-c", WRITER % args.lines], stdout=out, stderr=err))
+            capture.started(f"Bot {i}")
+
+        poller = select.poll()
+        for fd in capture.readers:
+            poller.register(fd, select.POLLIN)
+        open_fds = set(capture.readers)
+        longest = 0.0
+        start = time.perf_counter()
+        while open_fds:
+            for fd, _ in poller.poll(1000):
+                began = time.perf_counter()
+                alive = capture.read(fd)
+                longest = max(longest, time.perf_counter() - began)
+                if not alive:
+                    poller.unregister(fd)
+                    capture.release(fd)
+                    open_fds.discard(fd)
+        elapsed = time.perf_counter() - start
+        for proc in procs:
+            proc.wait()
+        files = sum(os.path.getsize(os.path.join(root, name))
+                    for root, _, names in os.walk(tmp) for name in names)
+
+    total = args.writers * (args.lines + args.lines // 1000 + 1)
+    kept = sum(len(ring.lines) for ring in capture.rings.values())
+    print(f"{args.writers} writers x {args.lines} lines{' (+ log files)' if args.file else ''}\n")
+    print(f"  {total / elapsed:12.0f} lines/s captured ({elapsed:.2f} s)")
+    print(f"  {longest * 1000:12.2f} ms longest read() call (event loop held)")
+    print(f"  {kept:12d} lines kept in the rings ({capture.settings['ring_lines']} per profile)")
+    print(f"  {ring_bytes(capture) / 1024 ** 2:12.1f} MB held by the rings (approx.)")
+    if args.file:
+        print(f"  {files / 1024 ** 2:12.1f} MB of log files on disk (rotated)")
+
+
+if __name__ == "__main__":
+    main()
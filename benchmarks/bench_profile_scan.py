@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Profile scanning: full scan against the persisted, inotify-driven index.
+
+Creates N profiles (and a few plain folders) in a throwaway base directory
+and times, per operation: the old full scan (scan_profiles), building the
+index, a start with the index already on disk, a refresh when nothing
+changed, a refresh after one new profile, and applying inotify events for
+an add, a rename and a removal.
+
+    python3 benchmarks/bench_profile_scan.py [-n 500] [-r 20]
+"""
+
+import os
+import sys
+import time
+import shutil
+import select
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profiles import scan_profiles  # noqa: E402
+from profile_index import ProfileIndex  # noqa: E402
+
+
+def timed(func, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def drain(index):
+    """Apply the pending events. Return (ms spent in process_events, diffs)."""
+    diffs, spent = [], 0.0
+    while select.select([index.fileno()], [], [], 0.05)[0]:
+        start = time.perf_counter()
+        diffs.append(index.process_events())
+        spent += time.perf_counter() - start
+    return spent * 1000, diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--profiles", type=int, default=500)
+    parser.add_argument("-r", "--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = os.path.join(tmp, "profiles")
+        for i in range(1, args.profiles + 1):
+            os.makedirs(os.path.join(base_dir, f"Bot {i}", ".local"))
+        for i in range(10):
+            os.makedirs(os.path.join(base_dir, f"folder {i}"))
+        state = os.path.join(tmp, "SL_Profiles.json")
+
+        results = [("full scan (scan_profiles)", timed(lambda: scan_profiles(base_dir), args.runs))]
+
+        def build():
+            if os.path.exists(state):
+                os.unlink(state)
+            ProfileIndex(state, base_dir).revalidate()
+        results.append(("index, first build", timed(build, args.runs)))
+        results.append(("index, start from disk", timed(lambda: ProfileIndex(state, base_dir).revalidate(), args.runs)))
+
+        index = ProfileIndex(state, base_dir)
+        index.revalidate()
+        results.append(("refresh, nothing changed", timed(index.revalidate, args.runs)))
+
+        counter = [0]
+
+        def add_then_refresh():
+            counter[0] += 1
+            os.makedirs(os.path.join(base_dir, f"New {counter[0]}", ".local"))
+            index.revalidate()
+        results.append(("refresh after one new profile", timed(add_then_refresh, args.runs)))
+        assert index.profiles() == scan_profiles(base_dir)
+
+        index.watch()
+        drain(index)
+
+        def event(change):
+            change()
+            return drain(index)
+        add_ms, _ = event(lambda: os.makedirs(os.path.join(base_dir, "Watched", ".local")))
+        rename_ms, diffs = event(lambda: os.rename(os.path.join(base_dir, "Watched"), os.path.join(base_dir, "Renamed")))
+        remove_ms, _ = event(lambda: shutil.rmtree(os.path.join(base_dir, "Renamed")))
+        index.close()
+        assert any(renamed for _, _, renamed in diffs), "rename not recognised"
+        assert index.profiles() == scan_profiles(base_dir)
+
+    print(f"{args.profiles} profiles, median of {args.runs} runs\n")
+    for label, ms in results:
+        print(f"  {label:<32} {ms:8.2f} ms")
+    print(f"  {'inotify: add':<32} {add_ms:8.2f} ms")
+    print(f"  {'inotify: rename':<32} {rename_ms:8.2f} ms")
+    print(f"  {'inotify: remove':<32} {remove_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Profile list with thousands of profiles: the model/view list under load.
+
+Starts the GUI offscreen on N throwaway profiles and times, per operation:
+the start, selecting every row and clearing the selection, typing a search
+and clearing it, sorting on a column, one status update, the uptime tick
+and a refresh that renames, removes and adds a profile. Needs PyQt6.
+
+    python3 benchmarks/bench_profile_view.py [-n 5000] [-r 5]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-n", "--profiles", type=int, default=5000)
+    parser.add_argument("-r", "--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = os.path.join(tmp, "profiles")
+        for i in range(1, args.profiles + 1):
+            os.makedirs(os.path.join(base_dir, f"Bot {i}", ".local"))
+        # Settings, profile index and control socket all in the throwaway directory
+        os.environ["XDG_RUNTIME_DIR"] = tmp
+        os.chdir(tmp)
+        with open("SL_Settings.json", "w", encoding="utf-8") as f:
+            json.dump({"last_directory": base_dir}, f)
+
+        from PyQt6.QtWidgets import QApplication
+        from PyQt6.QtCore import Qt
+        import SoberLauncher
+
+        app = QApplication(sys.argv)
+        start = time.perf_counter()
+        window = SoberLauncher.SoberLauncher()
+        window.show()
+        app.processEvents()
+        results = [("start", (time.perf_counter() - start) * 1000)]
+
+        def timed(label, func, reset=None):
+            times = []
+            for _ in range(args.runs):
+                if reset is not None:
+                    reset()
+                    app.processEvents()
+                began = time.perf_counter()
+                func()
+                app.processEvents()  # signals, deferred sort and repaint included
+                times.append((time.perf_counter() - began) * 1000)
+            results.append((label, statistics.median(times)))
+
+        view = window.profileList
+        timed("select all", view.selectAll, view.clearSelection)
+        assert len(window.selected_profiles) == args.profiles + 1
+        timed("clear selection", view.clearSelection, view.selectAll)
+        timed("search 'bot 12'", lambda: window.profileSearch.setText("bot 12"), lambda: window.profileSearch.setText(""))
+        timed("clear search", lambda: window.profileSearch.setText(""), lambda: window.profileSearch.setText("bot 12"))
+        timed("sort by status", lambda: view.sortByColumn(SoberLauncher.STATUS_COLUMN, Qt.SortOrder.DescendingOrder),
+              lambda: view.sortByColumn(SoberLauncher.PROFILE_COLUMN, Qt.SortOrder.AscendingOrder))
+        view.sortByColumn(SoberLauncher.PROFILE_COLUMN, Qt.SortOrder.AscendingOrder)
+
+        window.profileModel.row("Bot 7").started_at = time.time()
+        timed("status update (one row)", lambda: window.updateProfileStatus("Bot 7"))
+        window.profileModel.row("Bot 7").started_at = time.time()
+        timed("uptime tick", window.refreshUptime)
+
+        def change():
+            os.rename(os.path.join(base_dir, "Bot 2"), os.path.join(base_dir, "Bot 2b"))
+            shutil.rmtree(os.path.join(base_dir, "Bot 3"))
+            os.makedirs(os.path.join(base_dir, "Bot 0", ".local"))
+
+        def undo():
+            if not os.path.isdir(os.path.join(base_dir, "Bot 2b")):
+                return
+            os.rename(os.path.join(base_dir, "Bot 2b"), os.path.join(base_dir, "Bot 2"))
+            os.makedirs(os.path.join(base_dir, "Bot 3", ".local"))
+            shutil.rmtree(os.path.join(base_dir, "Bot 0"))
+            window.scanForProfiles()
+        timed("refresh: rename, remove, add", lambda: (change(), window.scanForProfiles()), undo)
+        window.close()
+
+    print(f"{args.profiles} profiles, median of {args.runs} runs\n")
+    for label, ms in results:
+        print(f"  {label:<30} {ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Updater download time and memory against a local stand-in for GitHub.
+
+Serves a fake "latest release" and its zip from tests/github_stub.py, which
+drops the connection partway through the first few requests, and measures
+a whole update: the time taken, the requests made, the bytes fetched twice
+and the peak Python memory, which must stay flat whatever the archive size.
+The behaviour itself (resume, If-Range, cancel, checksum) is checked by
+tests/test_update.py.
+
+    python3 benchmarks/bench_update.py [--mb 50] [--drops 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from update import Updater  # noqa: E402
+from github_stub import ReleaseServer, make_archive  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mb", type=int, default=50, help="size of the fake release")
+    parser.add_argument("--drops", type=int, default=3, help="connections cut short before the download completes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = make_archive(os.path.join(tmp, "release.zip"), args.mb)
+        server = ReleaseServer(archive, args.drops, len(archive) // (args.drops + 2))
+        install = os.path.join(tmp, "install")
+        os.makedirs(install)
+        try:
+            updater = Updater(f"{server.url}/api", install, os.path.join(tmp, "cache"), retry_delay=0.05)
+            release = updater.latest_release()
+            tracemalloc.start()
+            start = time.perf_counter()
+            replaced = updater.update(release)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        finally:
+            server.close()
+
+    statuses = [status for status, _ in server.requests]
+    print(f"{len(archive) / 1024 ** 2:.1f} MB release, {args.drops} connections cut\n")
+    print(f"  {elapsed:8.2f} s to download, verify and install ({replaced} files)")
+    print(f"  {len(statuses):8d} requests: {', '.join(map(str, statuses))} "
+          f"({server.bytes_sent - len(archive)} bytes fetched twice)")
+    print(f"  {peak / 1024 ** 2:8.2f} MB peak Python memory while updating")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Delta updates: only the changed files fetched, put in place atomically, rolled back.
+
+Serves releases from a local stand-in for GitHub (release API, repository
+tree, raw files, zipball) and updates a throwaway install through them:
+a first install, an update that changes, adds and removes a file, a
+failure halfway, the zipball fallback when the tree is unavailable, and
+rollbacks while another thread keeps reading the install. The settings and
+a profile folder kept in the install must never move, be linked into the
+previous version or be rolled back. Prints the bytes fetched and time taken
+by each step.
+
+    python3 benchmarks/bench_update_delta.py [--modules 40] [--mb 20] [--rollbacks 200]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import zipfile
+import argparse
+import tempfile
+import threading
+from urllib.parse import unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from update import Updater, UpdateError, RELEASE_MANIFEST, REMOVED_LIST  # noqa: E402
+
+REPO = "/repos/Taboulet/SoberLauncher"
+
+
+def git_sha(data):
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class Server:
+    """A release per tag ({path: bytes}); the latest one is served by the release API."""
+
+    def __init__(self):
+        self.releases = {}
+        self.latest = None
+        self.trees = True           # False: the tree API fails (rate limit), the zipball is used
+        self.corrupt = set()        # raw files served with the wrong content
+        self.requests = []          # (path, bytes sent)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, body=b""):
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.requests.append((self.path, len(body)))
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                files = server.releases[server.latest]
+                if path == f"{REPO}/releases/latest":
+                    return self.reply(200, json.dumps({
+                        "name": f"Release {server.latest}", "tag_name": server.latest,
+                        "zipball_url": f"{server.url}/zipball/{server.latest}", "assets": [],
+                    }).encode())
+                if path.startswith(f"{REPO}/git/trees/"):
+                    if not server.trees:
+                        return self.reply(403)
+                    tree = [{"path": name, "type": "blob", "sha": git_sha(data), "size": len(data),
+                             "mode": "100755" if name == "soberlauncher" else "100644"}
+                            for name, data in files.items()]
+                    return self.reply(200, json.dumps({"tree": tree, "truncated": False}).encode())
+                if path.startswith("/raw/"):
+                    name = unquote(path.split("/", 3)[3])
+                    data = files[name]
+                    return self.reply(200, data[::-1] if name in server.corrupt else data)
+                if path.startswith("/zipball/"):
+                    buffer = io.BytesIO()
+                    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+                        for name, data in files.items():
+                            archive.writestr(f"Taboulet-SoberLauncher-abc123/{name}", data)
+                    return self.reply(200, buffer.getvalue())
+                self.reply(404)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def fetched(self):
+        """Bytes of files fetched (raw files and archives) since the last call."""
+        sent = sum(size for path, size in self.requests if path.startswith(("/raw/", "/zipball/")))
+        files = [path for path, _ in self.requests if path.startswith("/raw/")]
+        self.requests.clear()
+        return sent, files
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def read(folder, name):
+    with open(os.path.join(folder, name), "rb") as f:
+        return f.read()
+
+
+def write(folder, name, data):
+    with open(os.path.join(folder, name), "wb") as f:
+        f.write(data)
+
+
+def listing(folder):
+    return sorted(os.path.relpath(os.path.join(root, name), folder)
+                  for root, _, names in os.walk(folder) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", type=int, default=40, help="Python files in the fake release")
+    parser.add_argument("--mb", type=int, default=20, help="size of a large unchanged file in the release")
+    parser.add_argument("--rollbacks", type=int, default=200)
+    args = parser.parse_args()
+
+    v1 = {"SoberLauncher.py": b"print('launcher v1')\n", "update.py": b"print('updater')\n",
+          "soberlauncher": b"#!/usr/bin/env python3\n", "old_module.py": b"OLD = 1\n",
+          "assets/blob.bin": os.urandom(args.mb * 1024 * 1024)}
+    v1.update({f"module_{i}.py": os.urandom(20000).hex().encode() for i in range(args.modules)})
+    v2 = dict(v1, **{"SoberLauncher.py": b"print('launcher v2')\n", "new_module.py": b"NEW = 2\n"})
+    del v2["old_module.py"]
+    v3 = dict(v2, **{"module_0.py": b"# v3\n", "module_1.py": b"# v3 too\n"})
+
+    results = []
+    server = Server()
+    server.releases = {"v1": v1, "v2": v2, "v3": v3}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            install = os.path.join(tmp, "SoberLauncher")
+            # Not part of any release: settings and a base_dir kept in the install
+            profile_file = os.path.join("profiles", "Bot 1", "data.bin")
+            os.makedirs(os.path.join(install, "profiles", "Bot 1"))
+            write(install, "SL_Settings.json", b"{}")
+            write(install, profile_file, os.urandom(1024 * 1024))
+            settings = os.path.join(install, "SL_Settings.json")
+            kept = {name: os.stat(os.path.join(install, name)).st_ino for name in ("SL_Settings.json", profile_file)}
+
+            def untouched():
+                for name, ino in kept.items():
+                    st = os.stat(os.path.join(install, name))
+                    assert st.st_ino == ino and st.st_nlink == 1, f"{name} moved or linked"
+
+            updater = Updater(f"{server.url}{REPO}/releases/latest", install, os.path.join(tmp, "cache"),
+                              retry_delay=0.01, raw_url=f"{server.url}/raw")
+
+            def step(label, tag):
+                server.latest = tag
+                server.requests.clear()
+                start = time.perf_counter()
+                replaced = updater.update(updater.latest_release())
+                elapsed = time.perf_counter() - start
+                sent, files = server.fetched()
+                results.append((label, replaced, sent, elapsed))
+                return files
+
+            # First install: everything fetched
+            step("first install (v1)", "v1")
+            assert all(read(install, name) == data for name, data in v1.items())
+            assert os.stat(os.path.join(install, "soberlauncher")).st_mode & 0o111
+
+            # v2: one file changed, one added, one removed; the install directory itself stays
+            before = os.stat(install).st_ino
+            blob = os.stat(os.path.join(install, "assets", "blob.bin")).st_ino
+            files = step("delta update (v2)", "v2")
+            assert sorted(files) == ["/raw/v2/SoberLauncher.py", "/raw/v2/new_module.py"], files
+            assert read(install, "SoberLauncher.py") == v2["SoberLauncher.py"]
+            assert not os.path.exists(os.path.join(install, "old_module.py")), "dropped file kept"
+            assert os.stat(install).st_ino == before, "install directory replaced"
+            assert os.stat(os.path.join(install, "assets", "blob.bin")).st_ino == blob, "unchanged file touched"
+            untouched()
+            # The previous version only holds the files the update replaced or deleted
+            assert listing(updater.previous_dir) == sorted(["SoberLauncher.py", "old_module.py", RELEASE_MANIFEST,
+                                                            REMOVED_LIST]), listing(updater.previous_dir)
+            assert read(updater.previous_dir, "SoberLauncher.py") == v1["SoberLauncher.py"]
+            # The launcher keeps saving its settings where they were
+            write(install, "SL_Settings.json", b'{"saved": "after v2"}')
+
+            # Nothing new: nothing fetched, nothing touched
+            manifest = os.stat(os.path.join(install, RELEASE_MANIFEST)).st_ino
+            assert step("already up to date", "v2") == [] and results[-1][1] == 0
+            assert os.stat(os.path.join(install, RELEASE_MANIFEST)).st_ino == manifest
+
+            # v3 fails halfway (the second changed file doesn't match its hash): install untouched
+            server.latest = "v3"
+            server.corrupt = {"module_1.py"}
+            try:
+                updater.update(updater.latest_release())
+                raise AssertionError("corrupt file installed")
+            except UpdateError as e:
+                assert "module_1.py" in str(e)
+            assert os.stat(os.path.join(install, RELEASE_MANIFEST)).st_ino == manifest
+            assert read(install, "module_0.py") == v2["module_0.py"]
+            assert not os.path.exists(updater.staging_dir), "staging left behind"
+            assert read(updater.previous_dir, "SoberLauncher.py") == v1["SoberLauncher.py"]
+            server.corrupt.clear()
+
+            # No tree (API rate limit): the zipball, but still only the changed files replaced
+            server.trees = False
+            step("zipball fallback (v3)", "v3")
+            assert results[-1][1] == 2 and read(install, "module_1.py") == v3["module_1.py"]
+            assert json.loads(read(install, RELEASE_MANIFEST))["tag"] == "v3"
+            server.trees = True
+
+            # Rollbacks while another thread keeps opening a file of the install
+            assert updater.rollback() == "Release v2"
+            assert read(install, "module_1.py") == v2["module_1.py"]
+            assert read(install, "SoberLauncher.py") == v2["SoberLauncher.py"]
+            assert read(install, "SL_Settings.json") == b'{"saved": "after v2"}', "settings rolled back"
+            untouched()
+            missing = [0]
+            stop = threading.Event()
+
+            def reader():
+                while not stop.is_set():
+                    try:
+                        read(install, "SoberLauncher.py")
+                    except FileNotFoundError:
+                        missing[0] += 1
+            thread = threading.Thread(target=reader)
+            thread.start()
+            start = time.perf_counter()
+            for _ in range(args.rollbacks):
+                updater.rollback()
+            rollback_ms = (time.perf_counter() - start) * 1000 / args.rollbacks
+            stop.set()
+            thread.join()
+            assert missing[0] == 0, f"install missing {missing[0]} times during the swaps"
+            assert read(install, "module_1.py") == (v2 if args.rollbacks % 2 == 0 else v3)["module_1.py"]
+            assert os.path.realpath(settings) == settings and os.stat(install).st_ino == before
+            untouched()
+
+            # Back to nothing installed: every release file goes, the rest stays
+            updater = Updater(f"{server.url}{REPO}/releases/latest", os.path.join(tmp, "fresh"),
+                              os.path.join(tmp, "cache"), retry_delay=0.01, raw_url=f"{server.url}/raw")
+            os.makedirs(updater.install_dir)
+            write(updater.install_dir, "SL_Settings.json", b"{}")
+            server.latest = "v1"
+            updater.update(updater.latest_release())
+            updater.rollback()
+            assert listing(updater.install_dir) == ["SL_Settings.json"], listing(updater.install_dir)
+    finally:
+        server.close()
+
+    full = sum(map(len, v1.values()))
+    print(f"{len(v1)} files, {full / 1024 ** 2:.1f} MB release\n")
+    for label, replaced, sent, elapsed in results:
+        print(f"  {label:<24} {replaced:4d} files replaced {sent:12,d} bytes fetched {elapsed * 1000:8.1f} ms")
+    print(f"  {'rollback':<24} {rollback_ms:8.3f} ms each, install never missing for a reader "
+          f"({args.rollbacks} swaps)")
+    print("  failure halfway left the install untouched")
+    print("  settings and profiles in the install never moved, linked or rolled back")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+
+from profiles import MAIN_PROFILE, sober_data_dir
+from instance_registry import running_profiles
+
+# Regenerable folders, relative to SOBER_DATA_SUBDIR. Overridable with "GCPaths".
+DEFAULT_EVICTABLE_SUBPATHS = [
+    "cache",
+    os.path.join("data", "sober", "sober_logs"),
+    os.path.join("data", "sober", "crashpad"),
+]
+
+
+def plan_eviction(index, base_dir, profiles, last_launched, used_bytes, budget_bytes,
+                  is_running, subpaths=DEFAULT_EVICTABLE_SUBPATHS):
+    """
+    Pick cache folders to empty until used_bytes fits in budget_bytes.
+    Least recently launched profiles go first (never launched ones before all).
+    Never picked: Main Profile (the user's own HOME), profiles is_running()
+    reports and profiles a Sober started elsewhere runs on (found in /proc).
+    Sizes come from the DiskUsageIndex, so it must have scanned the profiles.
+    Return [(profile, path, bytes)].
+    """
+    if budget_bytes <= 0 or used_bytes <= budget_bytes:
+        return []
+    plan = []
+    excess = used_bytes - budget_bytes
+    busy = running_profiles(base_dir)
+    for profile in sorted(profiles, key=lambda p: last_launched.get(p, 0)):
+        if profile == MAIN_PROFILE or profile in busy or is_running(profile):
+            continue
+        for subpath in subpaths:
+            path = os.path.join(sober_data_dir(base_dir, profile), subpath)
+            if os.path.islink(path) or not os.path.isdir(path):
+                continue
+            size = index.size(path)
+            if size <= 0:
+                continue
+            plan.append((profile, path, size))
+            excess -= size
+            if excess <= 0:
+                return plan
+    return plan
+
+
+def evict(plan, is_running, base_dir):
+    """Empty the planned folders (the folders themselves are kept). Return freed bytes."""
+    freed = 0
+    busy = running_profiles(base_dir)
+    for profile, path, size in plan:
+        # The profile may have been launched since the plan was made, by us or not
+        if profile == MAIN_PROFILE or profile in busy or is_running(profile):
+            continue
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    try:
+                        os.unlink(entry.path)
+                    except OSError:
+                        pass
+        freed += size
+    return freed
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Headless front end of the launcher: the same profiles, launch path and
+instance registry as the GUI, without importing PyQt6.
+
+    soberlauncher list
+    soberlauncher launch "Bot *" 3 --place 1818
+    soberlauncher status --json
+    soberlauncher stop --all
+    soberlauncher create "Bot 31" --copy-main --shared
+    soberlauncher agent --listen 0.0.0.0:7421 --token <secret>
+
+When the GUI launcher is running, launch, stop and status go through its
+control socket (control.py) instead of touching the instances behind its
+back; --local bypasses it. Heavy modules are imported by the command that
+needs them, so a command starts in a few tens of milliseconds.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+from profiles import MAIN_PROFILE, scan_profiles, natural_sort_key, select_profiles, place_uri, format_uptime
+
+SETTINGS_NAME = "SL_Settings.json"
+REGISTRY_NAME = "SL_Instances.json"
+
+
+class CliError(Exception):
+    pass
+
+
+def find_settings(path=None):
+    """SL_Settings.json: the given path, else the working directory (like the GUI), else next to the launcher."""
+    if path:
+        return os.path.abspath(path)
+    here = os.path.abspath(SETTINGS_NAME)
+    if os.path.exists(here):
+        return here
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), SETTINGS_NAME)
+
+
+def load_settings(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class Context:
+    def __init__(self, args):
+        self.settings_path = find_settings(args.settings)
+        self.settings = load_settings(self.settings_path)
+        self.base_dir = args.base_dir or self.settings.get("last_directory")
+        self.local = args.local
+        self._registry = None
+
+    def launcher(self):
+        """Client to the running GUI launcher (control socket), None if there is none or with --local."""
+        if self.local:
+            return None
+        from control import connect
+        return connect()
+
+    def require_base_dir(self):
+        if not self.base_dir or not os.path.isdir(self.base_dir):
+            raise CliError("no base directory: pick one in the launcher or pass --base-dir")
+        return self.base_dir
+
+    @property
+    def registry(self):
+        if self._registry is None:
+            from instance_registry import InstanceRegistry
+            self._registry = InstanceRegistry(
+                os.path.join(os.path.dirname(self.settings_path), REGISTRY_NAME)
+            )
+        return self._registry
+
+    def running(self):
+        return self.registry.discover(self.base_dir)
+
+
+def cmd_list(ctx, args):
+    profiles = scan_profiles(ctx.base_dir)
+    running = ctx.running()
+    if args.json:
+        print(json.dumps([{"profile": p, "running": p in running} for p in profiles]))
+        return 0
+    for profile in profiles:
+        print(f"{profile}\trunning" if profile in running else profile)
+    return 0
+
+
+def cmd_status(ctx, args):
+    client = ctx.launcher()
+    if client is not None:
+        # The GUI owns the instances: ask it, it also knows the queued and stopping ones
+        with client:
+            status = client.call("status")
+        if args.json:
+            print(json.dumps({p: s for p, s in status.items() if s["running"] or s["queued"]}))
+            return 0
+        shown = [p for p, s in status.items() if s["running"] or s["queued"]]
+        if not shown:
+            print("No instance running.")
+        for profile in shown:
+            s = status[profile]
+            pid = f"pid {s['pid']}\tup {format_uptime(s['uptime'])}" if s["running"] else "queued"
+            print(f"{profile}\t{pid}\t{s['status']}\t{s['uri'] or ''}".rstrip())
+        return 0
+
+    running = ctx.running()
+    if args.json:
+        print(json.dumps({p: {"pid": i.pid, "uptime": i.runtime(), "uri": i.uri} for p, i in running.items()}))
+        return 0
+    if not running:
+        print("No instance running.")
+    for profile in sorted(running, key=natural_sort_key):
+        instance = running[profile]
+        print(f"{profile}\tpid {instance.pid}\tup {format_uptime(instance.runtime())}\t{instance.uri or ''}".rstrip())
+    return 0
+
+
+def local_spawner(settings, base_dir):
+    """
+    spawn(profile, uri) -> Instance with the resource limits and memory merging
+    of the settings, for the CLI and the launch agent. Raises OSError/ValueError.
+    """
+    import subprocess
+    from launch_engine import launch
+    from resource_limits import CpuSpreader, effective_limits, plan_limits
+
+    defaults = settings.get("ResourceDefaults") or {}
+    overrides = settings.get("ResourceProfiles") or {}
+    spreader = CpuSpreader()
+    memory_merge = bool(settings.get("MemoryMerge"))
+
+    def spawn(profile, uri):
+        plan = plan_limits(profile, effective_limits(defaults, overrides.get(profile)), spreader)
+        if memory_merge:
+            from ksm import ksm_status
+            if ksm_status()[0]:
+                plan.merge_memory()
+        # The instances outlive the command: they must not hold the terminal (or cron's pipe)
+        return launch(base_dir, profile, uri, plan.prefix, stdout=subprocess.DEVNULL,
+                      stderr=subprocess.DEVNULL)
+
+    return spawn
+
+
+def launch_local(ctx, items):
+    """Launch (profile, uri) pairs here, through the launch queue. Return the profiles that failed."""
+    from launch_queue import LaunchQueue
+
+    spawner = local_spawner(ctx.settings, ctx.require_base_dir())
+    queue = LaunchQueue(ctx.settings.get("LaunchQueue") or {})
+    for profile, uri in items:
+        queue.enqueue(profile, uri)
+    failed = []
+
+    def spawn(profile, uri):
+        try:
+            instance = spawner(profile, uri)
+        except (OSError, ValueError) as e:
+            failed.append(profile)
+            print(f"{profile}: failed to launch: {e}", file=sys.stderr)
+            return
+        ctx.registry.add(profile, instance)
+        print(f"{profile}: launched (pid {instance.pid})")
+
+    queue.drain(spawn)
+    return failed
+
+
+def stop_local(ctx, instances, timeout=None):
+    """Stop {profile: Instance} here within one timeout window."""
+    from telemetry import ProcessTable
+    from terminate import terminate_all, DEFAULT_STOP_TIMEOUT
+
+    table = ProcessTable()
+    table.refresh()
+    children = table.children_map()
+    trees = {p: table.tree(i.pid, children) for p, i in instances.items()}
+    if timeout is None:
+        timeout = float(ctx.settings.get("StopTimeout", DEFAULT_STOP_TIMEOUT))
+    killed = terminate_all(instances, timeout, trees)
+    for profile in instances:
+        ctx.registry.entries.pop(profile, None)
+        print(f"{profile}: {'killed' if profile in killed else 'stopped'}")
+    ctx.registry.save()
+
+
+def cmd_launch(ctx, args):
+    client = ctx.launcher()
+    if client is not None:
+        with client:
+            result = client.call("launch", profiles=args.profiles, place=args.place)
+        for profile in result["running"]:
+            print(f"{profile}: already running")
+        for profile in result["queued"]:
+            print(f"{profile}: queued in the launcher")
+        return 0
+
+    uri = place_uri(args.place)
+    profiles = select_profiles(scan_profiles(ctx.require_base_dir()), args.profiles)
+    running = ctx.running()
+    for profile in profiles:
+        if profile in running:
+            print(f"{profile}: already running (pid {running[profile].pid})")
+    failed = launch_local(ctx, [(p, uri) for p in profiles if p not in running])
+    return 1 if failed else 0
+
+
+def cmd_stop(ctx, args):
+    if not args.all and not args.profiles:
+        raise CliError("name the profiles to stop, or pass --all")
+    client = ctx.launcher()
+    if client is not None:
+        with client:
+            result = client.call("stop", profiles=args.profiles, all=args.all)
+        for profile in result["stopping"]:
+            print(f"{profile}: stopping")
+        if not result["stopping"]:
+            print("No instance running.")
+        return 0
+
+    running = ctx.running()
+    if args.all:
+        chosen = list(running)
+    else:
+        chosen = select_profiles(sorted(running, key=natural_sort_key), args.profiles)
+    if not chosen:
+        print("No instance running.")
+        return 0
+    stop_local(ctx, {p: running[p] for p in chosen}, args.timeout)
+    return 0
+
+
+def cmd_fleet(ctx, args):
+    from fleet import FleetError, load_spec, desired_state, reconcile
+
+    path = os.path.abspath(args.file)
+    servers = []
+    for item in ctx.settings.get("PrivateServers") or []:
+        if isinstance(item, dict) and "name" in item and "parameter" in item:
+            servers.append((item["name"], item["parameter"]))
+        elif isinstance(item, (list, tuple)) and len(item) == 2:
+            servers.append(tuple(item))
+    try:
+        rules = load_spec(path, servers)
+    except FleetError as e:
+        raise CliError(str(e))
+
+    client = ctx.launcher()
+    if args.follow:
+        if client is None:
+            raise CliError("--follow needs the launcher running (it keeps the fleet up)")
+        with client:
+            result = client.call("fleet", path=path)
+        print(f"The launcher now follows {result['path']}")
+        return 0
+
+    if client is not None:
+        status = client.call("status")
+        profiles = list(status)
+        running = {p: s["uri"] for p, s in status.items() if s["running"]}
+        busy = {p for p, s in status.items() if s["queued"] or s["status"] in ("Stopping", "Restarting")}
+        instances = None
+    else:
+        profiles = scan_profiles(ctx.require_base_dir())
+        instances = ctx.running()
+        running = {p: i.uri for p, i in instances.items()}
+        busy = ()
+    start, stop, restart = reconcile(desired_state(rules, profiles), running, busy)
+
+    for profile in stop:
+        print(f"stop     {profile}")
+    for profile, uri in restart:
+        print(f"restart  {profile} -> {uri or 'home'}")
+    for profile, uri in start:
+        print(f"start    {profile} -> {uri or 'home'}")
+    if not (start or stop or restart):
+        print("The fleet is up to date.")
+    if args.dry_run:
+        if client is not None:
+            client.close()
+        return 0
+
+    if client is not None:
+        with client:
+            if stop:
+                client.call("stop", profiles=stop)
+            for profile, uri in restart:
+                client.call("stop", profiles=[profile], restart=True, uri=uri)
+            by_uri = {}
+            for profile, uri in start:
+                by_uri.setdefault(uri, []).append(profile)
+            for uri, group in by_uri.items():
+                client.call("launch", profiles=group, uri=uri)
+        return 0
+
+    to_stop = stop + [p for p, _ in restart]
+    if to_stop:
+        stop_local(ctx, {p: instances[p] for p in to_stop})
+    failed = launch_local(ctx, start + restart)
+    return 1 if failed else 0
+
+
+def create_profile(base_dir, name, settings, copy_main=False, shared=None):
+    """Create a profile folder, optionally with the main profile's game files. Return the copier, if any."""
+    name = name.strip()
+    if not name or name == MAIN_PROFILE or os.sep in name or name.startswith("."):
+        raise CliError(f"invalid profile name: {name}")
+    os.makedirs(os.path.join(base_dir, name, ".local"), exist_ok=True)
+
+    shared_paths = settings.get("SharedLayerPaths") or None
+    use_shared = shared if shared is not None else bool(settings.get("SharedLayer"))
+    if use_shared:
+        from shared_layer import DEFAULT_SHARED_SUBPATHS, SharedLayerError, check_subpaths
+        try:
+            shared_paths = check_subpaths(shared_paths or DEFAULT_SHARED_SUBPATHS)
+        except SharedLayerError as e:
+            raise CliError(f"SharedLayerPaths in SL_Settings.json: {e}")
+    copier = None
+    if copy_main:
+        from profiles import ACCOUNT_DATA_SUBPATHS, sober_data_dir
+        from profile_copy import copy_profile_tree
+        src = sober_data_dir(base_dir, MAIN_PROFILE)
+        if not os.path.isdir(src):
+            raise CliError(f"main profile folder not found: {src}")
+        skip = tuple(ACCOUNT_DATA_SUBPATHS) + (tuple(shared_paths) if use_shared else ())
+        copier = copy_profile_tree(src, sober_data_dir(base_dir, name), skip)
+    if use_shared:
+        from shared_layer import link_profile
+        link_profile(base_dir, name, shared_paths)
+    return copier
+
+
+def cmd_create(ctx, args):
+    copier = create_profile(ctx.require_base_dir(), args.name, ctx.settings, args.copy_main, args.shared)
+    if copier is not None:
+        print(f"{copier.reflinked} reflinked, {copier.hardlinked} hardlinked, {copier.copied} copied")
+    print(f"Profile '{args.name.strip()}' created.")
+    return 0
+
+
+def cmd_agent(ctx, args):
+    from agent import Agent, DEFAULT_AGENT_PORT
+    from control import is_loopback
+
+    address = args.listen or f"127.0.0.1:{DEFAULT_AGENT_PORT}"
+    token = args.token or os.environ.get("SOBERLAUNCHER_TOKEN") or None
+    if not token and not is_loopback(address):
+        raise CliError("an agent listening beyond this machine needs a token (--token or SOBERLAUNCHER_TOKEN)")
+    try:
+        agent = Agent(address, ctx.require_base_dir(), ctx.settings, token,
+                      log=lambda message: print(message, flush=True))
+    except OSError as e:
+        raise CliError(f"can't listen on {address}: {e.strerror or e}")
+    print(f"Agent listening on {agent.server.address}", flush=True)
+    try:
+        agent.serve_forever()
+    finally:
+        agent.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="soberlauncher", description="Run Sober profiles without the GUI.")
+    parser.add_argument("--settings", help=f"settings file (default: {SETTINGS_NAME})")
+    parser.add_argument("--base-dir", help="folder holding the profiles (default: the launcher's)")
+    parser.add_argument("--local", action="store_true",
+                        help="act on the instances directly even when the launcher is running")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("list", help="list the profiles")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_list)
+
+    p = commands.add_parser("status", help="show the running instances")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_status)
+
+    p = commands.add_parser("launch", help="launch profiles through the launch queue")
+    p.add_argument("profiles", nargs="+", help="profile names or globs")
+    p.add_argument("--place", help="place id or game link")
+    p.set_defaults(func=cmd_launch)
+
+    p = commands.add_parser("stop", help="stop instances (SIGTERM, then SIGKILL after the timeout)")
+    p.add_argument("profiles", nargs="*", help="profile names or globs")
+    p.add_argument("--all", action="store_true", help="stop every running instance")
+    p.add_argument("--timeout", type=float, help="seconds before SIGKILL (default: StopTimeout)")
+    p.set_defaults(func=cmd_stop)
+
+    p = commands.add_parser("fleet", help="bring the instances in line with a fleet file (see fleet.py)")
+    p.add_argument("file")
+    p.add_argument("--dry-run", action="store_true", help="only show what would change")
+    p.add_argument("--follow", action="store_true", help="make the running launcher follow the file")
+    p.set_defaults(func=cmd_fleet)
+
+    p = commands.add_parser("agent", help="serve launch/stop/status to a launcher on another machine")
+    p.add_argument("--listen", metavar="HOST:PORT", help="address to listen on (default: 127.0.0.1:7421)")
+    p.add_argument("--token", help="secret the launcher must send (default: $SOBERLAUNCHER_TOKEN)")
+    p.set_defaults(func=cmd_agent)
+
+    p = commands.add_parser("create", help="create a profile")
+    p.add_argument("name")
+    p.add_argument("--copy-main", action="store_true", help="copy the main profile's game files")
+    shared = p.add_mutually_exclusive_group()
+    shared.add_argument("--shared", dest="shared", action="store_true", default=None,
+                        help="link the shared game files")
+    shared.add_argument("--no-shared", dest="shared", action="store_false")
+    p.set_defaults(func=cmd_create)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(Context(args), args)
+    except (CliError, ValueError) as e:
+        print(f"soberlauncher: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        # control is only imported by the commands that talk to the launcher
+        control = sys.modules.get("control")
+        if control is None or not isinstance(e, control.RpcError):
+            raise
+        print(f"soberlauncher: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Local control socket of a running launcher: JSON-RPC 2.0 over a Unix domain
+socket, one JSON object per line.
+
+    -> {"jsonrpc": "2.0", "id": 1, "method": "launch", "params": {"profiles": ["Bot *"], "place": "1818"}}
+    <- {"jsonrpc": "2.0", "id": 1, "result": {"queued": ["Bot 1", "Bot 2"]}}
+    -> {"jsonrpc": "2.0", "id": 2, "method": "subscribe"}
+    <- {"jsonrpc": "2.0", "method": "event", "params": {"event": "exited", "profile": "Bot 1", ...}}
+
+The server never blocks: every socket is non-blocking and registered in one
+selector, whose own fd can be watched by an event loop (a QSocketNotifier in
+the GUI) or waited on with serve_forever().
+
+An address is a socket path, or "host:port" for TCP (launch agents, see
+agent.py). A server given a token only answers clients that sent it first
+with the "auth" method.
+"""
+
+import os
+import hmac
+import json
+import socket
+import selectors
+
+SOCKET_NAME = "soberlauncher.sock"
+MAX_LINE = 1024 * 1024          # a longer request closes the connection
+MAX_PENDING_OUTPUT = 16 * 1024 * 1024  # a subscriber that stops reading is dropped
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+UNAUTHORIZED = -32001
+
+
+class RpcError(Exception):
+    def __init__(self, message, code=INVALID_PARAMS):
+        super().__init__(message)
+        self.code = code
+
+
+def socket_path(name=SOCKET_NAME):
+    """$XDG_RUNTIME_DIR/soberlauncher.sock (private to the user), else a per-user file in /tmp."""
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, name)
+    return os.path.join("/tmp", f"{name}-{os.getuid()}")
+
+
+def parse_address(address):
+    """(family, sockaddr) of a socket path or a "host:port" TCP address."""
+    if os.sep in address or ":" not in address:
+        return socket.AF_UNIX, address
+    host, _, port = address.rpartition(":")
+    try:
+        return socket.AF_INET6 if ":" in host.strip("[]") else socket.AF_INET, (host.strip("[]"), int(port))
+    except ValueError:
+        raise ValueError(f"invalid address: {address}")
+
+
+def is_loopback(address):
+    family, sockaddr = parse_address(address)
+    return family == socket.AF_UNIX or sockaddr[0] in ("localhost", "127.0.0.1", "::1")
+
+
+class _Client:
+    def __init__(self, sock, authed):
+        self.sock = sock
+        self.inbuf = bytearray()
+        self.outbuf = bytearray()
+        self.subscribed = False
+        self.authed = authed
+
+
+class ControlServer:
+    """
+    Non-blocking JSON-RPC server. `handlers` maps method names to
+    callables taking the params as keyword arguments (or one list) and
+    returning a JSON-serialisable result; they raise RpcError for bad input.
+    "subscribe" and "unsubscribe" are built in, events go out with publish().
+    """
+
+    def __init__(self, path, handlers, token=None):
+        self.path = path
+        self.handlers = dict(handlers)
+        self.token = token
+        self.clients = {}   # fd -> _Client
+        self.watched = {}   # fd -> callback, see watch()
+        self.selector = selectors.DefaultSelector()
+        self.family, sockaddr = parse_address(path)
+        self.listener = self._listen(sockaddr) if self.family == socket.AF_UNIX else self._listen_tcp(sockaddr)
+        self.selector.register(self.listener, selectors.EVENT_READ)
+
+    def _listen_tcp(self, sockaddr):
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(sockaddr)
+        sock.listen(64)
+        sock.setblocking(False)
+        return sock
+
+    @property
+    def address(self):
+        """The bound address ("host:port" once a TCP port 0 got its real port)."""
+        if self.family == socket.AF_UNIX:
+            return self.path
+        host, port = self.listener.getsockname()[:2]
+        return f"[{host}]:{port}" if self.family == socket.AF_INET6 else f"{host}:{port}"
+
+    def watch(self, fd, callback):
+        """Call callback() when fd becomes readable (pidfds of an agent's instances)."""
+        self.watched[fd] = callback
+        self.selector.register(fd, selectors.EVENT_READ)
+
+    def unwatch(self, fd):
+        if self.watched.pop(fd, None) is not None:
+            self.selector.unregister(fd)
+
+    @staticmethod
+    def _listen(path):
+        if os.path.exists(path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+            except OSError:
+                os.unlink(path)  # left behind by a launcher that died
+            else:
+                raise OSError(f"another launcher is listening on {path}")
+            finally:
+                probe.close()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(path)
+        finally:
+            os.umask(old_umask)
+        sock.listen(64)
+        sock.setblocking(False)
+        return sock
+
+    def fileno(self):
+        """fd that becomes readable when process() has work (epoll/kqueue fd, or the listener)."""
+        try:
+            return self.selector.fileno()
+        except AttributeError:
+            return self.listener.fileno()
+
+    def process(self, timeout=0):
+        """Serve whatever is ready. Return the number of events handled."""
+        events = self.selector.select(timeout)
+        for key, mask in events:
+            if key.fileobj is self.listener:
+                self._accept()
+                continue
+            if key.fd in self.watched:
+                self.watched[key.fd]()
+                continue
+            client = self.clients.get(key.fd)
+            if client is None:
+                continue
+            if mask & selectors.EVENT_READ:
+                self._read(client)
+            if key.fd in self.clients and mask & selectors.EVENT_WRITE:
+                self._flush(client)
+        return len(events)
+
+    def serve_forever(self):
+        while True:
+            self.process(None)
+
+    def close(self):
+        for client in list(self.clients.values()):
+            self._drop(client)
+        self.selector.unregister(self.listener)
+        self.listener.close()
+        self.selector.close()
+        if self.family == socket.AF_UNIX:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    # ---- events ----
+
+    def has_subscribers(self):
+        return any(client.subscribed and client.authed for client in self.clients.values())
+
+    def publish(self, event, **data):
+        """Send an event notification to every subscribed client."""
+        if not self.has_subscribers():
+            return
+        line = self._encode({"jsonrpc": "2.0", "method": "event", "params": dict(data, event=event)})
+        for client in list(self.clients.values()):
+            if client.subscribed and client.authed:
+                self._send(client, line)
+
+    # ---- connections ----
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            sock.setblocking(False)
+            if self.family != socket.AF_UNIX:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            client = _Client(sock, self.token is None)
+            self.clients[sock.fileno()] = client
+            self.selector.register(sock, selectors.EVENT_READ)
+
+    def _drop(self, client):
+        fd = client.sock.fileno()
+        self.clients.pop(fd, None)
+        try:
+            self.selector.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        client.sock.close()
+
+    def _read(self, client):
+        while True:
+            try:
+                data = client.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                self._drop(client)
+                return
+            if not data:
+                self._drop(client)
+                return
+            client.inbuf += data
+            if len(data) < 65536:
+                break
+        while True:
+            end = client.inbuf.find(b"\n")
+            if end < 0:
+                if len(client.inbuf) > MAX_LINE:
+                    self._drop(client)
+                return
+            line = bytes(client.inbuf[:end])
+            del client.inbuf[:end + 1]
+            if line.strip():
+                reply = self._handle(client, line)
+                if reply is not None:
+                    self._send(client, reply)
+                if client.sock.fileno() not in self.clients:
+                    return
+
+    def _send(self, client, line):
+        if len(client.outbuf) + len(line) > MAX_PENDING_OUTPUT:
+            self._drop(client)
+            return
+        was_empty = not client.outbuf
+        client.outbuf += line
+        if was_empty:
+            self._flush(client)
+
+    def _flush(self, client):
+        try:
+            sent = client.sock.send(client.outbuf)
+            del client.outbuf[:sent]
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self._drop(client)
+            return
+        # Wait for the socket to drain only while something is left to send
+        wanted = selectors.EVENT_READ | (selectors.EVENT_WRITE if client.outbuf else 0)
+        if self.selector.get_key(client.sock).events != wanted:
+            self.selector.modify(client.sock, wanted)
+
+    # ---- protocol ----
+
+    @staticmethod
+    def _encode(message):
+        return json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+    def _handle(self, client, line):
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return self._encode(_error(None, PARSE_ERROR, "parse error"))
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return self._encode(_error(None, INVALID_REQUEST, "invalid request"))
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params") or {}
+        try:
+            if method == "auth":
+                given = params.get("token", "") if isinstance(params, dict) else ""
+                client.authed = self.token is None or hmac.compare_digest(str(given), self.token)
+                if not client.authed:
+                    raise RpcError("wrong token", UNAUTHORIZED)
+                result = True
+            elif not client.authed:
+                raise RpcError("send the token with \"auth\" first", UNAUTHORIZED)
+            elif method == "subscribe":
+                client.subscribed = True
+                result = True
+            elif method == "unsubscribe":
+                client.subscribed = False
+                result = True
+            elif method not in self.handlers:
+                raise RpcError(f"unknown method: {method}", METHOD_NOT_FOUND)
+            elif isinstance(params, dict):
+                result = self.handlers[method](**params)
+            elif isinstance(params, list):
+                result = self.handlers[method](*params)
+            else:
+                raise RpcError("params must be an object or an array", INVALID_PARAMS)
+        except RpcError as e:
+            response = _error(request_id, e.code, str(e))
+        except TypeError as e:
+            response = _error(request_id, INVALID_PARAMS, str(e))
+        except Exception as e:
+            response = _error(request_id, INTERNAL_ERROR, str(e))
+        else:
+            response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        if "id" not in request:
+            return None  # notification: no reply
+        return self._encode(response)
+
+
+def _error(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+class ControlClient:
+    """Blocking client, for scripts and the CLI."""
+
+    def __init__(self, path=None, timeout=5.0, token=None):
+        family, sockaddr = parse_address(path or socket_path())
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(sockaddr)
+        except OSError:
+            self.sock.close()
+            raise
+        self.file = self.sock.makefile("rb")
+        self.next_id = 0
+        if token:
+            try:
+                self.call("auth", token=token)
+            except Exception:
+                self.close()
+                raise
+
+    def call(self, method, **params):
+        """Return the result, raise RpcError with the server's error. Events received meanwhile are dropped."""
+        self.next_id += 1
+        request = {"jsonrpc": "2.0", "id": self.next_id, "method": method, "params": params}
+        self.sock.sendall(json.dumps(request).encode() + b"\n")
+        while True:
+            message = self.receive()
+            if message.get("id") == self.next_id:
+                if "error" in message:
+                    raise RpcError(message["error"].get("message", ""), message["error"].get("code", INTERNAL_ERROR))
+                return message.get("result")
+
+    def receive(self):
+        """Next message from the server (reply or event)."""
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("the server closed the connection")
+        return json.loads(line)
+
+    def events(self):
+        """Subscribe and yield event params forever."""
+        self.sock.settimeout(None)
+        self.call("subscribe")
+        while True:
+            message = self.receive()
+            if message.get("method") == "event":
+                yield message.get("params", {})
+
+    def close(self):
+        # Wakes up a thread still blocked in events() before the file is closed
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def connect(path=None, timeout=5.0, token=None):
+    """ControlClient to the running launcher (or an agent), None if there is none."""
+    try:
+        return ControlClient(path, timeout, token)
+    except OSError:
+        return None
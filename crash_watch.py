@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import re
+
+
+class CrashWindowWatcher:
+    """
+    Watch X11 for crash dialogs over one connection (python-xlib).
+
+    Every top-level window created is followed (CreateNotify on the root, then
+    PropertyNotify on the window since the title is set after creation); a
+    window whose title matches `pattern` is reported once with the pid of its
+    client: XRes when the server has it (real host pid), else _NET_WM_PID.
+    Raises ImportError without python-xlib and Xlib errors without a display.
+    """
+
+    def __init__(self, pattern="Crash", display_name=None):
+        from Xlib import X, display as xdisplay
+        self.X = X
+        self.display = xdisplay.Display(display_name)
+        self.display.set_error_handler(lambda *args: None)  # windows vanish all the time
+        self.root = self.display.screen().root
+        self.pattern = re.compile(pattern, re.IGNORECASE)
+        self.net_wm_name_atom = self.display.intern_atom("_NET_WM_NAME")
+        self.name_atoms = {self.net_wm_name_atom, self.display.intern_atom("WM_NAME")}
+        self.utf8_atom = self.display.intern_atom("UTF8_STRING")
+        self.pid_atom = self.display.intern_atom("_NET_WM_PID")
+        self.res = None
+        try:
+            from Xlib.ext import res
+            if self.display.has_extension("X-Resource"):
+                self.res = res
+        except ImportError:
+            pass
+        self.reported = set()   # window ids already reported
+        self.root.change_attributes(event_mask=X.SubstructureNotifyMask)
+        self.display.flush()
+
+    def fileno(self):
+        return self.display.fileno()
+
+    def window_name(self, window):
+        try:
+            prop = window.get_full_property(self.net_wm_name_atom, self.utf8_atom)
+            if prop and prop.value:
+                value = prop.value
+                return value.decode("utf-8", "replace") if isinstance(value, bytes) else str(value)
+            name = window.get_wm_name()
+            if isinstance(name, bytes):
+                return name.decode("latin-1")
+            return name or ""
+        except Exception:
+            return ""
+
+    def window_pid(self, window):
+        if self.res is not None:
+            try:
+                reply = self.display.res_query_client_ids(
+                    [{"client": window.id, "mask": self.res.LocalClientPIDMask}]
+                )
+                for client in reply.ids:
+                    if client.value:
+                        return client.value[0]
+            except Exception:
+                pass
+        try:
+            prop = window.get_full_property(self.pid_atom, self.X.AnyPropertyType)
+            return prop.value[0] if prop and len(prop.value) else None
+        except Exception:
+            return None
+
+    def _check(self, window):
+        if window.id in self.reported:
+            return None
+        if not self.pattern.search(self.window_name(window)):
+            return None
+        self.reported.add(window.id)
+        return window, self.window_pid(window)
+
+    def pending(self):
+        """Handle the queued X events. Return the new crash windows as [(window, pid)]."""
+        X = self.X
+        found = []
+        while self.display.pending_events():
+            event = self.display.next_event()
+            if event.type == X.CreateNotify:
+                try:
+                    event.window.change_attributes(event_mask=X.PropertyChangeMask)
+                except Exception:
+                    continue
+                hit = self._check(event.window)
+            elif event.type == X.PropertyNotify and event.atom in self.name_atoms:
+                hit = self._check(event.window)
+            elif event.type == X.DestroyNotify:
+                self.reported.discard(event.window.id)
+                hit = None
+            else:
+                hit = None
+            if hit:
+                found.append(hit)
+        self.display.flush()
+        return found
+
+    def scan(self):
+        """Crash windows that already exist (top-level and window manager frames): [(window, pid)]."""
+        found = []
+        try:
+            top = self.root.query_tree().children
+        except Exception:
+            return found
+        for window in top:
+            candidates = [window]
+            try:
+                candidates += window.query_tree().children
+            except Exception:
+                pass
+            for candidate in candidates:
+                if self.pattern.search(self.window_name(candidate)):
+                    self.reported.add(candidate.id)
+                    found.append((candidate, self.window_pid(candidate)))
+        return found
+
+    def close(self, windows):
+        """Kill the clients of the windows (like xdotool windowkill), one flush for the batch."""
+        for window in windows:
+            try:
+                window.kill_client()
+            except Exception:
+                pass
+        self.display.flush()
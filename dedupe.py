@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import stat
+import errno
+import hashlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from profiles import ACCOUNT_DATA_SUBPATHS, scan_profiles, sober_data_dir, format_size
+from profile_copy import is_immutable, try_reflink
+
+MIN_SIZE = 64 * 1024          # small files aren't worth a hash
+HEAD_SIZE = 64 * 1024         # first pass only hashes the head of each file
+HASH_BLOCK = 1024 * 1024
+
+
+def _hash_file(job):
+    """Hash a file (or its first `limit` bytes). Runs in a worker process."""
+    path, limit = job
+    h = hashlib.blake2b(digest_size=32)
+    try:
+        with open(path, "rb") as f:
+            remaining = limit
+            while remaining is None or remaining > 0:
+                block = f.read(HASH_BLOCK if remaining is None else min(HASH_BLOCK, remaining))
+                if not block:
+                    break
+                h.update(block)
+                if remaining is not None:
+                    remaining -= len(block)
+    except OSError:
+        return path, None
+    return path, h.hexdigest()
+
+
+class DedupeReport:
+    def __init__(self):
+        self.profiles = 0
+        self.files_scanned = 0
+        self.bytes_scanned = 0
+        self.actions = []          # (keeper, duplicate, size, "hardlink" | "reflink")
+        self.reclaimable_bytes = 0
+        self.reclaimed_bytes = 0
+        self.skipped_mutable = 0   # identical but mutable files on a filesystem without reflinks
+        self.errors = []
+
+    def summary(self):
+        lines = [
+            f"Profiles scanned: {self.profiles}",
+            f"Files scanned: {self.files_scanned} ({format_size(self.bytes_scanned)})",
+            f"Duplicate files: {len(self.actions)}",
+            f"Reclaimable: {format_size(self.reclaimable_bytes)}",
+        ]
+        if self.reclaimed_bytes:
+            lines.append(f"Reclaimed: {format_size(self.reclaimed_bytes)}")
+        if self.skipped_mutable:
+            lines.append(f"Skipped (mutable, no reflink support): {self.skipped_mutable}")
+        if self.errors:
+            lines.append(f"Errors: {len(self.errors)}")
+        return "\n".join(lines)
+
+
+class Deduplicator:
+    """
+    Find identical files across every profile of base_dir and share their storage.
+    Immutable game binaries become hardlinks; other files are only shared through
+    reflinks (copy-on-write) so a later write never leaks into another profile.
+    Account data (ACCOUNT_DATA_SUBPATHS) is never read nor touched.
+    """
+
+    def __init__(self, base_dir, jobs=None, progress=None, is_cancelled=None):
+        self.base_dir = base_dir
+        self.jobs = jobs or os.cpu_count() or 1
+        self.progress = progress
+        self.is_cancelled = is_cancelled
+        self._reflink_by_dev = {}
+        self.identities = {}           # path: file_identity() when it was listed, before any hashing
+
+    def _report(self, text):
+        if self.progress:
+            self.progress(text)
+
+    def _cancelled(self):
+        return bool(self.is_cancelled and self.is_cancelled())
+
+    def collect(self, report):
+        """Return {(dev, size): {ino: [paths]}} for every candidate file."""
+        by_size = {}
+        for profile in scan_profiles(self.base_dir):
+            root = sober_data_dir(self.base_dir, profile)
+            if not os.path.isdir(root):
+                continue
+            report.profiles += 1
+            skip = {os.path.join(root, p) for p in ACCOUNT_DATA_SUBPATHS}
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames[:] = [d for d in dirnames if os.path.join(dirpath, d) not in skip]
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.lstat(path)
+                    except OSError:
+                        continue
+                    if not stat.S_ISREG(st.st_mode) or st.st_size < MIN_SIZE:
+                        continue
+                    report.files_scanned += 1
+                    report.bytes_scanned += st.st_size
+                    self.identities[path] = file_identity(st)
+                    inodes = by_size.setdefault((st.st_dev, st.st_size), {})
+                    inodes.setdefault(st.st_ino, []).append(path)
+            self._report(f"Scanned {profile} ({report.files_scanned} files)")
+            if self._cancelled():
+                break
+        # Only sizes shared by at least two different inodes can hold duplicates
+        return {k: v for k, v in by_size.items() if len(v) > 1}
+
+    def _hash_groups(self, pool, groups, limit):
+        jobs = [(paths[0], limit) for inodes in groups for paths in inodes.values()]
+        digests = dict(pool.map(_hash_file, jobs, chunksize=16))
+        refined = []
+        for inodes in groups:
+            by_digest = {}
+            for ino, paths in inodes.items():
+                digest = digests.get(paths[0])
+                if digest is not None:
+                    by_digest.setdefault(digest, {})[ino] = paths
+            refined.extend(g for g in by_digest.values() if len(g) > 1)
+        return refined
+
+    def find_duplicates(self, report):
+        """Return a list of groups {ino: [paths]} of byte-identical files."""
+        candidates = self.collect(report)
+        if not candidates or self._cancelled():
+            return []
+        groups = list(candidates.values())
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.jobs, mp_context=ctx) as pool:
+            self._report(f"Hashing {sum(len(g) for g in groups)} candidate files...")
+            groups = self._hash_groups(pool, groups, HEAD_SIZE)
+            if self._cancelled():
+                return []
+            small = [g for g in groups if os.path.getsize(next(iter(g.values()))[0]) <= HEAD_SIZE]
+            large = [g for g in groups if os.path.getsize(next(iter(g.values()))[0]) > HEAD_SIZE]
+            self._report(f"Verifying {sum(len(g) for g in large)} files...")
+            return small + self._hash_groups(pool, large, None)
+
+    def _can_reflink(self, dev, sample):
+        if dev not in self._reflink_by_dev:
+            probe = os.path.join(os.path.dirname(sample), ".sl_reflink_probe")
+            try:
+                with open(sample, "rb") as src, open(probe, "wb") as dst:
+                    self._reflink_by_dev[dev] = try_reflink(src.fileno(), dst.fileno())
+            except OSError:
+                self._reflink_by_dev[dev] = False
+            finally:
+                if os.path.exists(probe):
+                    os.unlink(probe)
+        return self._reflink_by_dev[dev]
+
+    def plan(self, groups, report):
+        for inodes in groups:
+            # Keep the inode that is already the most shared
+            keeper_ino = max(sorted(inodes), key=lambda i: len(inodes[i]))
+            keeper = inodes[keeper_ino][0]
+            for ino, paths in inodes.items():
+                if ino == keeper_ino:
+                    continue
+                st = os.stat(paths[0])
+                replaced = 0
+                for path in paths:
+                    if is_immutable(path) or not st.st_mode & 0o222:
+                        method = "hardlink"
+                    elif self._can_reflink(st.st_dev, keeper):
+                        method = "reflink"
+                    else:
+                        report.skipped_mutable += 1
+                        continue
+                    report.actions.append((keeper, path, st.st_size, method))
+                    replaced += 1
+                # Space only comes back once every link of the duplicate inode is gone
+                if replaced == st.st_nlink:
+                    report.reclaimable_bytes += st.st_size
+
+    def apply(self, report):
+        for keeper, path, size, method in report.actions:
+            if self._cancelled():
+                break
+            try:
+                if replace_with_copy_of(keeper, path, method, self.identities.get(keeper), self.identities.get(path)):
+                    report.reclaimed_bytes += size
+            except OSError as e:
+                report.errors.append(f"{path}: {e}")
+
+    def run(self, dry_run=True):
+        report = DedupeReport()
+        groups = self.find_duplicates(report)
+        self.plan(groups, report)
+        if not dry_run:
+            self.apply(report)
+        return report
+
+
+def file_identity(st):
+    """What tells a file apart from the one that was hashed: same inode, size and modification time."""
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _check_unchanged(keeper, path, keeper_identity, path_identity):
+    if path_identity is not None and file_identity(os.stat(path)) != path_identity:
+        raise OSError(errno.EAGAIN, "file changed since it was hashed")
+    if keeper_identity is not None and file_identity(os.stat(keeper)) != keeper_identity:
+        raise OSError(errno.EAGAIN, f"{keeper} changed since it was hashed")
+
+
+def replace_with_copy_of(keeper, path, method, keeper_identity=None, path_identity=None):
+    """
+    Atomically replace `path` with a hardlink or reflink of `keeper`.
+    keeper_identity and path_identity (file_identity() taken before hashing)
+    are checked before the link and again before the rename, so a file
+    edited in the meantime, even at the same size, is left alone.
+    Return True if this freed the old inode.
+    """
+    tmp = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.sl_dedupe")
+    st = os.stat(path)
+    if os.path.getsize(keeper) != st.st_size:
+        raise OSError(errno.EAGAIN, "file changed since it was hashed")
+    _check_unchanged(keeper, path, keeper_identity, path_identity)
+    try:
+        if method == "hardlink":
+            os.link(keeper, tmp)
+        else:
+            with open(keeper, "rb") as src, open(tmp, "wb") as dst:
+                if not try_reflink(src.fileno(), dst.fileno()):
+                    raise OSError(errno.EOPNOTSUPP, "reflinks are not supported here")
+            os.chmod(tmp, stat.S_IMODE(st.st_mode))
+            os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        _check_unchanged(keeper, path, keeper_identity, path_identity)
+        os.rename(tmp, path)
+        return st.st_nlink == 1
+    finally:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deduplicate the game files of every Sober profile.")
+    parser.add_argument("base_dir", help="folder holding the profiles")
+    parser.add_argument("--apply", action="store_true", help="replace duplicates (default: dry run report)")
+    parser.add_argument("--jobs", type=int, default=None, help="hashing processes (default: CPU count)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="list every duplicate")
+    args = parser.parse_args(argv)
+
+    dedupe = Deduplicator(os.path.abspath(args.base_dir), jobs=args.jobs,
+                          progress=lambda text: print(text, file=sys.stderr))
+    report = dedupe.run(dry_run=not args.apply)
+    if args.verbose:
+        for keeper, path, size, method in report.actions:
+            print(f"{method}: {path} -> {keeper} ({format_size(size)})")
+    print(report.summary())
+    for error in report.errors:
+        print(error, file=sys.stderr)
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
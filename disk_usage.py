@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+import os
+import json
+import stat
+
+
+class DiskUsageIndex:
+    """
+    Persistent, incremental `du` for profile folders.
+
+    Every directory is cached with its mtime, the bytes of its single-link files and
+    the inodes of its multi-link files. A directory whose mtime didn't change is not
+    listed again: only a stat() is paid for it. File size changes that don't touch
+    the directory (in-place rewrites) are picked up by a forced rescan.
+    Hardlinked files are counted once per tree; symlinks are never followed, so the
+    shared layer is only counted where it really lives.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.dirs = {}   # abs dir -> {"mtime_ns", "files", "links", "subdirs", "tree"}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.dirs = json.load(f).get("dirs", {})
+        except Exception:
+            self.dirs = {}
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dirs": self.dirs}, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def _list_dir(self, path, dir_st):
+        files, links, subdirs = dir_st.st_blocks * 512, [], []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if stat.S_ISDIR(st.st_mode):
+                    subdirs.append(entry.name)
+                    continue
+                used = st.st_blocks * 512
+                if st.st_nlink > 1 and not stat.S_ISLNK(st.st_mode):
+                    links.append([st.st_dev, st.st_ino, used])
+                else:
+                    files += used
+        return {"mtime_ns": dir_st.st_mtime_ns, "files": files, "links": links, "subdirs": subdirs}
+
+    def scan(self, root, force=False):
+        """Refresh the cache for `root` and return its size in bytes (0 if missing)."""
+        root = os.path.abspath(root)
+        previous = self._tree_dirs(root)
+        visited = set()
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue
+            if not stat.S_ISDIR(st.st_mode):
+                continue
+            entry = self.dirs.get(path)
+            if force or entry is None or entry["mtime_ns"] != st.st_mtime_ns:
+                try:
+                    entry = self._list_dir(path, st)
+                except OSError:
+                    continue
+                self.dirs[path] = entry
+            visited.add(path)
+            stack.extend(os.path.join(path, d) for d in entry["subdirs"])
+
+        # Drop folders that disappeared below root
+        for path in previous:
+            if path not in visited:
+                self.dirs.pop(path, None)
+
+        if root in visited:
+            self._compute_tree(root)
+        return self.size(root)
+
+    def _tree_dirs(self, root):
+        """Cached directories of a tree, parents before children."""
+        order, stack = [], [root]
+        while stack:
+            path = stack.pop()
+            entry = self.dirs.get(path)
+            if entry is None:
+                continue
+            order.append(path)
+            stack.extend(os.path.join(path, d) for d in entry["subdirs"])
+        return order
+
+    def _compute_tree(self, root):
+        """Fill "tree" (subtree bytes, hardlinks counted once) for every folder of root."""
+        singles, inodes = {}, {}
+        for path in reversed(self._tree_dirs(root)):
+            entry = self.dirs[path]
+            own_singles = entry["files"]
+            own_inodes = {(dev, ino): used for dev, ino, used in entry["links"]}
+            for d in entry["subdirs"]:
+                child = os.path.join(path, d)
+                if child in singles:
+                    own_singles += singles.pop(child)
+                    own_inodes.update(inodes.pop(child))
+            singles[path], inodes[path] = own_singles, own_inodes
+            entry["tree"] = own_singles + sum(own_inodes.values())
+
+    def size(self, path):
+        """Cached subtree size of a directory scanned earlier, 0 if unknown."""
+        entry = self.dirs.get(os.path.abspath(path))
+        return entry.get("tree", 0) if entry else 0
+
+    def children_sizes(self, path):
+        """{subdir name: size} for the direct subdirectories of a scanned directory."""
+        path = os.path.abspath(path)
+        entry = self.dirs.get(path)
+        if not entry:
+            return {}
+        return {d: self.size(os.path.join(path, d)) for d in entry["subdirs"]}
+
+    def unique_total(self, roots):
+        """Size of several scanned trees together, inodes shared between them counted once."""
+        total, inodes = 0, {}
+        for root in roots:
+            for path in self._tree_dirs(os.path.abspath(root)):
+                entry = self.dirs[path]
+                total += entry["files"]
+                for dev, ino, used in entry["links"]:
+                    inodes[(dev, ino)] = used
+        return total + sum(inodes.values())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Declarative fleet: which profiles should run, and where.
+
+    {"instances": [
+        {"profiles": "Bot {1..25}", "place": "1818"},
+        {"profiles": ["Bot 26", "Bot 2[7-9]", "Bot 30"], "server": "Guild server"},
+        {"profiles": "Old *", "state": "stopped"}
+    ]}
+
+`profiles` takes names, globs and {a..b} number ranges. The target is a
+place id or game link (`place`), a raw URI (`uri`) or the name of a private
+server saved in the launcher (`server`); no target runs Sober's home page.
+`state` is "running" (default) or "stopped". Later entries win over earlier
+ones; profiles no entry mentions are left alone. A .toml file holds the same
+structure as [[instances]] tables.
+"""
+
+import os
+import re
+import json
+import fnmatch
+
+from profiles import place_uri
+
+DEFAULT_FLEET_INTERVAL = 10.0   # seconds between two reconciliations
+STATES = ("running", "stopped")
+
+
+class FleetError(Exception):
+    pass
+
+
+def expand_ranges(pattern):
+    """'Bot {1..3}' -> ['Bot 1', 'Bot 2', 'Bot 3'] (every range is expanded, left to right)."""
+    match = re.search(r"\{(\d+)\.\.(\d+)\}", pattern)
+    if not match:
+        return [pattern]
+    start, end = int(match.group(1)), int(match.group(2))
+    step = 1 if end >= start else -1
+    expanded = []
+    for n in range(start, end + step, step):
+        expanded.extend(expand_ranges(pattern[:match.start()] + str(n) + pattern[match.end():]))
+    return expanded
+
+
+def parse_spec(data, private_servers=()):
+    """Validate a loaded spec. Return the rules: [(patterns, uri, state)]."""
+    entries = data.get("instances") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise FleetError("the fleet file needs an \"instances\" list")
+    servers = dict(private_servers)
+    rules = []
+    for i, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict):
+            raise FleetError(f"entry {i}: expected an object")
+        patterns = entry.get("profiles")
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        if not patterns or not all(isinstance(p, str) for p in patterns):
+            raise FleetError(f"entry {i}: \"profiles\" must be a name, a glob or a list of them")
+        state = entry.get("state", "running")
+        if state not in STATES:
+            raise FleetError(f"entry {i}: state must be one of {', '.join(STATES)}")
+        targets = [key for key in ("place", "uri", "server") if entry.get(key)]
+        if len(targets) > 1:
+            raise FleetError(f"entry {i}: give only one of place, uri and server")
+        uri = None
+        try:
+            if entry.get("place"):
+                uri = place_uri(str(entry["place"]))
+        except ValueError as e:
+            raise FleetError(f"entry {i}: {e}")
+        if entry.get("uri"):
+            uri = str(entry["uri"])
+        if entry.get("server"):
+            if entry["server"] not in servers:
+                raise FleetError(f"entry {i}: no private server named '{entry['server']}'")
+            uri = servers[entry["server"]]
+        expanded = [p for pattern in patterns for p in expand_ranges(pattern)]
+        rules.append((expanded, uri, state))
+    return rules
+
+
+def load_spec(path, private_servers=()):
+    """Read and validate a fleet file (.json or .toml)."""
+    try:
+        if path.endswith(".toml"):
+            try:
+                import tomllib
+            except ImportError:
+                raise FleetError("TOML fleet files need Python 3.11+, use JSON")
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+    except OSError as e:
+        raise FleetError(f"can't read {path}: {e.strerror}")
+    except ValueError as e:
+        raise FleetError(f"{os.path.basename(path)}: {e}")
+    return parse_spec(data, private_servers)
+
+
+def desired_state(rules, profiles):
+    """{profile: (state, uri)} for the existing profiles some rule mentions."""
+    desired = {}
+    for patterns, uri, state in rules:
+        for profile in profiles:
+            if any(fnmatch.fnmatchcase(profile, pattern) for pattern in patterns):
+                desired[profile] = (state, uri if state == "running" else None)
+    return desired
+
+
+def reconcile(desired, running, busy=()):
+    """
+    Compare the desired state with the running instances ({profile: uri}).
+    Return (start, stop, restart): start and restart are [(profile, uri)],
+    restart being instances running somewhere else. Profiles in `busy`
+    (queued, stopping, waiting for the supervisor...) are left for later.
+    """
+    start, stop, restart = [], [], []
+    for profile, (state, uri) in desired.items():
+        if profile in busy:
+            continue
+        if state == "stopped":
+            if profile in running:
+                stop.append(profile)
+        elif profile not in running:
+            start.append((profile, uri))
+        elif (running[profile] or None) != uri:
+            restart.append((profile, uri))
+    return start, stop, restart
+
+
+class FleetFile:
+    """A fleet file followed over time: reload() only re-reads it when its mtime or size changed."""
+
+    def __init__(self, path, private_servers=()):
+        self.path = os.path.abspath(path)
+        self.private_servers = list(private_servers)
+        self.rules = []
+        self.error = ""
+        self._signature = None
+
+    def reload(self, force=False):
+        """Return True when the rules changed. A broken file keeps the last good rules (see `error`)."""
+        try:
+            st = os.stat(self.path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            signature = None
+        if not force and signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            rules = load_spec(self.path, self.private_servers)
+        except FleetError as e:
+            self.error = str(e)
+            return False
+        self.error = ""
+        changed = rules != self.rules
+        self.rules = rules
+        return changed
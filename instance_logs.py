@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Output of the instances, captured by the launcher instead of a terminal.
+
+Each instance writes stdout and stderr into its own pipes. The launcher
+reads them non-blocking when they become readable and keeps the lines in a
+fixed-size ring per profile (and, optionally, in a size-rotated file under
+the profile), so memory stays bounded however much an instance prints.
+"""
+
+import os
+import time
+import fcntl
+from collections import deque
+
+from profiles import profile_home
+
+DEFAULT_LOG_SETTINGS = {
+    "enabled": True,        # capture the output of the instances launched by the GUI
+    "ring_lines": 2000,     # lines kept in memory per profile
+    "to_file": False,       # also write them to <profile>/.local/state/soberlauncher/sober.log
+    "max_file_kb": 1024,    # rotate the file past this size
+    "backups": 2,           # sober.log.1 ... sober.log.N kept
+}
+
+LOG_SUBPATH = os.path.join(".local", "state", "soberlauncher", "sober.log")
+MAX_LINE = 2048             # longer lines are split, so a line never costs more than this
+READ_CHUNK = 65536
+MAX_READ_PER_WAKEUP = 64 * 1024  # a flood can't hold the event loop, the rest waits for the next wake-up
+PIPE_SIZE = 1024 * 1024     # room for a burst while the launcher is busy
+STREAMS = ("out", "err")
+
+
+def log_path(base_dir, profile):
+    return os.path.join(profile_home(base_dir, profile), LOG_SUBPATH)
+
+
+class RotatingLog:
+    """Append-only text file rotated to .1, .2... once it grows past max_bytes."""
+
+    def __init__(self, path, max_bytes, backups):
+        self.path = path
+        self.max_bytes = max(max_bytes, 4096)
+        self.backups = max(backups, 0)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8", errors="replace")
+        self.size = self.file.tell()
+
+    def write(self, text):
+        if self.size + len(text) > self.max_bytes:
+            self.rotate()
+        self.file.write(text)
+        self.size += len(text)
+
+    def rotate(self):
+        self.file.close()
+        for i in range(self.backups, 0, -1):
+            src = self.path if i == 1 else f"{self.path}.{i - 1}"
+            try:
+                os.replace(src, f"{self.path}.{i}")
+            except OSError:
+                pass
+        self.file = open(self.path, "w", encoding="utf-8", errors="replace")
+        self.size = 0
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class LogRing:
+    """The last lines of a profile: (seq, time, stream, text), oldest dropped first."""
+
+    def __init__(self, max_lines):
+        self.lines = deque(maxlen=max(max_lines, 1))
+
+    def since(self, seq):
+        """Lines newer than seq, oldest first."""
+        newer = []
+        for line in reversed(self.lines):
+            if line[0] <= seq:
+                break
+            newer.append(line)
+        newer.reverse()
+        return newer
+
+
+class LogCapture:
+    """
+    Pipes and rings of every captured instance. The caller watches the fds of
+    fds() (QSocketNotifier) and calls read(fd) when one is readable, then
+    release(fd) once read() reported EOF and the fd is no longer watched.
+
+        out, err = capture.open(profile)
+        instance = launch(..., stdout=out, stderr=err)
+        capture.started(profile)       # or capture.abort(profile) if the launch failed
+    """
+
+    def __init__(self, settings=None):
+        self.settings = dict(DEFAULT_LOG_SETTINGS)
+        self.rings = {}     # profile -> LogRing, kept after the instance exited
+        self.readers = {}   # read fd -> (profile, stream, partial line)
+        self.writers = {}   # profile -> write fds, until started()
+        self.files = {}     # profile -> RotatingLog
+        self.seq = 0        # increases with every line, for the viewer's tailing
+        self.configure(settings or {})
+
+    def configure(self, settings):
+        for key, default in DEFAULT_LOG_SETTINGS.items():
+            if key in settings:
+                try:
+                    self.settings[key] = type(default)(settings[key])
+                except (TypeError, ValueError):
+                    pass
+        for profile, ring in self.rings.items():
+            if ring.lines.maxlen != self.settings["ring_lines"]:
+                self.rings[profile] = LogRing(self.settings["ring_lines"])
+                self.rings[profile].lines.extend(ring.lines)
+
+    # ---- pipes ----
+
+    def open(self, profile, path=None):
+        """Pipes for a new instance of profile. Return the (stdout, stderr) write ends for Popen."""
+        self.close(profile)
+        if path and self.settings["to_file"]:
+            try:
+                self.files[profile] = RotatingLog(path, self.settings["max_file_kb"] * 1024, self.settings["backups"])
+            except OSError:
+                pass  # the ring still works
+        ring = self.rings.setdefault(profile, LogRing(self.settings["ring_lines"]))
+        self._append(ring, profile, "launcher", f"--- launched {time.strftime('%Y-%m-%d %H:%M:%S')} ---")
+        writers = []
+        for stream in STREAMS:
+            r, w = os.pipe2(os.O_CLOEXEC)
+            os.set_blocking(r, False)
+            try:
+                fcntl.fcntl(r, fcntl.F_SETPIPE_SZ, PIPE_SIZE)
+            except (AttributeError, OSError):
+                pass  # Python < 3.10 or over /proc/sys/fs/pipe-max-size: default 64 KiB
+            self.readers[r] = (profile, stream, b"")
+            writers.append(w)
+        self.writers[profile] = writers
+        return tuple(writers)
+
+    def started(self, profile):
+        """The child holds the write ends now: close ours, EOF then means every writer exited."""
+        for fd in self.writers.pop(profile, ()):
+            os.close(fd)
+
+    def abort(self, profile):
+        self.started(profile)
+        self.close(profile)
+
+    def fds(self, profile):
+        return [fd for fd, (p, _, _) in self.readers.items() if p == profile]
+
+    def read(self, fd):
+        """Read what is available on fd. Return False at EOF."""
+        profile, stream, partial = self.readers[fd]
+        ring = self.rings[profile]
+        total = 0
+        eof = False
+        while total < MAX_READ_PER_WAKEUP:
+            try:
+                data = os.read(fd, READ_CHUNK)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                eof = True
+                break
+            if not data:
+                eof = True
+                break
+            total += len(data)
+            lines = (partial + data).split(b"\n")
+            partial = lines.pop()
+            for line in lines:
+                self._append_bytes(ring, profile, stream, line)
+            while len(partial) > MAX_LINE:
+                self._append_bytes(ring, profile, stream, partial[:MAX_LINE])
+                partial = partial[MAX_LINE:]
+        if eof and partial:
+            self._append_bytes(ring, profile, stream, partial)
+            partial = b""
+        self.readers[fd] = (profile, stream, partial)
+        if profile in self.files:
+            self.files[profile].flush()
+        return not eof
+
+    def release(self, fd):
+        """Close a pipe (at EOF, or to stop capturing). The log file closes with the last one."""
+        profile = self.readers.pop(fd)[0]
+        os.close(fd)
+        if profile in self.files and not self.fds(profile):
+            self.files.pop(profile).close()
+
+    def close(self, profile):
+        """Stop capturing profile (its ring is kept)."""
+        for fd in self.fds(profile):
+            self.release(fd)
+        if profile in self.files:
+            self.files.pop(profile).close()
+
+    def close_all(self):
+        for profile in list(self.rings):
+            self.close(profile)
+        for profile in list(self.writers):
+            self.started(profile)
+
+    # ---- lines ----
+
+    def _append_bytes(self, ring, profile, stream, line):
+        self._append(ring, profile, stream, line[:MAX_LINE].decode("utf-8", "replace").rstrip("\r"))
+
+    def _append(self, ring, profile, stream, text):
+        self.seq += 1
+        now = time.time()
+        ring.lines.append((self.seq, now, stream, text))
+        log = self.files.get(profile)
+        if log is not None:
+            try:
+                log.write(f"{time.strftime('%H:%M:%S', time.localtime(now))} [{stream}] {text}\n")
+            except OSError:
+                self.files.pop(profile).close()
+
+    def lines(self, profiles=None, since=0):
+        """[(seq, time, stream, text, profile)] newer than since, in order, for the given profiles (all if None)."""
+        chosen = self.rings if profiles is None else [p for p in profiles if p in self.rings]
+        merged = []
+        for profile in chosen:
+            merged.extend(line + (profile,) for line in self.rings[profile].since(since))
+        merged.sort(key=lambda line: line[0])
+        return merged
+
+    def clear(self, profile=None):
+        for p in ([profile] if profile is not None else list(self.rings)):
+            if p in self.rings:
+                self.rings[p].lines.clear()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+import os
+import json
+
+from profiles import SOBER_APP_ID, MAIN_PROFILE
+from telemetry import CLK_TCK, read_stat
+from launch_engine import Instance, ForeignProcess
+
+
+def boot_id():
+    """Identifier of the current boot: pids and starttimes mean nothing across reboots."""
+    try:
+        with open("/proc/sys/kernel/random/boot_id", "r") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def boot_time():
+    """Wall-clock time of the boot (btime in /proc/stat), 0 if unknown."""
+    try:
+        with open("/proc/stat", "r") as f:
+            for line in f:
+                if line.startswith("btime "):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def read_cmdline(pid):
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return [arg.decode(errors="replace") for arg in f.read().split(b"\0") if arg]
+    except OSError:
+        return []
+
+
+def read_environ(pid, name):
+    """Value of an environment variable of a process, None if unreadable or unset."""
+    prefix = name.encode() + b"="
+    try:
+        with open(f"/proc/{pid}/environ", "rb") as f:
+            for item in f.read().split(b"\0"):
+                if item.startswith(prefix):
+                    return item[len(prefix):].decode(errors="replace")
+    except OSError:
+        pass
+    return None
+
+
+def sober_uri(argv):
+    """
+    URI of a `flatpak run org.vinegarhq.Sober [uri]` command line, "" without
+    one, None if the command line isn't a Sober launch.
+    """
+    # flatpak itself, or a script run by its interpreter (stub flatpak)
+    start = next((i for i, arg in enumerate(argv[:2]) if os.path.basename(arg) == "flatpak"), None)
+    if start is None or argv[start + 1:start + 2] != ["run"] or SOBER_APP_ID not in argv[start:]:
+        return None
+    rest = argv[argv.index(SOBER_APP_ID) + 1:]
+    return rest[0] if rest else ""
+
+
+def profile_for_home(base_dir, home):
+    """Profile whose HOME is `home` (see profiles.profile_home), None if it isn't one of ours."""
+    if not home:
+        return None
+    home = os.path.normpath(home)
+    if home == os.path.normpath(os.path.expanduser("~")):
+        return MAIN_PROFILE
+    if base_dir and os.path.dirname(home) == os.path.normpath(base_dir):
+        return os.path.basename(home)
+    return None
+
+
+def sober_processes(base_dir):
+    """{pid: (profile, uri, stat)} of every `flatpak run` Sober process whose HOME is one of our profiles."""
+    candidates = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        pid = int(name)
+        uri = sober_uri(read_cmdline(pid))
+        if uri is None:
+            continue
+        profile = profile_for_home(base_dir, read_environ(pid, "HOME"))
+        stat = read_stat(pid)
+        if profile is not None and stat is not None:
+            candidates[pid] = (profile, uri, stat)
+    return candidates
+
+
+def running_profiles(base_dir):
+    """Profiles a Sober runs on, whoever started it (the launcher, Quick Launch, a terminal)."""
+    return {profile for profile, _, _ in sober_processes(base_dir).values()}
+
+
+class InstanceRegistry:
+    """
+    The running instances, kept on disk so a restarted launcher can re-attach
+    to them. With a registry from the current boot, discovery only checks the
+    known pids; without one, /proc is walked once for `flatpak run` Sober
+    processes and their HOME is mapped back to a profile.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}    # profile -> {"pid", "starttime", "uri", "started_at"}
+        self.valid = False   # read from a file written during this boot
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.valid = data.get("boot_id") == boot_id()
+            self.entries = dict(data.get("instances") or {}) if self.valid else {}
+        except Exception:
+            self.entries, self.valid = {}, False
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"boot_id": boot_id(), "instances": self.entries}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+            self.valid = True
+        except OSError:
+            pass
+
+    def _record(self, profile, instance):
+        stat = read_stat(instance.pid)
+        if stat is None:
+            return False
+        self.entries[profile] = {
+            "pid": instance.pid, "starttime": stat[3], "uri": instance.uri, "started_at": instance.started_at,
+        }
+        return True
+
+    def add(self, profile, instance):
+        if self._record(profile, instance):
+            self.save()
+
+    def remove(self, profile):
+        if self.entries.pop(profile, None) is not None:
+            self.save()
+
+    def _check_known(self):
+        found = {}
+        for profile, entry in self.entries.items():
+            try:
+                proc = ForeignProcess(int(entry["pid"]), int(entry["starttime"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if proc.poll() is None:
+                found[profile] = Instance(profile, proc, entry.get("uri"), started_at=entry.get("started_at"))
+        return found
+
+    def _walk_proc(self, base_dir):
+        candidates = sober_processes(base_dir)
+        found = {}
+        for pid, (profile, uri, stat) in candidates.items():
+            if stat[0] in candidates:
+                continue  # flatpak run started by another one: the parent is the instance
+            if profile in found and found[profile].proc.starttime <= stat[3]:
+                continue  # keep the oldest if a profile somehow runs twice
+            found[profile] = Instance(profile, ForeignProcess(pid, stat[3]), uri or None,
+                                      started_at=boot_time() + stat[3] / CLK_TCK)
+        return found
+
+    def discover(self, base_dir):
+        """Return {profile: Instance} for the instances still running, and record them."""
+        found = self._check_known() if self.valid else self._walk_proc(base_dir)
+        self.entries = {p: e for p, e in self.entries.items() if p in found}
+        for profile, instance in found.items():
+            if profile not in self.entries:
+                self._record(profile, instance)
+        self.save()
+        return found
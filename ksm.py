@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+import os
+import ctypes
+import ctypes.util
+
+PR_SET_MEMORY_MERGE = 67
+PR_GET_MEMORY_MERGE = 68
+KSM_SYSFS = "/sys/kernel/mm/ksm"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+_libc = None
+
+
+def _prctl(option, arg=0):
+    """prctl(2) through libc, return (result, errno)."""
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+    ctypes.set_errno(0)
+    result = _libc.prctl(ctypes.c_int(option), ctypes.c_ulong(arg), ctypes.c_ulong(0),
+                         ctypes.c_ulong(0), ctypes.c_ulong(0))
+    return result, ctypes.get_errno()
+
+
+def ksm_status():
+    """
+    Return (can_enable, message). can_enable is True when the kernel has
+    PR_SET_MEMORY_MERGE; the message explains what is missing otherwise, or
+    that KSM is not running yet (merging starts once it is).
+    """
+    if not os.path.isdir(KSM_SYSFS):
+        return False, "Kernel built without KSM"
+    try:
+        result, _ = _prctl(PR_GET_MEMORY_MERGE)
+    except (OSError, AttributeError):
+        return False, "prctl() not available"
+    if result < 0:
+        return False, "Kernel too old for PR_SET_MEMORY_MERGE (Linux 6.4+)"
+    try:
+        with open(os.path.join(KSM_SYSFS, "run"), "r") as f:
+            running = f.read().strip() == "1"
+    except OSError:
+        running = False
+    if not running:
+        return True, "KSM is stopped: run 'echo 1 | sudo tee /sys/kernel/mm/ksm/run' to start merging"
+    return True, "KSM running"
+
+
+def enable_memory_merge():
+    """
+    Turn on KSM for this whole process (and the children it forks). Called by
+    launch_wrapper.py --memory-merge right before it execs the instance.
+    """
+    result, err = _prctl(PR_SET_MEMORY_MERGE, 1)
+    if result < 0:
+        raise OSError(err, os.strerror(err))
+
+
+def read_ksm_stat(pid):
+    """/proc/<pid>/ksm_stat as a dict (numbers as int, yes/no as bool), None if missing."""
+    stat = {}
+    try:
+        with open(f"/proc/{pid}/ksm_stat", "r") as f:
+            for line in f:
+                key, _, value = line.replace(":", " ").partition(" ")
+                value = value.strip()
+                if value in ("yes", "no"):
+                    stat[key] = value == "yes"
+                else:
+                    try:
+                        stat[key] = int(value)
+                    except ValueError:
+                        pass
+    except OSError:
+        return None
+    return stat
+
+
+def ksm_usage(pids):
+    """
+    Merged memory of a process tree: {"merging": bytes backed by shared pages,
+    "profit": bytes saved minus KSM metadata, "merge_any": processes opted in,
+    "procs": processes read}. None when no process exposes ksm_stat.
+    """
+    usage = {"merging": 0, "profit": 0, "merge_any": 0, "procs": 0}
+    for pid in pids:
+        stat = read_ksm_stat(pid)
+        if stat is None:
+            continue
+        usage["procs"] += 1
+        usage["merging"] += stat.get("ksm_merging_pages", 0) * PAGE_SIZE
+        usage["profit"] += stat.get("ksm_process_profit", 0)
+        if stat.get("ksm_merge_any"):
+            usage["merge_any"] += 1
+    return usage if usage["procs"] else None
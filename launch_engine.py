@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import subprocess
+
+from profiles import SOBER_APP_ID, MAIN_PROFILE, profile_home
+from telemetry import read_stat
+
+
+def build_command(base_dir, profile, uri=None, prefix=(), env_in_argv=False):
+    """
+    Return (argv, env) to run Sober for a profile, no shell involved.
+    `prefix` wraps the command (terminal, systemd-run...). Wrappers that don't
+    forward their environment (terminal servers) need env_in_argv=True.
+    """
+    argv = ["flatpak", "run", SOBER_APP_ID]
+    if uri:
+        argv.append(uri)
+    env = dict(os.environ)
+    if profile != MAIN_PROFILE:
+        home = profile_home(base_dir, profile)
+        if env_in_argv:
+            argv = ["env", f"HOME={home}"] + argv
+        else:
+            env["HOME"] = home
+    return list(prefix) + argv, env
+
+
+class ForeignProcess:
+    """
+    Popen stand-in for an instance started by an earlier run of the launcher.
+    It isn't our child, so its real exit code can't be read: an exit is
+    reported as code 0 (only a crash window makes it count as a crash).
+    `starttime` (from /proc/<pid>/stat) tells the process apart from a reused pid.
+    """
+
+    def __init__(self, pid, starttime):
+        self.pid = pid
+        self.starttime = starttime
+        self.returncode = None
+
+    def _alive(self):
+        stat = read_stat(self.pid)
+        # A zombie waiting for its parent to reap it has ended all the same
+        return stat is not None and stat[3] == self.starttime and stat[4] != "Z"
+
+    def poll(self):
+        if self.returncode is None and not self._alive():
+            self.returncode = 0
+        return self.returncode
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(["pid", str(self.pid)], timeout)
+            time.sleep(0.05)
+        return self.returncode
+
+
+class Instance:
+    """A Sober instance started by the launcher."""
+
+    def __init__(self, profile, proc, uri=None, spawn_seconds=0.0, started_at=None):
+        self.profile = profile
+        self.proc = proc
+        self.pid = proc.pid
+        self.uri = uri
+        self.spawn_seconds = spawn_seconds
+        self.started_at = time.time() if started_at is None else started_at
+        self.ended_at = None
+
+    def _exited(self, code):
+        if code is not None and self.ended_at is None:
+            self.ended_at = time.time()
+        return code
+
+    def poll(self):
+        return self._exited(self.proc.poll())
+
+    def wait(self, timeout=None):
+        return self._exited(self.proc.wait(timeout))
+
+    def runtime(self):
+        """Seconds the instance ran (so far, if it is still running)."""
+        return (self.ended_at or time.time()) - self.started_at
+
+    @property
+    def returncode(self):
+        return self.proc.returncode
+
+
+def launch(base_dir, profile, uri=None, prefix=(), env_in_argv=False, **popen_kwargs):
+    """
+    Spawn flatpak directly (argv + env) in its own process group, so the whole
+    instance can be signalled at once. The spawn time is kept on the Instance.
+    """
+    argv, env = build_command(base_dir, profile, uri, prefix, env_in_argv)
+    popen_kwargs.setdefault("stdin", subprocess.DEVNULL)
+    start = time.perf_counter()
+    proc = subprocess.Popen(argv, env=env, start_new_session=True, **popen_kwargs)
+    return Instance(profile, proc, uri, time.perf_counter() - start)
+
+
+def launch_many(base_dir, items, prefix=(), **popen_kwargs):
+    """
+    Launch several (profile, uri) pairs back to back.
+    Return ({profile: Instance}, {profile: error message}).
+    """
+    instances, errors = {}, {}
+    for profile, uri in items:
+        try:
+            instances[profile] = launch(base_dir, profile, uri, prefix, **popen_kwargs)
+        except OSError as e:
+            errors[profile] = str(e)
+    return instances, errors
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+import os
+import time
+from collections import deque
+
+DEFAULT_QUEUE_SETTINGS = {
+    "max_starting": 3,      # instances allowed in their startup phase at once
+    "min_gap": 2.0,         # seconds between two spawns
+    "startup_time": 20.0,   # seconds an instance counts as "starting"
+    "max_load": 0.0,        # wait while the 1 min load average is above this (0 = off)
+    "min_free_mb": 0,       # wait while MemAvailable is below this (0 = off)
+}
+
+
+def free_memory_mb():
+    """MemAvailable from /proc/meminfo, None if unknown."""
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class LaunchQueue:
+    """
+    Throttle instance spawns: at most `max_starting` instances starting at once,
+    `min_gap` seconds between spawns, and optionally wait for the load average
+    or the free memory to recover. It doesn't spawn anything itself: the caller
+    polls next_ready() and sleeps (or arms a timer) for the returned delay.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = dict(DEFAULT_QUEUE_SETTINGS)
+        self.configure(settings or {})
+        self.pending = deque()   # (profile, uri)
+        self.starting = {}       # profile -> monotonic time of the spawn
+        self.last_spawn = None
+        self.blocked_reason = ""
+
+    def configure(self, settings):
+        for key, default in DEFAULT_QUEUE_SETTINGS.items():
+            if key in settings:
+                try:
+                    self.settings[key] = type(default)(settings[key])
+                except (TypeError, ValueError):
+                    pass
+
+    def enqueue(self, profile, uri=None):
+        """Queue a launch. Return False if the profile is already queued."""
+        if any(p == profile for p, _ in self.pending):
+            return False
+        self.pending.append((profile, uri))
+        return True
+
+    def cancel(self, profile=None):
+        """Drop every pending launch (or only the profile's). Return how many were dropped."""
+        before = len(self.pending)
+        if profile is None:
+            self.pending.clear()
+        else:
+            self.pending = deque(item for item in self.pending if item[0] != profile)
+        return before - len(self.pending)
+
+    def mark_exited(self, profile):
+        self.starting.pop(profile, None)
+
+    def is_queued(self, profile):
+        return any(p == profile for p, _ in self.pending)
+
+    def _expire(self, now):
+        startup = self.settings["startup_time"]
+        for profile, started in list(self.starting.items()):
+            if now - started >= startup:
+                del self.starting[profile]
+
+    def next_ready(self, now=None):
+        """
+        Return (item, delay). item is the (profile, uri) to spawn now, or None;
+        delay is how long to wait before asking again, None when there is nothing left.
+        """
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        self.blocked_reason = ""
+        if not self.pending:
+            return None, None
+
+        s = self.settings
+        if len(self.starting) >= max(s["max_starting"], 1):
+            self.blocked_reason = "max starting"
+            oldest = min(self.starting.values())
+            return None, max(oldest + s["startup_time"] - now, 0.1)
+        if self.last_spawn is not None and now - self.last_spawn < s["min_gap"]:
+            self.blocked_reason = "spawn gap"
+            return None, self.last_spawn + s["min_gap"] - now
+        if s["max_load"] > 0 and os.getloadavg()[0] > s["max_load"]:
+            self.blocked_reason = "load average"
+            return None, 1.0
+        if s["min_free_mb"] > 0:
+            free = free_memory_mb()
+            if free is not None and free < s["min_free_mb"]:
+                self.blocked_reason = "free memory"
+                return None, 1.0
+
+        item = self.pending.popleft()
+        self.starting[item[0]] = now
+        self.last_spawn = now
+        return item, 0.0
+
+    def drain(self, spawn, sleep=time.sleep):
+        """Blocking loop for scripts: spawn every queued item while respecting the limits."""
+        while True:
+            item, delay = self.next_ready()
+            if item is not None:
+                spawn(*item)
+            elif delay is None:
+                return
+            else:
+                sleep(delay)
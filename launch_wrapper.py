@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Exec wrapper for what a launch can only do from inside the new process:
+joining a cgroup, turning on KSM memory merging. It replaces Popen's
+preexec_fn, which isn't safe in the threaded launcher (and forces
+fork+exec). Put in front of the command:
+
+    python3 -S launch_wrapper.py [--cgroup <dir>] [--memory-merge] -- flatpak run ...
+
+A cgroup that can't be joined is reported on stderr and the command is not
+run (exit status 126), so an instance never starts without its limits.
+Memory merging is only an optimization: a failure is reported and the
+command runs anyway.
+"""
+
+import os
+import sys
+
+EXIT_FAILED = 126
+
+
+def join_cgroup(path):
+    with open(os.path.join(path, "cgroup.procs"), "w") as f:
+        f.write("0")
+
+
+def main(argv):
+    if "--" not in argv:
+        print("usage: launch_wrapper.py [--cgroup DIR] [--memory-merge] -- COMMAND...", file=sys.stderr)
+        return 2
+    split = argv.index("--")
+    options, command = argv[:split], argv[split + 1:]
+    steps = []
+    while options:
+        option = options.pop(0)
+        if option == "--cgroup" and options:
+            path = options.pop(0)
+            steps.append((f"can't join cgroup {path}", lambda path=path: join_cgroup(path), True))
+        elif option == "--memory-merge":
+            from ksm import enable_memory_merge
+            steps.append(("can't turn on memory merging", enable_memory_merge, False))
+        else:
+            print(f"launch_wrapper: unknown option {option}", file=sys.stderr)
+            return 2
+    if not command:
+        print("launch_wrapper: no command", file=sys.stderr)
+        return 2
+
+    for what, step, required in steps:
+        try:
+            step()
+        except OSError as e:
+            print(f"launch_wrapper: {what}: {e.strerror or e}", file=sys.stderr)
+            if required:
+                return EXIT_FAILED
+    try:
+        os.execvp(command[0], command)
+    except OSError as e:
+        print(f"launch_wrapper: {command[0]}: {e.strerror or e}", file=sys.stderr)
+        return 127
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+import os
+import socket
+
+# Expected cost of one more instance, when a host has none running to measure
+DEFAULT_INSTANCE_COST = {"cpu": 1.0, "memory_mb": 1500}
+
+
+def memory_info():
+    """(MemTotal, MemAvailable) in MB from /proc/meminfo, (0, 0) if unknown."""
+    values = {}
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("MemTotal", "MemAvailable"):
+                    values[key] = int(rest.split()[0]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return values.get("MemTotal", 0), values.get("MemAvailable", 0)
+
+
+def host_stats(running=0, cpu_used=None, rss_used=None):
+    """What placement needs to know about this machine."""
+    total, available = memory_info()
+    stats = {
+        "hostname": socket.gethostname(),
+        "cpus": os.cpu_count() or 1,
+        "load": os.getloadavg()[0],
+        "mem_total_mb": total,
+        "mem_available_mb": available,
+        "running": running,
+    }
+    # Average use of the instances already running, the best guess for the next one
+    if running and cpu_used is not None:
+        stats["instance_cpu"] = cpu_used / running
+    if running and rss_used is not None:
+        stats["instance_memory_mb"] = rss_used / running / 1024 ** 2
+    return stats
+
+
+def place(profiles, hosts, cost=None, homes=None):
+    """
+    Spread profiles over hosts ({name: host_stats()}), each one on the host with
+    the most headroom left once the profiles placed before it are counted.
+    Headroom is the smaller of the free CPU and free memory fractions.
+    A profile listed in `homes` ({profile: [hosts]}) only goes to a host that
+    already has it (its account data lives there).
+    Return ({profile: host}, [profiles that fit nowhere]).
+    """
+    homes = homes or {}
+    cost = dict(DEFAULT_INSTANCE_COST, **(cost or {}))
+    free = {}
+    for name, stats in hosts.items():
+        free[name] = {
+            "cpu": stats["cpus"] - stats["load"],
+            "memory": stats["mem_available_mb"],
+            "instance_cpu": max(stats.get("instance_cpu", cost["cpu"]), 0.1),
+            "instance_memory": max(stats.get("instance_memory_mb", cost["memory_mb"]), 64),
+            "cpus": stats["cpus"],
+            "mem_total": max(stats["mem_total_mb"], 1),
+        }
+
+    placed, unplaced = {}, []
+    for profile in profiles:
+        best, best_score = None, None
+        for name, f in free.items():
+            if homes.get(profile) and name not in homes[profile]:
+                continue
+            if f["memory"] < f["instance_memory"]:
+                continue  # would start swapping
+            score = min((f["cpu"] - f["instance_cpu"]) / f["cpus"],
+                        (f["memory"] - f["instance_memory"]) / f["mem_total"])
+            if best_score is None or score > best_score:
+                best, best_score = name, score
+        if best is None:
+            unplaced.append(profile)
+            continue
+        placed[profile] = best
+        free[best]["cpu"] -= free[best]["instance_cpu"]
+        free[best]["memory"] -= free[best]["instance_memory"]
+    return placed, unplaced
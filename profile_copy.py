@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+import os
+import stat
+import errno
+import fcntl
+
+# ioctl(dest_fd, FICLONE, src_fd): share all extents of src (btrfs, XFS, bcachefs...)
+FICLONE = 0x40049409
+
+# Game binaries that Sober replaces instead of rewriting in place, safe to hardlink
+IMMUTABLE_SUFFIXES = (".apk", ".so", ".dex", ".odex", ".oat", ".vdex", ".jar")
+
+CHUNK_SIZE = 8 * 1024 * 1024
+
+_REFLINK_UNSUPPORTED = (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EPERM)
+
+
+class CopyCancelled(Exception):
+    pass
+
+
+def is_immutable(path):
+    """Tell whether a file is a game binary that can be shared through a hardlink."""
+    return path.lower().endswith(IMMUTABLE_SUFFIXES)
+
+
+def try_reflink(src_fd, dst_fd):
+    """Clone src into dst. Return False if the filesystem can't do it."""
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except OSError as e:
+        if e.errno in _REFLINK_UNSUPPORTED:
+            return False
+        raise
+
+
+class ProfileCopier:
+    """
+    Copy a Sober folder into a new profile, cheapest method first:
+    reflink, then hardlink for immutable binaries, then a chunked stream copy.
+    Paths listed in `skip` (relative to src) are never walked.
+    """
+
+    def __init__(self, src, dst, skip=(), progress=None, is_cancelled=None):
+        self.src = os.path.abspath(src)
+        self.dst = os.path.abspath(dst)
+        self.skip = {os.path.normpath(p) for p in skip}
+        self.progress = progress
+        self.is_cancelled = is_cancelled
+        self.total_bytes = 0
+        self.done_bytes = 0
+        self.reflinked = 0
+        self.hardlinked = 0
+        self.copied = 0
+        self._can_reflink = True
+        self._can_hardlink = True
+
+    def scan(self):
+        """Walk the source once and return (dirs, files, symlinks) as relative paths."""
+        dirs, files, links = [], [], []
+        for root, dirnames, filenames in os.walk(self.src):
+            rel_root = os.path.relpath(root, self.src)
+            kept = []
+            for d in dirnames:
+                rel = os.path.normpath(os.path.join(rel_root, d))
+                if rel in self.skip:
+                    continue
+                if os.path.islink(os.path.join(root, d)):
+                    links.append(rel)
+                else:
+                    kept.append(d)
+                    dirs.append(rel)
+            dirnames[:] = kept
+            for f in filenames:
+                rel = os.path.normpath(os.path.join(rel_root, f))
+                if rel in self.skip:
+                    continue
+                st = os.lstat(os.path.join(root, f))
+                if stat.S_ISLNK(st.st_mode):
+                    links.append(rel)
+                elif stat.S_ISREG(st.st_mode):
+                    files.append((rel, st))
+                    self.total_bytes += st.st_size
+        return dirs, files, links
+
+    def run(self):
+        dirs, files, links = self.scan()
+        os.makedirs(self.dst, exist_ok=True)
+        for rel in dirs:
+            self._check_cancel()
+            os.makedirs(os.path.join(self.dst, rel), exist_ok=True)
+        for rel in links:
+            dst_path = os.path.join(self.dst, rel)
+            if os.path.lexists(dst_path):
+                os.unlink(dst_path)
+            os.symlink(os.readlink(os.path.join(self.src, rel)), dst_path)
+        self._report()
+        for rel, st in files:
+            self._check_cancel()
+            self._copy_file(os.path.join(self.src, rel), os.path.join(self.dst, rel), st)
+            self._report()
+        # Restore directory times last, file creation bumps them
+        for rel in reversed(dirs):
+            st = os.stat(os.path.join(self.src, rel))
+            os.utime(os.path.join(self.dst, rel), ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    def _copy_file(self, src_path, dst_path, st):
+        if os.path.lexists(dst_path):
+            os.unlink(dst_path)
+
+        if self._can_reflink:
+            with open(src_path, "rb") as fsrc, open(dst_path, "wb") as fdst:
+                reflinked = try_reflink(fsrc.fileno(), fdst.fileno())
+            if reflinked:
+                self.reflinked += 1
+                self.done_bytes += st.st_size
+                self._copy_metadata(dst_path, st)
+                return
+            self._can_reflink = False
+            os.unlink(dst_path)
+
+        if self._can_hardlink and is_immutable(src_path):
+            try:
+                os.link(src_path, dst_path)
+                self.hardlinked += 1
+                self.done_bytes += st.st_size
+                return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                    raise
+                self._can_hardlink = e.errno == errno.EMLINK
+
+        with open(src_path, "rb") as fsrc, open(dst_path, "wb") as fdst:
+            self._stream(fsrc, fdst)
+            self.copied += 1
+        self._copy_metadata(dst_path, st)
+
+    @staticmethod
+    def _copy_metadata(dst_path, st):
+        os.chmod(dst_path, stat.S_IMODE(st.st_mode))
+        os.utime(dst_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    def _stream(self, fsrc, fdst):
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        use_cfr = hasattr(os, "copy_file_range")
+        while True:
+            self._check_cancel()
+            if use_cfr:
+                try:
+                    n = os.copy_file_range(in_fd, out_fd, CHUNK_SIZE)
+                except OSError as e:
+                    if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                        raise
+                    use_cfr = False
+                    continue
+            else:
+                buf = fsrc.read(CHUNK_SIZE)
+                n = len(buf)
+                if n:
+                    fdst.write(buf)
+            if not n:
+                break
+            self.done_bytes += n
+            self._report()
+
+    def _report(self):
+        if self.progress:
+            self.progress(self.done_bytes, self.total_bytes)
+
+    def _check_cancel(self):
+        if self.is_cancelled and self.is_cancelled():
+            raise CopyCancelled()
+
+
+def copy_profile_tree(src, dst, skip=(), progress=None, is_cancelled=None):
+    """Copy src to dst with ProfileCopier and return the copier (for its counters)."""
+    copier = ProfileCopier(src, dst, skip, progress, is_cancelled)
+    copier.run()
+    return copier
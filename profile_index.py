@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+
+import os
+import json
+
+from profiles import MAIN_PROFILE, natural_sort_key
+from inotify import (
+    Inotify, IN_CREATE, IN_DELETE, IN_MOVED_FROM, IN_MOVED_TO, IN_DELETE_SELF, IN_MOVE_SELF,
+    IN_Q_OVERFLOW, IN_IGNORED, IN_ONLYDIR
+)
+
+BASE_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+# A plain folder becomes a profile when its .local appears
+FOLDER_EVENTS = IN_CREATE | IN_MOVED_TO | IN_ONLYDIR
+
+
+def _is_profile(path):
+    return os.path.isdir(os.path.join(path, ".local"))
+
+
+class ProfileIndex:
+    """
+    The profiles of a base directory (folders holding a .local folder),
+    persisted with the directory's mtime so that a launcher start or a
+    refresh costs a stat() when nothing changed. Known profiles are only
+    checked again by revalidate(force=True) (a stat of each .local, the
+    refresh button); plain folders are remembered with their own mtime so a
+    .local created later is still noticed. With watch(), inotify reports the
+    changes as they happen and process_events() applies only those.
+
+    Every update returns the difference: (added, removed, renamed), renamed
+    being (old, new) pairs recognised by inode.
+    """
+
+    def __init__(self, path, base_dir):
+        self.path = path
+        self.base_dir = os.path.abspath(base_dir) if base_dir else None
+        self.mtime_ns = None
+        self.entries = {}   # profile -> inode
+        self.folders = {}   # plain folder -> mtime_ns
+        self.inotify = None
+        self.base_wd = None
+        self.folder_wds = {}  # wd -> folder name
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            return
+        if data.get("base_dir") != self.base_dir:
+            return
+        self.mtime_ns = data.get("mtime_ns")
+        self.entries = dict(data.get("profiles") or {})
+        self.folders = dict(data.get("folders") or {})
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"base_dir": self.base_dir, "mtime_ns": self.mtime_ns,
+                           "profiles": self.entries, "folders": self.folders},
+                          f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def profiles(self):
+        """Same list as profiles.scan_profiles(): natural order, Main Profile first."""
+        profiles = sorted((p for p in self.entries if p != MAIN_PROFILE), key=natural_sort_key)
+        return [MAIN_PROFILE] + profiles
+
+    # ---- updates ----
+
+    def _diff(self, entries):
+        old = self.entries
+        removed = [p for p in old if p not in entries]
+        added = [p for p in entries if p not in old]
+        renamed = []
+        by_inode = {entries[p]: p for p in added}
+        for profile in list(removed):
+            new = by_inode.get(old[profile])
+            if new is not None and new in added:
+                renamed.append((profile, new))
+                removed.remove(profile)
+                added.remove(new)
+        added.sort(key=natural_sort_key)
+        changed = bool(added or removed or renamed)
+        self.entries = entries
+        return (added, removed, renamed) if changed else ([], [], [])
+
+    def _classify(self, name, entries, folders):
+        """Put base_dir/name in entries or folders (or neither if it isn't a folder)."""
+        path = os.path.join(self.base_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        if not os.path.isdir(path):
+            return
+        if _is_profile(path):
+            entries[name] = st.st_ino
+        else:
+            folders[name] = st.st_mtime_ns
+
+    def _rescan(self, check_known=False):
+        entries, folders = {}, {}
+        with os.scandir(self.base_dir) as it:
+            for entry in it:
+                if not entry.is_dir():
+                    continue
+                if not check_known and self.entries.get(entry.name) == entry.inode():
+                    entries[entry.name] = entry.inode()  # known profile: no .local check
+                elif _is_profile(entry.path):
+                    entries[entry.name] = entry.inode()
+                else:
+                    try:
+                        folders[entry.name] = entry.stat().st_mtime_ns
+                    except OSError:
+                        pass
+        return entries, folders
+
+    def revalidate(self, force=False):
+        """
+        Bring the index up to date. Costs a stat() of base_dir (and of the
+        plain folders) if nothing changed. force rescans base_dir and checks
+        the .local of every known profile too, so one deleted since is dropped.
+        """
+        if not self.base_dir:
+            return self._diff({})
+        try:
+            mtime_ns = os.stat(self.base_dir).st_mtime_ns
+        except OSError:
+            self.mtime_ns, self.folders = None, {}
+            diff = self._diff({})
+            self.save()
+            return diff
+        if force or mtime_ns != self.mtime_ns:
+            try:
+                entries, folders = self._rescan(check_known=force)
+            except OSError:
+                entries, folders = {}, {}
+        else:
+            entries, folders = dict(self.entries), {}
+            for name, folder_mtime in self.folders.items():
+                try:
+                    current = os.stat(os.path.join(self.base_dir, name)).st_mtime_ns
+                except OSError:
+                    continue
+                if current == folder_mtime:
+                    folders[name] = folder_mtime
+                else:
+                    self._classify(name, entries, folders)
+        changed = mtime_ns != self.mtime_ns or folders != self.folders
+        self.mtime_ns = mtime_ns
+        self.folders = folders
+        diff = self._diff(entries)
+        if changed or any(diff):
+            self.save()
+        self._sync_watches()
+        return diff
+
+    # ---- inotify ----
+
+    def watch(self):
+        """Follow base_dir with inotify. Return False if that isn't possible (refresh stays manual)."""
+        if not self.base_dir:
+            return False
+        try:
+            self.inotify = Inotify()
+            self.base_wd = self.inotify.add_watch(self.base_dir, BASE_EVENTS)
+        except OSError:
+            self.close()
+            return False
+        self._sync_watches()
+        return True
+
+    def _sync_watches(self):
+        if self.inotify is None:
+            return
+        watched = {name: wd for wd, name in self.folder_wds.items()}
+        for name, wd in watched.items():
+            if name not in self.folders:
+                self.inotify.rm_watch(wd)
+                del self.folder_wds[wd]
+        for name in self.folders:
+            if name not in watched:
+                try:
+                    self.folder_wds[self.inotify.add_watch(os.path.join(self.base_dir, name), FOLDER_EVENTS)] = name
+                except OSError:
+                    pass  # out of watches: revalidate() still sees it through its mtime
+
+    def fileno(self):
+        return self.inotify.fileno()
+
+    def process_events(self):
+        """Apply the pending inotify events. Return the difference."""
+        try:
+            mtime_ns = os.stat(self.base_dir).st_mtime_ns  # before reading: a later change comes as an event
+        except OSError:
+            mtime_ns = None
+        events = self.inotify.read()
+        entries, folders = dict(self.entries), dict(self.folders)
+        for wd, mask, _, name in events:
+            if mask & IN_Q_OVERFLOW or (wd == self.base_wd and mask & (IN_DELETE_SELF | IN_MOVE_SELF)):
+                return self.revalidate(force=True)  # events lost, or base_dir itself went away
+            if mask & IN_IGNORED:
+                self.folder_wds.pop(wd, None)
+            elif wd == self.base_wd:
+                if mask & (IN_DELETE | IN_MOVED_FROM):
+                    entries.pop(name, None)
+                    folders.pop(name, None)
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._classify(name, entries, folders)
+            elif wd in self.folder_wds and name == ".local":
+                folder = self.folder_wds[wd]
+                folders.pop(folder, None)
+                self._classify(folder, entries, folders)
+        if not events:
+            return [], [], []
+        self.mtime_ns = mtime_ns
+        self.folders = folders
+        diff = self._diff(entries)
+        self.save()
+        self._sync_watches()
+        return diff
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+        self.inotify = None
+        self.base_wd = None
+        self.folder_wds = {}
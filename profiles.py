@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import fnmatch
+
+SOBER_APP_ID = "org.vinegarhq.Sober"
+MAIN_PROFILE = "Main Profile"
+
+# Sober's flatpak data folder, relative to a profile's HOME
+SOBER_DATA_SUBDIR = os.path.join(".var", "app", SOBER_APP_ID)
+
+# Per-account state, relative to SOBER_DATA_SUBDIR. Never copied, shared or deduplicated.
+ACCOUNT_DATA_SUBPATHS = (
+    os.path.join("data", "sober", "appData"),
+)
+
+
+def profile_home(base_dir, profile):
+    """Return the HOME used to run a profile."""
+    if profile == MAIN_PROFILE:
+        return os.path.expanduser("~")
+    return os.path.join(base_dir, profile)
+
+
+def sober_data_dir(base_dir, profile):
+    """Return the Sober flatpak data folder of a profile."""
+    return os.path.join(profile_home(base_dir, profile), SOBER_DATA_SUBDIR)
+
+
+def natural_sort_key(s):
+    return [int(text) if text.isdigit() else text.lower() for text in re.split(r'(\d+)', s)]
+
+
+def scan_profiles(base_dir):
+    """List the profiles of base_dir (folders holding a .local folder), Main Profile first."""
+    profiles = []
+    if base_dir and os.path.exists(base_dir):
+        with os.scandir(base_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    local_path = os.path.join(entry.path, ".local")
+                    if os.path.exists(local_path) and os.path.isdir(local_path):
+                        profiles.append(entry.name)
+
+    profiles.sort(key=natural_sort_key)
+    if MAIN_PROFILE in profiles:
+        profiles.remove(MAIN_PROFILE)
+    profiles.insert(0, MAIN_PROFILE)
+    return profiles
+
+
+def select_profiles(profiles, patterns):
+    """Profiles matching names or globs ("Bot *"), in list order. ValueError if a pattern matches nothing."""
+    chosen = []
+    for pattern in patterns:
+        matches = [p for p in profiles if fnmatch.fnmatchcase(p, pattern)]
+        if not matches:
+            raise ValueError(f"no profile matches '{pattern}'")
+        chosen.extend(p for p in matches if p not in chosen)
+    return chosen
+
+
+def place_uri(place):
+    """Place id or game link -> roblox:// URI (a roblox:// URI is kept as is). ValueError if invalid."""
+    if place is None:
+        return None
+    place = str(place).strip()
+    if place.startswith("roblox://"):
+        return place
+    match = re.search(r"games/(\d+)", place) or re.fullmatch(r"(\d+)", place)
+    if not match:
+        raise ValueError(f"invalid place id or game link: {place}")
+    return f"roblox://experience?placeId={match.group(1)}"
+
+
+def format_size(num_bytes):
+    """Format a byte count for display (e.g. '512.0 MB')."""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_uptime(seconds):
+    """Format a duration for display (e.g. '1h02m05s')."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s"
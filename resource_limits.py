@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import sys
+import time
+import shutil
+
+# Keys of a limits dict ("ResourceDefaults" and "ResourceProfiles" in SL_Settings.json):
+#   cpus          "0-3,8" or "auto" (spread instances over the least used cores)
+#   auto_cores    cores per instance with cpus="auto"
+#   nice          0..19
+#   ionice_class  1 realtime, 2 best-effort, 3 idle
+#   ionice_level  0..7 (best-effort/realtime)
+#   memory_max    "4G", "1500M"... (cgroup memory.max)
+#   cpu_quota     percent of one core, 150 = 1.5 cores (cgroup cpu.max)
+LIMIT_KEYS = ("cpus", "auto_cores", "nice", "ionice_class", "ionice_level", "memory_max", "cpu_quota")
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+CPU_PERIOD_US = 100000
+LAUNCH_WRAPPER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "launch_wrapper.py")
+
+
+def effective_limits(defaults, overrides):
+    """Profile overrides on top of the defaults, empty values removed."""
+    limits = {}
+    for source in (defaults or {}, overrides or {}):
+        for key in LIMIT_KEYS:
+            if key in source:
+                limits[key] = source[key]
+    return {k: v for k, v in limits.items() if v not in (None, "")}
+
+
+def parse_cpu_list(text):
+    """'0-3,6' -> {0, 1, 2, 3, 6}."""
+    cpus = set()
+    for part in str(text).replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    return cpus
+
+
+def parse_size(text):
+    """'4G' -> bytes (memory.max accepts the raw number)."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"invalid size: {text}")
+    factor = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}[match.group(2).upper()]
+    return int(float(match.group(1)) * factor)
+
+
+class CpuSpreader:
+    """Hand out blocks of the least used cores to instances launched with cpus='auto'."""
+
+    def __init__(self):
+        self.available = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        self.assigned = {}   # key -> set of cpus
+
+    def assign(self, key, count):
+        self.release(key)
+        if not self.available:
+            return set()
+        usage = {cpu: 0 for cpu in self.available}
+        for cpus in self.assigned.values():
+            for cpu in cpus:
+                if cpu in usage:
+                    usage[cpu] += 1
+        count = max(1, min(int(count), len(self.available)))
+        chosen = set(sorted(self.available, key=lambda c: (usage[c], c))[:count])
+        self.assigned[key] = chosen
+        return chosen
+
+    def release(self, key):
+        self.assigned.pop(key, None)
+
+
+def _systemd_user_available():
+    if not shutil.which("systemd-run"):
+        return False
+    runtime = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}")
+    return os.path.exists(os.path.join(runtime, "systemd", "private")) or "DBUS_SESSION_BUS_ADDRESS" in os.environ
+
+
+def own_cgroup():
+    """Absolute cgroup v2 folder of this process, None without a unified hierarchy."""
+    if not os.path.exists(os.path.join(CGROUP_ROOT, "cgroup.controllers")):
+        return None
+    try:
+        with open("/proc/self/cgroup", "r") as f:
+            for line in f:
+                if line.startswith("0::"):
+                    path = os.path.join(CGROUP_ROOT, line[3:].strip().lstrip("/"))
+                    return path if os.path.isdir(path) else None
+    except OSError:
+        pass
+    return None
+
+
+def process_cgroup(pid):
+    """Absolute cgroup v2 folder of a process, None if unknown."""
+    try:
+        with open(f"/proc/{pid}/cgroup", "r") as f:
+            for line in f:
+                if line.startswith("0::"):
+                    return os.path.join(CGROUP_ROOT, line[3:].strip().lstrip("/"))
+    except OSError:
+        pass
+    return None
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", name)[:60] or "profile"
+
+
+def _make_cgroup(name, memory_max, cpu_quota):
+    """
+    Create a sibling of our own (delegated) cgroup holding the limits.
+    Return its path, None if cgroups can't be written here.
+    """
+    mine = own_cgroup()
+    if not mine:
+        return None
+    path = os.path.join(os.path.dirname(mine), f"soberlauncher-{_slug(name)}-{os.getpid()}")
+    try:
+        os.makedirs(path, exist_ok=True)
+        if memory_max:
+            with open(os.path.join(path, "memory.max"), "w") as f:
+                f.write(str(parse_size(memory_max)))
+        if cpu_quota:
+            with open(os.path.join(path, "cpu.max"), "w") as f:
+                f.write(f"{int(cpu_quota) * CPU_PERIOD_US // 100} {CPU_PERIOD_US}")
+    except (OSError, ValueError):
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
+        return None
+    return path
+
+
+def remove_cgroup(path):
+    """Remove a cgroup made by _make_cgroup once its processes are gone."""
+    if path and os.path.basename(path).startswith("soberlauncher-"):
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
+
+
+class LaunchPlan:
+    """
+    What to add to a launch: the argv prefix and the methods used. Nothing
+    runs in the child between fork and exec; limits that must be applied from
+    inside the process go through launch_wrapper.py (wrapper_args).
+    """
+
+    def __init__(self):
+        self.wrappers = []       # argv of tools that apply a limit then exec the rest (systemd-run, taskset...)
+        self.wrapper_args = []   # options of launch_wrapper.py, which runs first when there are any
+        self.cgroup = None       # cgroup made by us (direct cgroup v2 method)
+        self.unit = None         # transient systemd scope
+        self.methods = []
+
+    @property
+    def prefix(self):
+        if not self.wrapper_args:
+            return list(self.wrappers)
+        return [sys.executable, "-S", LAUNCH_WRAPPER] + self.wrapper_args + ["--"] + self.wrappers
+
+    def merge_memory(self):
+        """Turn on KSM memory merging for the instance (see ksm.py)."""
+        self.wrapper_args.append("--memory-merge")
+        self.methods.append("KSM")
+
+
+def plan_limits(name, limits, spreader=None, force_cgroup=False):
+    """
+    Build the LaunchPlan applying `limits` to an instance.
+    Memory/CPU caps go through a transient `systemd-run --user --scope`, else a
+    cgroup v2 folder joined by launch_wrapper.py. Affinity, nice and ionice
+    are set by taskset, nice and ionice in front of the command and inherited
+    by the whole tree. Raises ValueError for a limit that can't be applied
+    (bad size, no usable core, nice out of range).
+    """
+    plan = LaunchPlan()
+    memory_max = limits.get("memory_max")
+    cpu_quota = limits.get("cpu_quota")
+
+    if memory_max or cpu_quota or force_cgroup:
+        if _systemd_user_available():
+            plan.unit = f"soberlauncher-{_slug(name)}-{time.time_ns()}"
+            plan.wrappers += ["systemd-run", "--user", "--scope", "--quiet", "--collect", f"--unit={plan.unit}"]
+            if memory_max:
+                plan.wrappers += ["-p", f"MemoryMax={parse_size(memory_max)}"]
+            if cpu_quota:
+                plan.wrappers += ["-p", f"CPUQuota={int(cpu_quota)}%"]
+            plan.methods.append("systemd-run scope")
+        else:
+            path = _make_cgroup(name, memory_max, cpu_quota)
+            if path:
+                plan.cgroup = path
+                plan.wrapper_args += ["--cgroup", path]
+                plan.methods.append("cgroup v2")
+            else:
+                plan.methods.append("no cgroup" + (" (memory/CPU caps not applied)" if memory_max or cpu_quota else ""))
+
+    cpus = limits.get("cpus")
+    if cpus:
+        if str(cpus).strip().lower() == "auto":
+            chosen = spreader.assign(name, limits.get("auto_cores") or 2) if spreader else set()
+        else:
+            chosen = parse_cpu_list(cpus)
+            if hasattr(os, "sched_getaffinity"):
+                chosen &= os.sched_getaffinity(0)
+                if not chosen:
+                    raise ValueError(f"none of the CPU cores '{cpus}' can be used here")
+        if chosen and shutil.which("taskset"):
+            plan.wrappers += ["taskset", "-c", ",".join(map(str, sorted(chosen)))]
+            plan.methods.append("affinity " + ",".join(map(str, sorted(chosen))))
+        elif chosen:
+            plan.methods.append("no taskset (affinity not applied)")
+
+    nice = limits.get("nice")
+    if nice:
+        if not 0 <= int(nice) <= 19:
+            raise ValueError(f"nice level {nice} is not within 0..19")
+        plan.wrappers += ["nice", "-n", str(int(nice))]
+        plan.methods.append(f"nice {nice}")
+
+    ionice_class = limits.get("ionice_class")
+    if ionice_class and shutil.which("ionice"):
+        plan.wrappers += ["ionice", "-c", str(int(ionice_class))]
+        if int(ionice_class) != 3 and limits.get("ionice_level") is not None:
+            plan.wrappers += ["-n", str(int(limits["ionice_level"]))]
+        plan.methods.append(f"ionice class {ionice_class}")
+
+    return plan
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+import os
+import shutil
+import filecmp
+import subprocess
+
+from profiles import SOBER_APP_ID, MAIN_PROFILE, ACCOUNT_DATA_SUBPATHS, profile_home, sober_data_dir
+from profile_copy import copy_profile_tree
+
+# Lives in base_dir but has no .local folder, so it is never listed as a profile
+SHARED_DIR_NAME = ".sober-shared"
+# In the shared layer: the only profile whose sandbox may write to it (the one that seeded it)
+WRITER_FILE = ".writer"
+
+# Downloadable game files, relative to SOBER_DATA_SUBDIR. Overridable with "SharedLayerPaths".
+DEFAULT_SHARED_SUBPATHS = [
+    os.path.join("data", "sober", "assets"),
+    os.path.join("data", "sober", "packages"),
+]
+
+
+class SharedLayerError(Exception):
+    pass
+
+
+def shared_root(base_dir):
+    return os.path.join(base_dir, SHARED_DIR_NAME)
+
+
+def check_subpaths(subpaths):
+    """
+    Return subpaths ("SharedLayerPaths") normalized, or raise SharedLayerError
+    for one that isn't a relative path inside the Sober data folder or that
+    overlaps the account data.
+    """
+    checked = []
+    for subpath in subpaths:
+        normalized = os.path.normpath(str(subpath))
+        if os.path.isabs(normalized) or normalized == "." or normalized.split(os.sep)[0] == "..":
+            raise SharedLayerError(f"Invalid shared path '{subpath}': it must stay inside the Sober data folder.")
+        for account in ACCOUNT_DATA_SUBPATHS:
+            if os.path.commonpath([normalized, account]) in (normalized, account):
+                raise SharedLayerError(f"Invalid shared path '{subpath}': it overlaps the account data ({account}).")
+        checked.append(normalized)
+    return checked
+
+
+def shared_writer(base_dir):
+    """The profile allowed to update the shared layer, None before it is seeded."""
+    try:
+        with open(os.path.join(shared_root(base_dir), WRITER_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _set_writer(base_dir, profile):
+    os.makedirs(shared_root(base_dir), exist_ok=True)
+    with open(os.path.join(shared_root(base_dir), WRITER_FILE), "w", encoding="utf-8") as f:
+        f.write(profile)
+
+
+def _differs(private, shared):
+    """The first file of the private copy that the shared layer lacks or holds another version of, else None."""
+    for dirpath, _, filenames in os.walk(private):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            other = os.path.join(shared, os.path.relpath(path, private))
+            try:
+                st, other_st = os.lstat(path), os.lstat(other)
+            except FileNotFoundError:
+                return path
+            if st.st_size != other_st.st_size:
+                return path
+            if st.st_mtime_ns != other_st.st_mtime_ns and not filecmp.cmp(path, other, shallow=False):
+                return path
+    return None
+
+
+def _paths(base_dir, profile, subpath):
+    return os.path.join(shared_root(base_dir), subpath), os.path.join(sober_data_dir(base_dir, profile), subpath)
+
+
+def is_linked(base_dir, profile, subpaths):
+    """Tell whether every shared subpath of the profile points to the shared layer."""
+    for subpath in subpaths:
+        target, local = _paths(base_dir, profile, subpath)
+        if not os.path.islink(local) or os.readlink(local) != target:
+            return False
+    return True
+
+
+def expose_shared_root(base_dir, profile):
+    """
+    Let the sandbox see the shared layer at the same absolute path, so the symlinks
+    resolve inside flatpak. Overrides are read from $HOME, hence one per profile.
+    Read-only except for the writer profile, so the running instances never
+    see their game files rewritten by any of the others but that one.
+    """
+    env = dict(os.environ, HOME=profile_home(base_dir, profile))
+    mode = "" if shared_writer(base_dir) == profile else ":ro"
+    try:
+        subprocess.run(
+            ["flatpak", "override", "--user", f"--filesystem={shared_root(base_dir)}{mode}", SOBER_APP_ID],
+            env=env, check=True, capture_output=True, text=True
+        )
+    except FileNotFoundError:
+        raise SharedLayerError("The 'flatpak' command is not available.")
+    except subprocess.CalledProcessError as e:
+        raise SharedLayerError(f"flatpak override failed: {e.stderr.strip() or e}")
+
+
+def link_profile(base_dir, profile, subpaths):
+    """
+    Replace the profile's game files with symlinks to the shared layer.
+    The first profile that still has its own copy seeds the shared layer and
+    becomes its writer (the only sandbox given write access, see
+    expose_shared_root); later copies get removed, but only when every file
+    of theirs is already in the shared layer: a copy that differs raises
+    SharedLayerError and is kept. Account data is left alone.
+    """
+    if profile == MAIN_PROFILE:
+        raise SharedLayerError("The main profile keeps its own game files.")
+    subpaths = check_subpaths(subpaths)
+    if shared_writer(base_dir) is None:
+        _set_writer(base_dir, profile)
+    for subpath in subpaths:
+        target, local = _paths(base_dir, profile, subpath)
+        if os.path.islink(local):
+            if os.readlink(local) == target:
+                continue
+            os.unlink(local)
+        elif os.path.isdir(local):
+            if os.path.isdir(target):
+                different = _differs(local, target)
+                if different:
+                    raise SharedLayerError(
+                        f"{profile} has its own version of {os.path.relpath(different, sober_data_dir(base_dir, profile))}, "
+                        "which differs from the shared game files: remove its copy, or copy it into "
+                        f"{shared_root(base_dir)}, then link it again."
+                    )
+                shutil.rmtree(local)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(local, target)
+        os.makedirs(target, exist_ok=True)
+        os.makedirs(os.path.dirname(local), exist_ok=True)
+        os.symlink(target, local)
+    expose_shared_root(base_dir, profile)
+
+
+def unlink_profile(base_dir, profile, subpaths):
+    """Give the profile back a private copy of the shared game files."""
+    if shared_writer(base_dir) == profile:
+        os.unlink(os.path.join(shared_root(base_dir), WRITER_FILE))  # the next profile linked takes over
+    for subpath in check_subpaths(subpaths):
+        target, local = _paths(base_dir, profile, subpath)
+        if not os.path.islink(local):
+            continue
+        os.unlink(local)
+        if os.path.isdir(target):
+            copy_profile_tree(target, local)
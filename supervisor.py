@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+import time
+import random
+from collections import deque
+
+DEFAULT_SUPERVISOR_SETTINGS = {
+    "enabled": False,
+    "base_delay": 5.0,      # seconds before the first restart
+    "max_delay": 300.0,     # backoff ceiling
+    "jitter": 0.2,          # +/- fraction applied to every delay
+    "max_restarts": 5,      # restarts allowed within `window` before giving up
+    "window": 600.0,        # seconds
+    "stable_after": 300.0,  # a run this long resets the backoff
+}
+
+
+class Supervisor:
+    """
+    Decide when crashed instances are relaunched: exponential backoff with
+    jitter per profile, and a crash-loop limit. Exits asked for by the user
+    (mark_user_stop) and clean exits (code 0, window closed) are not crashes.
+    Like LaunchQueue it spawns nothing: the caller asks due() for the
+    restarts to make and arms a timer for next_delay().
+    """
+
+    def __init__(self, settings=None, rng=None):
+        self.settings = dict(DEFAULT_SUPERVISOR_SETTINGS)
+        self.configure(settings or {})
+        self.rng = rng or random.Random()
+        self.records = {}        # profile -> dict, see _record()
+        self.user_stopped = set()
+
+    def configure(self, settings):
+        for key, default in DEFAULT_SUPERVISOR_SETTINGS.items():
+            if key in settings:
+                try:
+                    self.settings[key] = type(default)(settings[key])
+                except (TypeError, ValueError):
+                    pass
+
+    def _record(self, profile):
+        return self.records.setdefault(profile, {
+            "restarts": 0,           # relaunches done by the supervisor
+            "recent": deque(),       # monotonic times of the recent restarts
+            "level": 0,              # backoff exponent
+            "last_code": None,
+            "next_restart": None,    # monotonic time, None if nothing scheduled
+            "uri": None,
+            "given_up": False,
+        })
+
+    def mark_user_stop(self, profile):
+        """The next exit of the profile was asked for: don't restart it."""
+        self.user_stopped.add(profile)
+        self.cancel(profile)
+
+    def on_exit(self, profile, code, runtime, uri=None, now=None, crashed=False):
+        """
+        Record an exit. Return the restart delay in seconds, None if no restart.
+        crashed=True when a crash was seen (crash dialog) whatever the exit code.
+        """
+        now = time.monotonic() if now is None else now
+        record = self._record(profile)
+        record["last_code"] = code
+        if profile in self.user_stopped:
+            self.user_stopped.discard(profile)
+            return None
+        if (code == 0 and not crashed) or not self.settings["enabled"]:
+            return None
+
+        s = self.settings
+        if runtime >= s["stable_after"]:
+            record["level"] = 0
+        while record["recent"] and now - record["recent"][0] > s["window"]:
+            record["recent"].popleft()
+        if len(record["recent"]) >= s["max_restarts"]:
+            record["given_up"] = True
+            record["next_restart"] = None
+            return None
+
+        delay = min(s["base_delay"] * 2 ** record["level"], s["max_delay"])
+        delay *= 1 + self.rng.uniform(-s["jitter"], s["jitter"])
+        delay = max(delay, 0.0)
+        record["level"] += 1
+        record["recent"].append(now)
+        record["next_restart"] = now + delay
+        record["uri"] = uri
+        return delay
+
+    def due(self, now=None):
+        """Return the (profile, uri) whose restart time has come, and count them."""
+        now = time.monotonic() if now is None else now
+        ready = []
+        for profile, record in self.records.items():
+            if record["next_restart"] is not None and record["next_restart"] <= now:
+                record["next_restart"] = None
+                record["restarts"] += 1
+                ready.append((profile, record["uri"]))
+        return ready
+
+    def next_delay(self, now=None):
+        """Seconds until the next scheduled restart, None if there is none."""
+        now = time.monotonic() if now is None else now
+        times = [r["next_restart"] for r in self.records.values() if r["next_restart"] is not None]
+        return max(min(times) - now, 0.0) if times else None
+
+    def is_pending(self, profile):
+        record = self.records.get(profile)
+        return bool(record and record["next_restart"] is not None)
+
+    def cancel(self, profile=None):
+        """Drop the scheduled restarts (all, or only the profile's)."""
+        for key, record in self.records.items():
+            if profile is None or key == profile:
+                record["next_restart"] = None
+
+    def reset(self, profile):
+        """Manual launch: forget the crash loop and start the backoff over."""
+        record = self.records.get(profile)
+        if record is not None:
+            record["given_up"] = False
+            record["level"] = 0
+            record["recent"].clear()
+            record["next_restart"] = None
+        self.user_stopped.discard(profile)
+
+    def status(self, profile, now=None):
+        """Short status for the profile list, "" when there is nothing to say."""
+        record = self.records.get(profile)
+        if record is None:
+            return ""
+        now = time.monotonic() if now is None else now
+        if record["given_up"]:
+            return f"Crash loop, gave up after {record['restarts']} restarts"
+        if record["next_restart"] is not None:
+            return f"Restarting in {max(record['next_restart'] - now, 0):.0f} s"
+        return f"{record['restarts']} restarts" if record["restarts"] else ""
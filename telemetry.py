@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+import os
+import time
+from collections import deque
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def read_stat(pid):
+    """Return (ppid, cpu ticks, rss bytes, starttime, state) from /proc/<pid>/stat, None if gone."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces and parentheses: fields start after the last ')'
+    fields = data[data.rfind(b")") + 2:].split()
+    try:
+        return (int(fields[1]), int(fields[11]) + int(fields[12]), int(fields[21]) * PAGE_SIZE, int(fields[19]),
+                fields[0].decode())
+    except (IndexError, ValueError):
+        return None
+
+
+def read_io(pid):
+    """Return (read_bytes, write_bytes) from /proc/<pid>/io, (0, 0) if not readable."""
+    read_bytes = write_bytes = 0
+    try:
+        with open(f"/proc/{pid}/io", "rb") as f:
+            for line in f:
+                if line.startswith(b"read_bytes:"):
+                    read_bytes = int(line.split()[1])
+                elif line.startswith(b"write_bytes:"):
+                    write_bytes = int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return read_bytes, write_bytes
+
+
+class ProcessTable:
+    """
+    pid -> ppid map of the whole system, refreshed incrementally: listing /proc is
+    cheap, so only pids that appeared since the last refresh get their stat read.
+    """
+
+    def __init__(self):
+        self.parents = {}    # pid -> (ppid, starttime)
+
+    def refresh(self):
+        pids = {int(name) for name in os.listdir("/proc") if name.isdigit()}
+        for pid in list(self.parents):
+            if pid not in pids:
+                del self.parents[pid]
+        for pid in pids:
+            if pid not in self.parents:
+                stat = read_stat(pid)
+                if stat is not None:
+                    self.parents[pid] = (stat[0], stat[3])
+
+    def children_map(self):
+        children = {}
+        for pid, (ppid, _) in self.parents.items():
+            children.setdefault(ppid, []).append(pid)
+        return children
+
+    def tree(self, root, children=None):
+        """root and all its descendants (flatpak, bwrap and the sandboxed client)."""
+        children = self.children_map() if children is None else children
+        found, stack = [], [root]
+        while stack:
+            pid = stack.pop()
+            found.append(pid)
+            stack.extend(children.get(pid, ()))
+        return found
+
+
+class TelemetrySampler:
+    """
+    Per-instance CPU / RSS / IO of the whole process tree, with a fixed-size
+    history (ring buffer) and peaks. RSS is the stat rss field (same as VmRSS).
+    CPU is in percent of one core.
+    """
+
+    def __init__(self, history=300):
+        self.history_size = history
+        self.table = ProcessTable()
+        self.history = {}   # key -> deque of samples
+        self.peaks = {}     # key -> {"cpu": ..., "rss": ...}
+        self.pids = {}      # key -> pids of the tree at the last sample
+        self._last = {}     # key -> (time, {pid: (ticks, read, write)})
+
+    def sample(self, roots):
+        """Sample every {key: root pid}. Return {key: sample}."""
+        now = time.monotonic()
+        self.table.refresh()
+        children = self.table.children_map()
+        results = {}
+        for key, root in roots.items():
+            counters = {}
+            rss = 0
+            self.pids[key] = self.table.tree(root, children)
+            for pid in self.pids[key]:
+                stat = read_stat(pid)
+                if stat is None:
+                    continue
+                rss += stat[2]
+                counters[pid] = (stat[1],) + read_io(pid)
+
+            cpu = read_bps = write_bps = 0.0
+            last = self._last.get(key)
+            if last is not None:
+                elapsed = max(now - last[0], 1e-6)
+                previous = last[1]
+                d_ticks = d_read = d_write = 0
+                for pid, (ticks, rd, wr) in counters.items():
+                    p_ticks, p_rd, p_wr = previous.get(pid, (0, 0, 0))
+                    d_ticks += max(ticks - p_ticks, 0)
+                    d_read += max(rd - p_rd, 0)
+                    d_write += max(wr - p_wr, 0)
+                cpu = d_ticks / CLK_TCK / elapsed * 100
+                read_bps = d_read / elapsed
+                write_bps = d_write / elapsed
+            self._last[key] = (now, counters)
+
+            sample = {"time": time.time(), "procs": len(counters), "cpu": cpu, "rss": rss,
+                      "read_bps": read_bps, "write_bps": write_bps}
+            self.history.setdefault(key, deque(maxlen=self.history_size)).append(sample)
+            peak = self.peaks.setdefault(key, {"cpu": 0.0, "rss": 0})
+            peak["cpu"] = max(peak["cpu"], cpu)
+            peak["rss"] = max(peak["rss"], rss)
+            results[key] = sample
+        return results
+
+    def forget(self, key):
+        """Drop the counters of an instance that exited (history and peaks are kept)."""
+        self._last.pop(key, None)
+        self.pids.pop(key, None)
+
+    def clear(self, key):
+        self._last.pop(key, None)
+        self.pids.pop(key, None)
+        self.history.pop(key, None)
+        self.peaks.pop(key, None)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import select
+import signal
+
+from telemetry import read_stat
+
+DEFAULT_STOP_TIMEOUT = 10.0   # seconds between SIGTERM and SIGKILL
+
+
+def starttimes(pids):
+    """{pid: starttime} of the processes still there, to recognise them later."""
+    found = {}
+    for pid in pids:
+        stat = read_stat(pid)
+        if stat is not None:
+            found[pid] = stat[3]
+    return found
+
+
+def _same_process(pid, known):
+    """False when pid now belongs to another process than the one seen in `known` (or is gone)."""
+    if known is None or pid not in known:
+        return known is None
+    stat = read_stat(pid)
+    return stat is not None and stat[3] == known[pid]
+
+
+def signal_instance(pid, sig, pids=(), known=None):
+    """
+    Signal the process group of an instance (launch_engine starts each one in
+    its own session, so pgid == pid), then the members of its tree that left
+    the group (bwrap runs the sandbox in a new session). With `known`
+    (starttimes() taken earlier), pids reused by other processes since then
+    are left alone. Return False if nothing was left to signal.
+    """
+    alive = grouped = False
+    leader = read_stat(pid) if known is not None else None
+    # A leader that exited keeps its pid reserved while its group has members;
+    # a live process with another starttime is a reuse, its group isn't ours
+    if leader is None or _same_process(pid, known):
+        try:
+            os.killpg(pid, sig)
+            alive = grouped = True
+        except ProcessLookupError:
+            pass  # no group of that id (instance re-attached from a manual launch)
+        except PermissionError:
+            alive = True
+    for member in set(pids) | {pid}:
+        if not _same_process(member, known):
+            continue
+        try:
+            if grouped and os.getpgid(member) == pid:
+                continue  # already reached through the group
+            os.kill(member, sig)
+            alive = True
+        except OSError:
+            pass
+    return alive
+
+
+class Terminator:
+    """
+    Graceful stop of several instances at once: SIGTERM to all of them right
+    away, one shared deadline, SIGKILL to those still alive when it passes.
+    Like LaunchQueue it doesn't wait itself: the caller arms a timer for
+    next_delay() and calls escalate(); exits are reported with forget().
+    """
+
+    def __init__(self, timeout=DEFAULT_STOP_TIMEOUT):
+        self.timeout = timeout
+        self.stopping = {}    # key -> (pid, {pid: starttime} of its tree, monotonic deadline)
+
+    def stop(self, key, pid, pids=(), now=None):
+        """Send SIGTERM. Return False if the instance was already gone."""
+        now = time.monotonic() if now is None else now
+        if key in self.stopping:
+            return True
+        # Starttimes now: by the deadline some pids may have been reused by other processes
+        known = starttimes(set(pids) | {pid})
+        if not signal_instance(pid, signal.SIGTERM, known, known):
+            return False
+        self.stopping[key] = (pid, known, now + self.timeout)
+        return True
+
+    def is_stopping(self, key):
+        return key in self.stopping
+
+    def forget(self, key):
+        """The instance exited."""
+        self.stopping.pop(key, None)
+
+    def escalate(self, now=None):
+        """SIGKILL the instances past their deadline (only their processes seen at stop()). Return their keys."""
+        now = time.monotonic() if now is None else now
+        killed = []
+        for key, (pid, known, deadline) in list(self.stopping.items()):
+            if deadline <= now:
+                del self.stopping[key]
+                signal_instance(pid, signal.SIGKILL, known, known)
+                killed.append(key)
+        return killed
+
+    def next_delay(self, now=None):
+        """Seconds until the next deadline, None when nothing is stopping."""
+        now = time.monotonic() if now is None else now
+        if not self.stopping:
+            return None
+        return max(min(d for _, _, d in self.stopping.values()) - now, 0.0)
+
+
+def _reap(instance, timeout=0):
+    try:
+        return instance.wait(timeout)
+    except Exception:
+        return None
+
+
+def terminate_all(instances, timeout=DEFAULT_STOP_TIMEOUT, trees=None):
+    """
+    Blocking variant for scripts: stop every {key: Instance} within a single
+    timeout window. Exits are waited for together (pidfd + poll, else a short
+    poll loop). Return the keys that had to be killed.
+    """
+    trees = trees or {}
+    terminator = Terminator(timeout)
+    for key, instance in instances.items():
+        terminator.stop(key, instance.pid, trees.get(key, ()))
+
+    fds = {}
+    poller = select.poll()
+    for key in terminator.stopping:
+        try:
+            fd = os.pidfd_open(instances[key].pid)
+        except (AttributeError, OSError):
+            continue
+        fds[fd] = key
+        poller.register(fd, select.POLLIN)
+
+    watched = set(fds.values())
+    try:
+        while terminator.stopping:
+            delay = terminator.next_delay()
+            if delay <= 0:
+                break
+            if any(key not in watched for key in terminator.stopping):
+                delay = min(delay, 0.05)
+            for fd, _ in poller.poll(delay * 1000):
+                poller.unregister(fd)
+                terminator.forget(fds[fd])
+            # Instances without pidfd (or already reaped) are checked directly
+            for key in list(terminator.stopping):
+                if instances[key].poll() is not None:
+                    terminator.forget(key)
+        killed = terminator.escalate(float("inf"))
+    finally:
+        for fd in fds:
+            os.close(fd)
+
+    for key, instance in instances.items():
+        _reap(instance, 1.0 if key in killed else 0)
+    return killed
@@ -0,0 +1,90 @@
+"""
+Launch agents on localhost with a stub `flatpak` that just sleeps, shared by
+tests/test_agents.py and benchmarks/bench_agents.py.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import subprocess
+
+from agent import RemoteAgent
+from control import ControlClient
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUB_FLATPAK = "#!/bin/sh\nexec sleep 600\n"
+STUB_COST = {"cpu": 0.01, "memory_mb": 64}   # what a sleeping stub costs, for the placement
+
+
+def stub_flatpak_env(tmp):
+    """Environment whose PATH finds the stub flatpak first."""
+    bin_dir = os.path.join(tmp, "bin")
+    os.makedirs(bin_dir, exist_ok=True)
+    stub = os.path.join(bin_dir, "flatpak")
+    with open(stub, "w") as f:
+        f.write(STUB_FLATPAK)
+    os.chmod(stub, 0o755)
+    return dict(os.environ, PATH=bin_dir + os.pathsep + os.environ.get("PATH", ""))
+
+
+def start_agent(tmp, index, env):
+    """`soberlauncher agent` on 127.0.0.1, port 0, with its own base directory and token: (process, RemoteAgent)."""
+    base_dir = os.path.join(tmp, f"host{index}")
+    os.makedirs(base_dir)
+    settings = os.path.join(tmp, f"settings{index}.json")
+    with open(settings, "w") as f:
+        json.dump({"LaunchQueue": {"min_gap": 0, "max_starting": 100}, "StopTimeout": 2}, f)
+    token = f"secret-{index}"
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "soberlauncher"), "--settings", settings, "--base-dir", base_dir,
+         "agent", "--listen", "127.0.0.1:0", "--token", token],
+        stdout=subprocess.PIPE, text=True, env=env,
+    )
+    line = proc.stdout.readline().strip()
+    if not line.startswith("Agent listening on "):
+        proc.kill()
+        raise RuntimeError(f"agent {index} didn't start: {line!r}")
+    threading.Thread(target=proc.stdout.read, daemon=True).start()  # keep its log flowing
+    return proc, RemoteAgent(f"host{index}", line.rsplit(" ", 1)[1], token)
+
+
+def stop_agents(procs):
+    for proc in procs:
+        proc.terminate()
+        proc.wait()
+
+
+class EventListener:
+    """The launched and exited events of every agent, as (agent, profile) pairs."""
+
+    def __init__(self, agents):
+        self.events = {"launched": set(), "exited": set()}
+        self.clients = []
+        for agent in agents:
+            client = ControlClient(agent.address, 5.0, agent.token)
+            self.clients.append(client)
+            threading.Thread(target=self._listen, args=(client, agent.name), daemon=True).start()
+        time.sleep(0.2)  # subscribed before anything is launched
+
+    def _listen(self, client, name):
+        try:
+            for event in client.events():
+                if event["event"] in self.events:
+                    self.events[event["event"]].add((name, event["profile"]))
+        except (OSError, ValueError):
+            pass
+
+    def wait(self, event, expected, timeout=10):
+        """True once every (agent, profile) of expected got the event."""
+        deadline = time.monotonic() + timeout
+        while not expected <= self.events[event]:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self):
+        for client in self.clients:
+            client.close()
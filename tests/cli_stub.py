@@ -0,0 +1,20 @@
+"""
+A throwaway launcher folder for the headless CLI, shared by tests/test_cli.py
+and benchmarks/bench_cli_startup.py.
+"""
+
+import os
+import json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY = os.path.join(ROOT, "soberlauncher")
+
+
+def make_workdir(folder, profiles=50):
+    """SL_Settings.json in folder, pointing at a base directory of `profiles` "Bot i" profiles."""
+    base_dir = os.path.join(folder, "profiles")
+    for i in range(1, profiles + 1):
+        os.makedirs(os.path.join(base_dir, f"Bot {i}", ".local"))
+    with open(os.path.join(folder, "SL_Settings.json"), "w") as f:
+        json.dump({"last_directory": base_dir}, f)
+    return folder
@@ -0,0 +1,98 @@
+"""
+A local stand-in for GitHub's release API and asset downloads, shared by
+tests/test_update.py and benchmarks/bench_update.py.
+"""
+
+import os
+import json
+import hashlib
+import zipfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class ReleaseServer:
+    """
+    The release API at /api and the archive at /release.zip. Honours Range /
+    If-Range and cuts the first `drops` archive requests after `drop_after` bytes.
+    """
+
+    def __init__(self, archive, drops=0, drop_after=0, digest=True):
+        self.drops = drops            # requests cut short before the archive is served whole
+        self.drop_after = drop_after  # bytes sent by a cut request
+        self.digest_published = digest
+        self.requests = []            # (status, Range header) per archive request
+        self.bytes_sent = 0
+        self.publish(archive)
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/api":
+                    asset = {"name": "SoberLauncher.zip", "size": len(server.archive),
+                             "browser_download_url": f"{server.url}/release.zip"}
+                    if server.digest_published:
+                        asset["digest"] = f"sha256:{server.digest}"
+                    body = json.dumps({"name": "Release V9.9", "zipball_url": f"{server.url}/zipball",
+                                       "assets": [asset]}).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                start = 0
+                ranged = self.headers.get("Range")
+                if ranged and self.headers.get("If-Range", server.etag) == server.etag:
+                    start = int(ranged.split("=")[1].split("-")[0])
+                if start >= len(server.archive) and ranged:
+                    server.requests.append((416, ranged))
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{len(server.archive)}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                status = 206 if start else 200
+                server.requests.append((status, ranged))
+                self.send_response(status)
+                self.send_header("ETag", server.etag)
+                self.send_header("Content-Length", str(len(server.archive) - start))
+                if start:
+                    self.send_header("Content-Range", f"bytes {start}-{len(server.archive) - 1}/{len(server.archive)}")
+                self.end_headers()
+                body = memoryview(server.archive)[start:]
+                if server.drops > 0:
+                    server.drops -= 1
+                    body = body[:server.drop_after]
+                    self.close_connection = True
+                try:
+                    self.wfile.write(body)
+                except ConnectionError:
+                    return  # the client went away (cancelled)
+                server.bytes_sent += len(body)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def publish(self, archive):
+        """Serve another archive (a new ETag) from now on."""
+        self.archive = archive
+        self.digest = hashlib.sha256(archive).hexdigest()
+        self.etag = '"' + self.digest[:16] + '"'
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def make_archive(path, megabytes, launcher="print('new launcher')\n"):
+    """A zipball-like release (everything under one folder). Return its bytes."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+        archive.writestr("Taboulet-SoberLauncher-abc123/SoberLauncher.py", launcher)
+        archive.writestr("Taboulet-SoberLauncher-abc123/update.py", "print('new updater')\n")
+        archive.writestr("Taboulet-SoberLauncher-abc123/assets/blob.bin", os.urandom(int(megabytes * 1024 * 1024)))
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,82 @@
+"""Several agents on localhost with a stub flatpak: placement, launches, stops and their events."""
+
+import pytest
+
+from agent import poll_agents, launch_across
+from agent_stub import STUB_COST, stub_flatpak_env, start_agent, stop_agents, EventListener
+
+URI = "roblox://experience?placeId=1818"
+
+
+@pytest.fixture
+def agents(tmp_path):
+    env = stub_flatpak_env(str(tmp_path))
+    procs, agents = [], []
+    try:
+        for i in range(3):
+            proc, agent = start_agent(str(tmp_path), i, env)
+            procs.append(proc)
+            agents.append(agent)
+        yield agents
+    finally:
+        stop_agents(procs)
+
+
+@pytest.fixture
+def listener(agents):
+    listener = EventListener(agents)
+    yield listener
+    listener.close()
+
+
+def running(agents):
+    return {(name, profile) for name, h in poll_agents(agents).items()
+            for profile, status in h["status"].items() if status["running"]}
+
+
+def test_profiles_spread_launched_and_stopped(agents, listener):
+    hosts = poll_agents(agents)
+    assert all(not h["error"] for h in hosts.values())
+    profiles = [f"Bot {i}" for i in range(1, 7)]
+
+    queued, unplaced, errors = launch_across(agents, profiles, URI, STUB_COST, hosts)
+    assert not unplaced and not errors
+    placed = {(name, p) for name, group in queued.items() for p in group}
+    assert sorted(p for _, p in placed) == profiles, "a profile placed twice or not at all"
+    assert set(queued) == {agent.name for agent in agents}, "not spread over every agent"
+
+    assert listener.wait("launched", placed)
+    assert running(agents) == placed
+
+    for agent in agents:
+        agent.call("stop", all=True)
+    assert listener.wait("exited", placed)
+    assert running(agents) == set()
+
+
+def test_profile_goes_back_to_its_agent(agents, listener):
+    queued, _, _ = launch_across(agents, ["Bot 1"], URI, STUB_COST)
+    (home, _), = [(name, p) for name, group in queued.items() for p in group]
+    assert listener.wait("launched", {(home, "Bot 1")})
+    agents[[a.name for a in agents].index(home)].call("stop", all=True)
+    assert listener.wait("exited", {(home, "Bot 1")})
+
+    # Its account data lives on that agent now: it never lands elsewhere
+    for _ in range(3):
+        queued, unplaced, errors = launch_across(agents, ["Bot 1", "Bot 2", "Bot 3"], URI, STUB_COST)
+        assert not unplaced and not errors
+        assert "Bot 1" in queued[home]
+        for agent in agents:
+            agent.call("stop", all=True)
+        assert listener.wait("exited", {(name, p) for name, group in queued.items() for p in group})
+        listener.events["exited"].clear()
+
+
+def test_running_profile_not_launched_again(agents, listener):
+    queued, _, _ = launch_across(agents, ["Bot 1"], URI, STUB_COST)
+    placed = {(name, p) for name, group in queued.items() for p in group}
+    assert listener.wait("launched", placed)
+
+    queued, unplaced, errors = launch_across(agents, ["Bot 1"], URI, STUB_COST)
+    assert queued == {} and not unplaced and not errors
+    assert running(agents) == placed
@@ -0,0 +1,44 @@
+"""The headless CLI stays light: no PyQt6, and no control socket for local commands."""
+
+import sys
+import json
+import subprocess
+
+import pytest
+
+from cli_stub import ENTRY, make_workdir
+
+# Run the entry point in this interpreter, then report the modules it loaded
+RUN_AND_REPORT = (
+    "import sys, json, runpy\n"
+    "sys.argv = ['soberlauncher'] + sys.argv[1:]\n"
+    "try:\n    runpy.run_path(%r, run_name='__main__')\n"
+    "except SystemExit:\n    pass\n"
+    "print(json.dumps(sorted(sys.modules)), file=sys.stderr)" % ENTRY
+)
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    return make_workdir(str(tmp_path))
+
+
+def loaded_modules(workdir, *args):
+    result = subprocess.run([sys.executable, "-c", RUN_AND_REPORT, *args], cwd=workdir,
+                            capture_output=True, text=True, timeout=60)
+    return result.stdout, set(json.loads(result.stderr.strip().splitlines()[-1]))
+
+
+@pytest.mark.parametrize("command", [["list"], ["list", "--json"], ["create", "Bot 99"]])
+def test_local_commands_skip_qt_and_control(workdir, command):
+    output, modules = loaded_modules(workdir, *command)
+    assert "PyQt6" not in modules
+    assert "control" not in modules
+    if command[0] == "list":
+        assert "Bot 50" in output
+
+
+def test_status_never_imports_qt(workdir):
+    # status asks the running launcher first (control socket), still without Qt
+    _, modules = loaded_modules(workdir, "status")
+    assert "PyQt6" not in modules
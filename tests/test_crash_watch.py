@@ -0,0 +1,132 @@
+"""Crash windows on a real X server (Xvfb): seen, attributed to their profile and closed."""
+
+import os
+import sys
+import time
+import shutil
+import select
+import subprocess
+
+import pytest
+
+pytest.importorskip("Xlib")
+
+from crash_watch import CrashWindowWatcher  # noqa: E402
+from telemetry import ProcessTable  # noqa: E402
+from throttle import find_owner  # noqa: E402
+
+# A client like Sober's crash dialog: a top-level window titled "Crash" with _NET_WM_PID
+CRASH_WINDOW = """
+import os
+from Xlib import X, display
+d = display.Display()
+root = d.screen().root
+window = root.create_window(0, 0, 200, 100, 0, X.CopyFromParent)
+window.set_wm_name("Sober Crash")
+window.change_property(d.intern_atom("_NET_WM_PID"), d.intern_atom("CARDINAL"), 32, [os.getpid()])
+window.map()
+d.sync()
+print("mapped", flush=True)
+while True:
+    d.next_event()
+"""
+
+# An instance: the process the launcher started, whose child opens the window
+INSTANCE = """
+import sys, subprocess
+subprocess.run([sys.executable, "-c", sys.argv[1]])
+"""
+
+
+@pytest.fixture
+def xvfb():
+    if not shutil.which("Xvfb"):
+        pytest.skip("Xvfb not installed")
+    read_fd, write_fd = os.pipe()
+    server = subprocess.Popen(["Xvfb", "-displayfd", str(write_fd), "-screen", "0", "640x480x24", "-nolisten", "tcp"],
+                              pass_fds=(write_fd,), stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        number = f.readline().strip()
+    if not number:
+        server.kill()
+        pytest.skip("Xvfb didn't start")
+    display = f":{number}"
+    env = dict(os.environ, DISPLAY=display)
+    yield display, env
+    server.terminate()
+    server.wait(10)
+
+
+def start_instances(env, crashing):
+    """Two idle instances and one whose child shows a crash window. Return {profile: Popen}."""
+    idle = [sys.executable, "-c", "import time; time.sleep(60)"]
+    instances = {}
+    for profile in ("Bot 1", "Bot 2", "Bot 3"):
+        if profile == crashing:
+            instances[profile] = subprocess.Popen([sys.executable, "-c", INSTANCE, CRASH_WINDOW], env=env)
+        else:
+            instances[profile] = subprocess.Popen(idle)
+    return instances
+
+
+def wait_mapped(watcher, timeout=10):
+    """Wait for the watcher to report crash windows."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        select.select([watcher.fileno()], [], [], 0.2)
+        found = watcher.pending()
+        if found:
+            return found
+    return []
+
+
+def owners(found, instances):
+    table = ProcessTable()
+    table.refresh()
+    roots = {profile: proc.pid for profile, proc in instances.items()}
+    return [find_owner(pid, roots, table) for _, pid in found]
+
+
+def stop(instances):
+    for proc in instances.values():
+        proc.kill()
+        proc.wait()
+
+
+def test_new_crash_window_is_attributed_and_closed(xvfb):
+    display, env = xvfb
+    watcher = CrashWindowWatcher(display_name=display)
+    instances = start_instances(env, "Bot 2")
+    try:
+        found = wait_mapped(watcher)
+        assert len(found) == 1, "crash window not seen"
+        assert owners(found, instances) == ["Bot 2"]
+
+        watcher.close([window for window, _ in found])
+        # Killing the X client ends the process that owned the window, and with it the instance
+        assert instances["Bot 2"].wait(10) is not None
+        assert all(instances[p].poll() is None for p in ("Bot 1", "Bot 3"))
+        assert watcher.scan() == []
+    finally:
+        stop(instances)
+
+
+def test_existing_crash_window_is_found_by_scan(xvfb):
+    display, env = xvfb
+    instances = start_instances(env, "Bot 3")
+    try:
+        found = []
+        deadline = time.monotonic() + 10
+        watcher = CrashWindowWatcher(display_name=display)
+        while time.monotonic() < deadline:
+            found = watcher.scan()
+            if found:
+                break
+            time.sleep(0.1)
+        assert len(found) == 1, "crash window not found"
+        assert owners(found, instances) == ["Bot 3"]
+        watcher.close([window for window, _ in found])
+        assert instances["Bot 3"].wait(10) is not None
+    finally:
+        stop(instances)
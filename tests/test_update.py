@@ -0,0 +1,200 @@
+"""
+Updates put the release's files in place; a failure or a kill halfway never
+leaves the install mixed. Downloads resume after a cut or a cancel, restart
+when the archive changed (If-Range) and refuse a bad checksum.
+"""
+
+import os
+import hashlib
+
+import pytest
+
+pytest.importorskip("requests")
+
+import update  # noqa: E402
+from update import Updater, UpdateError, Release  # noqa: E402
+
+V1 = {"SoberLauncher.py": b"print('v1')\n", "update.py": b"# updater v1\n", "control.py": b"# control v1\n",
+      "old_module.py": b"OLD = 1\n", "assets/icon.svg": b"<svg>v1</svg>"}
+V2 = {"SoberLauncher.py": b"print('v2')\n", "update.py": b"# updater v2\n", "control.py": b"# control v2\n",
+      "new_module.py": b"NEW = 2\n", "assets/icon.svg": b"<svg>v2</svg>"}
+
+
+def git_sha(data):
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def snapshot(folder):
+    """{relative path: bytes} of every file under folder."""
+    files = {}
+    for root, _, names in os.walk(folder):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                files[os.path.relpath(path, folder)] = f.read()
+    return files
+
+
+def install(updater, tag, contents):
+    """Stage and put in place a release given as {path: bytes}, without any download."""
+    files = {path: (git_sha(data), len(data), False) for path, data in contents.items()}
+
+    def fetch(path, dest):
+        with open(dest, "wb") as f:
+            f.write(contents[path])
+    updater._install(Release(f"Release {tag}", None, tag=tag), files, updater.changed_files(files), fetch)
+
+
+@pytest.fixture
+def updater(tmp_path):
+    folder = tmp_path / "SoberLauncher"
+    folder.mkdir()
+    (folder / "SL_Settings.json").write_text("{}")
+    updater = Updater("http://127.0.0.1:9/api", str(folder), str(tmp_path / "cache"))
+    install(updater, "v1", V1)
+    return updater
+
+
+@pytest.fixture
+def failing_replace(monkeypatch, updater):
+    """Make the third rename into the install fail."""
+    real_replace = os.replace
+    calls = [0]
+
+    def replace(src, dst):
+        if str(dst).startswith(updater.install_dir + os.sep):
+            calls[0] += 1
+            if calls[0] == 3:
+                raise OSError(28, "No space left on device")
+        return real_replace(src, dst)
+    monkeypatch.setattr(update.os, "replace", replace)
+    return calls
+
+
+def test_update_replaces_only_release_files(updater):
+    before = snapshot(updater.install_dir)
+    install(updater, "v2", V2)
+    after = snapshot(updater.install_dir)
+    assert {path: after[path] for path in V2} == V2
+    assert "old_module.py" not in after
+    assert after["SL_Settings.json"] == before["SL_Settings.json"]
+    assert updater.rollback() == "Release v1"
+    assert snapshot(updater.install_dir) == before
+
+
+def test_failed_replace_restores_install(updater, failing_replace):
+    before = snapshot(updater.install_dir)
+    previous = snapshot(updater.previous_dir)
+    with pytest.raises(UpdateError, match="No space left"):
+        install(updater, "v2", V2)
+    assert failing_replace[0] >= 3
+    assert snapshot(updater.install_dir) == before
+    assert snapshot(updater.previous_dir) == previous
+    assert not os.path.exists(updater.undo_dir)
+    assert not os.path.exists(updater.staging_dir)
+
+
+def test_failed_rollback_restores_install(updater, failing_replace):
+    failing_replace[0] = 3  # let the update through, fail the rollback's third rename
+    install(updater, "v2", V2)
+    before = snapshot(updater.install_dir)
+    failing_replace[0] = 0
+    with pytest.raises(OSError):
+        updater.rollback()
+    assert snapshot(updater.install_dir) == before
+    assert updater.manifest(updater.install_dir)["tag"] == "v2"
+    assert updater.rollback() == "Release v1"
+
+
+def test_killed_halfway_recovered_by_next_run(updater, failing_replace, monkeypatch):
+    before = snapshot(updater.install_dir)
+    # Killed: the exception stands for the kill, nothing gets to restore the install
+    monkeypatch.setattr(updater, "recover", lambda: False)
+    with pytest.raises(UpdateError):
+        install(updater, "v2", V2)
+    mixed = snapshot(updater.install_dir)
+    assert mixed != before and os.path.isdir(updater.undo_dir)
+
+    monkeypatch.undo()
+    assert Updater("http://127.0.0.1:9/api", updater.install_dir, updater.download_dir).recover()
+    assert snapshot(updater.install_dir) == before
+
+
+# ---- downloads against a local stand-in for GitHub (tests/github_stub.py) ----
+
+@pytest.fixture
+def release_server(tmp_path):
+    from github_stub import ReleaseServer, make_archive
+    archive = make_archive(str(tmp_path / "release.zip"), 2)
+    server = ReleaseServer(archive)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def old_install(tmp_path):
+    folder = tmp_path / "install"
+    folder.mkdir()
+    (folder / "SoberLauncher.py").write_text("print('old launcher')\n")
+    return str(folder)
+
+
+def test_interrupted_download_resumes(release_server, old_install, tmp_path):
+    release_server.drops, release_server.drop_after = 3, len(release_server.archive) // 5
+    updater = Updater(f"{release_server.url}/api", old_install, str(tmp_path / "cache"), retry_delay=0.01)
+    release = updater.latest_release()
+    assert release.sha256 == release_server.digest
+
+    assert updater.update(release) == 3
+    assert [status for status, _ in release_server.requests] == [200, 206, 206, 206]
+    # At most the chunk in flight is fetched again after a cut, never the whole archive
+    assert release_server.bytes_sent - len(release_server.archive) <= 3 * update.CHUNK_SIZE
+    with open(os.path.join(old_install, "SoberLauncher.py")) as f:
+        assert f.read() == "print('new launcher')\n"
+    assert os.stat(os.path.join(old_install, "update.py")).st_mode & 0o111
+    assert not os.listdir(updater.download_dir)
+
+
+def test_cancelled_download_resumed_by_next_run(release_server, old_install, tmp_path):
+    updater = Updater(f"{release_server.url}/api", old_install, str(tmp_path / "cache"), retry_delay=0.01)
+    release = updater.latest_release()
+    half = len(release_server.archive) // 2
+    seen = []
+    with pytest.raises(update.UpdateCancelled):
+        updater.download(release, progress=lambda done, total: seen.append(done), is_cancelled=lambda: seen[-1] > half)
+
+    part = Updater(f"{release_server.url}/api", old_install, updater.download_dir).download(release)
+    (first, _), (second, ranged) = release_server.requests
+    assert (first, second) == (200, 206)
+    assert int(ranged.split("=")[1].split("-")[0]) > half
+    with open(part, "rb") as f:
+        assert f.read() == release_server.archive
+
+
+def test_changed_archive_restarts_with_if_range(release_server, old_install, tmp_path):
+    from github_stub import make_archive
+    release_server.digest_published = False  # the checksum can't tell the old partial file apart
+    updater = Updater(f"{release_server.url}/api", old_install, str(tmp_path / "cache"), retry_delay=0.01)
+    release = updater.latest_release()
+    seen = []
+    with pytest.raises(update.UpdateCancelled):
+        updater.download(release, progress=lambda done, total: seen.append(done), is_cancelled=lambda: len(seen) > 2)
+
+    release_server.publish(make_archive(str(tmp_path / "rebuilt.zip"), 2, launcher="print('rebuilt')\n"))
+    part = updater.download(release)
+    # The partial file's ETag no longer matches: the server sends the whole new archive
+    status, ranged = release_server.requests[-1]
+    assert status == 200 and ranged is not None
+    with open(part, "rb") as f:
+        assert f.read() == release_server.archive
+
+
+def test_bad_checksum_refused(release_server, old_install, tmp_path):
+    updater = Updater(f"{release_server.url}/api", old_install, str(tmp_path / "cache"), retry_delay=0.01)
+    release = updater.latest_release()
+    release.sha256 = "0" * 64
+    with pytest.raises(UpdateError, match="Checksum mismatch"):
+        updater.update(release)
+    assert not os.listdir(updater.download_dir)
+    with open(os.path.join(old_install, "SoberLauncher.py")) as f:
+        assert f.read() == "print('old launcher')\n"
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+
+import os
+import time
+import signal
+import shutil
+import subprocess
+
+from resource_limits import CPU_PERIOD_US, own_cgroup, process_cgroup
+
+DEFAULT_THROTTLE_SETTINGS = {
+    "enabled": False,
+    "mode": "cap",            # "cap" (cpu.max quota) or "freeze" (cgroup.freeze)
+    "cpu_quota": 10,          # percent of one core left to a capped instance
+    "unfocused_after": 10.0,  # seconds without focus before throttling
+    "idle_after": 0.0,        # seconds without user input before throttling the focused one too (0 = off)
+}
+
+
+def inner_pid(pid):
+    """pid of a process inside its own pid namespace (last NSpid field), None if unknown."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("NSpid:"):
+                    return int(line.split()[-1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def find_owner(pid, roots, table):
+    """
+    Key of the instance whose process tree holds `pid`. The pid is a host pid
+    (XRes) or, with _NET_WM_PID, the pid seen inside the flatpak sandbox: that
+    one only counts when a single instance matches it.
+    """
+    owners = {root: key for key, root in roots.items()}
+    seen = set()
+    current = pid
+    while current and current not in seen:
+        if current in owners:
+            return owners[current]
+        seen.add(current)
+        current = table.parents.get(current, (0, 0))[0]
+
+    children = table.children_map()
+    matches = set()
+    for key, root in roots.items():
+        for member in table.tree(root, children):
+            if member != root and inner_pid(member) == pid:
+                matches.add(key)
+    return matches.pop() if len(matches) == 1 else None
+
+
+class FocusTracker:
+    """
+    Active window -> pid, and user idle time. Uses python-xlib when installed
+    (one connection, XRes for the real client pid), else xdotool / xprintidle.
+    `available` is False when the focused window can't be known (Wayland, no tool).
+    """
+
+    def __init__(self):
+        self.display = None
+        self.res = None
+        try:
+            from Xlib import display as xdisplay, X
+            self.display = xdisplay.Display()
+            self._any_property = X.AnyPropertyType
+            self._active_atom = self.display.intern_atom("_NET_ACTIVE_WINDOW")
+            self._pid_atom = self.display.intern_atom("_NET_WM_PID")
+            try:
+                from Xlib.ext import res
+                if self.display.has_extension("X-Resource"):
+                    self.res = res
+            except ImportError:
+                pass
+        except Exception:
+            self.display = None
+        self.has_xdotool = shutil.which("xdotool") is not None
+        self.has_xprintidle = shutil.which("xprintidle") is not None
+        self.available = self.display is not None or self.has_xdotool
+
+    def _xlib_active(self):
+        root = self.display.screen().root
+        prop = root.get_full_property(self._active_atom, self._any_property)
+        window = prop.value[0] if prop and len(prop.value) else 0
+        if not window:
+            return 0, None
+        if self.res is not None:
+            try:
+                reply = self.display.res_query_client_ids(
+                    [{"client": window, "mask": self.res.LocalClientPIDMask}]
+                )
+                for client in reply.ids:
+                    if client.value:
+                        return window, client.value[0]
+            except Exception:
+                pass
+        try:
+            prop = self.display.create_resource_object("window", window).get_full_property(
+                self._pid_atom, self._any_property
+            )
+            return window, (prop.value[0] if prop and len(prop.value) else None)
+        except Exception:
+            return window, None
+
+    def active(self):
+        """(window id, pid) of the focused window, (0, None) if none, None if unknown."""
+        if self.display is not None:
+            try:
+                return self._xlib_active()
+            except Exception:
+                return None
+        if self.has_xdotool:
+            try:
+                result = subprocess.run(
+                    ["xdotool", "getactivewindow", "getwindowpid"],
+                    capture_output=True, text=True, timeout=2
+                )
+            except (OSError, subprocess.TimeoutExpired):
+                return None
+            # getactivewindow prints nothing on success, getwindowpid the pid
+            lines = result.stdout.split()
+            return (1, int(lines[-1])) if lines and lines[-1].isdigit() else (0, None)
+        return None
+
+    def user_idle(self):
+        """Seconds since the last keyboard/mouse input, None if unknown."""
+        if self.display is not None:
+            try:
+                info = self.display.screensaver_query_info(self.display.screen().root)
+                return info.idle / 1000
+            except Exception:
+                pass
+        if self.has_xprintidle:
+            try:
+                result = subprocess.run(["xprintidle"], capture_output=True, text=True, timeout=2)
+                return int(result.stdout.strip()) / 1000
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                pass
+        return None
+
+
+class ThrottlePolicy:
+    """Decide which instances to throttle from the focused one and the user idle time."""
+
+    def __init__(self, settings=None):
+        self.settings = dict(DEFAULT_THROTTLE_SETTINGS)
+        self.configure(settings or {})
+        self.last_active = {}    # key -> monotonic time it was last focused (or woken)
+
+    def configure(self, settings):
+        for key, default in DEFAULT_THROTTLE_SETTINGS.items():
+            if key in settings:
+                try:
+                    self.settings[key] = type(default)(settings[key])
+                except (TypeError, ValueError):
+                    pass
+        if self.settings["mode"] not in ("cap", "freeze"):
+            self.settings["mode"] = DEFAULT_THROTTLE_SETTINGS["mode"]
+
+    def wake(self, key, now=None):
+        """Count the instance as just used (new launch, user request)."""
+        self.last_active[key] = time.monotonic() if now is None else now
+
+    def forget(self, key):
+        self.last_active.pop(key, None)
+
+    def decide(self, keys, focused=None, focus_known=True, user_idle=None, now=None):
+        """Return the set of keys that should be throttled right now."""
+        now = time.monotonic() if now is None else now
+        s = self.settings
+        user_away = s["idle_after"] > 0 and user_idle is not None and user_idle >= s["idle_after"]
+        throttled = set()
+        for key in keys:
+            self.last_active.setdefault(key, now)
+            if user_away:
+                throttled.add(key)
+            elif not focus_known:
+                continue
+            elif key == focused:
+                self.last_active[key] = now
+            elif now - self.last_active[key] >= s["unfocused_after"]:
+                throttled.add(key)
+        return throttled
+
+
+def _cgroup_pids(path):
+    """Every pid of a cgroup and its sub-cgroups."""
+    pids = set()
+    for folder, _, _ in os.walk(path):
+        try:
+            with open(os.path.join(folder, "cgroup.procs"), "r") as f:
+                pids.update(int(line) for line in f if line.strip())
+        except (OSError, ValueError):
+            pass
+    return pids
+
+
+def exclusive_cgroups(pids):
+    """
+    Split a process tree into the cgroups holding only its processes (the scope
+    flatpak makes per instance, or a cgroup from resource_limits) and the pids
+    left in shared cgroups, which can only be signalled.
+    """
+    tree = set(pids)
+    mine = own_cgroup()
+    groups = {}
+    for pid in tree:
+        groups.setdefault(process_cgroup(pid), set()).add(pid)
+    usable, leftover = [], set()
+    for path, members in groups.items():
+        if (path and path != mine and os.path.isdir(path)
+                and os.access(os.path.join(path, "cgroup.procs"), os.W_OK)
+                and _cgroup_pids(path) <= tree):
+            usable.append(path)
+        else:
+            leftover |= members
+    return usable, leftover
+
+
+def _write(path, value):
+    with open(path, "w") as f:
+        f.write(value)
+
+
+class Throttler:
+    """
+    Apply and undo throttling on instance process trees.
+    freeze: cgroup.freeze, else SIGSTOP/SIGCONT on the pids in shared cgroups.
+    cap: a low cpu.max on the instance cgroups (the previous value is restored);
+    processes outside a usable cgroup are left running.
+    """
+
+    def __init__(self):
+        self.state = {}    # key -> {"mode", "frozen", "capped": {path: old cpu.max}, "stopped", "method"}
+
+    def is_throttled(self, key):
+        return key in self.state
+
+    def method(self, key):
+        state = self.state.get(key)
+        return state["method"] if state else ""
+
+    def throttle(self, key, pids, mode="cap", cpu_quota=10):
+        """Throttle the tree. Return a description of what could be applied."""
+        state = self.state.get(key)
+        if state is not None:
+            if state["mode"] == mode:
+                return state["method"]
+            self.restore(key)
+
+        cgroups, leftover = exclusive_cgroups(pids)
+        state = {"mode": mode, "frozen": [], "capped": {}, "stopped": [], "method": ""}
+        for path in cgroups:
+            try:
+                if mode == "freeze":
+                    _write(os.path.join(path, "cgroup.freeze"), "1")
+                    state["frozen"].append(path)
+                else:
+                    cpu_max = os.path.join(path, "cpu.max")
+                    with open(cpu_max, "r") as f:
+                        old = f.read().strip()
+                    quota = max(int(cpu_quota) * CPU_PERIOD_US // 100, 1000)
+                    _write(cpu_max, f"{quota} {CPU_PERIOD_US}")
+                    state["capped"][path] = old
+            except OSError:
+                leftover |= _cgroup_pids(path) & set(pids)
+
+        if mode == "freeze":
+            for pid in leftover:
+                try:
+                    os.kill(pid, signal.SIGSTOP)
+                    state["stopped"].append(pid)
+                except OSError:
+                    pass
+
+        parts = []
+        if state["frozen"]:
+            parts.append("cgroup frozen")
+        if state["capped"]:
+            parts.append(f"cpu.max {cpu_quota}%")
+        if state["stopped"]:
+            parts.append(f"{len(state['stopped'])} processes stopped")
+        if mode == "cap" and leftover:
+            parts.append(f"{len(leftover)} processes without cgroup left uncapped")
+        state["method"] = ", ".join(parts) or "nothing could be throttled"
+        self.state[key] = state
+        return state["method"]
+
+    def restore(self, key):
+        """Undo the throttling of an instance right away."""
+        state = self.state.pop(key, None)
+        if state is None:
+            return
+        for path in state["frozen"]:
+            try:
+                _write(os.path.join(path, "cgroup.freeze"), "0")
+            except OSError:
+                pass
+        for path, old in state["capped"].items():
+            try:
+                _write(os.path.join(path, "cpu.max"), old)
+            except OSError:
+                pass
+        for pid in state["stopped"]:
+            try:
+                os.kill(pid, signal.SIGCONT)
+            except OSError:
+                pass
+
+    def restore_all(self):
+        for key in list(self.state):
+            self.restore(key)
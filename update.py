@@ -1,104 +1,662 @@
 #!/usr/bin/env python3
+"""
+Updater: installs the latest GitHub release of SoberLauncher next to this file.
+
+Only the files that changed are fetched: their git blob hashes in the
+repository tree at the release tag are compared with the installed files,
+and the changed ones come from raw.githubusercontent.com, each checked
+against its hash. They are staged in a sibling directory, then put in
+place one by one, each with an atomic rename, so a reader never finds a file
+missing. Only the files the release owns are touched: the install directory
+itself, the settings, the state files and anything else kept there stay
+where they are.
+
+Before the first rename, the install files about to be replaced are
+hardlinked into an undo directory beside the install, with the list of the
+files the update adds. Any failure while the files are put in place restores
+the install from it before the error is reported, and an update or rollback
+killed halfway is restored by the next run of the updater (recover()), so the
+install never stays half old, half new. Once every file is in place, the
+undo directory becomes the previous version, which `update.py --rollback`
+puts back the same way. A running launcher is asked to restart after an
+update, and a rollback waits until it is closed.
+
+When the tree isn't available (API rate limit, no tag), the whole release
+archive is downloaded instead and only the files that differ are taken
+from it. The archive is streamed in chunks to a partial file in the cache directory
+(~/.cache/soberlauncher/updates) and resumed with an HTTP Range request after
+an interruption, within the run or on the next one. When the release
+publishes a SHA-256 (the digest GitHub gives the asset, or a SHA256SUMS /
+<asset>.sha256 file), the archive is checked before anything is extracted.
+Every request goes through one HTTP session, with timeouts.
+"""
 
 import os
 import sys
-import requests
-import zipfile
+import json
+import time
 import shutil
-from PyQt6.QtWidgets import QApplication, QMessageBox
+import hashlib
+import zipfile
+import argparse
+import tempfile
+from urllib.parse import quote
+
+import requests
 
 GITHUB_API_RELEASES_URL = "https://api.github.com/repos/Taboulet/SoberLauncher/releases/latest"
-CURRENT_DIRECTORY = os.getcwd()
+GITHUB_RAW_URL = "https://raw.githubusercontent.com/Taboulet/SoberLauncher"
+INSTALL_DIR = os.path.dirname(os.path.realpath(__file__))
+RELEASE_MANIFEST = ".release.json"   # in the install: the release it holds and its files
+REMOVED_LIST = ".removed.json"       # in a staged or previous version: install files it deletes
+EXIT_RESTART = 3            # files replaced while a launcher runs: it must restart to use them
+CHUNK_SIZE = 256 * 1024
+TIMEOUT = (10, 60)          # connect, read (seconds without data)
+RETRIES = 5                 # resumes of an interrupted download before giving up
+RETRY_DELAY = 1.0           # seconds, doubled after each failed attempt
+CHECKSUM_ASSETS = ("SHA256SUMS", "SHA256SUMS.txt", "checksums.txt")
+EXECUTABLES = ("SoberLauncher.py", "update.py", "soberlauncher")
+FILE_MODES = ("100644", "100755")   # regular files in a git tree (symlinks and submodules are skipped)
+
+# Interruptions worth a resume (anything else is reported as is)
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+
+class UpdateError(Exception):
+    pass
 
-def get_latest_release():
-    """Fetch the latest release information from GitHub."""
+
+class UpdateCancelled(UpdateError):
+    pass
+
+
+def cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "soberlauncher", "updates")
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_sha1(path):
+    """Git's hash of a file, the one a repository tree lists for it."""
+    digest = hashlib.sha1(b"blob %d\0" % os.path.getsize(path))
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(src, dst):
     try:
-        response = requests.get(GITHUB_API_RELEASES_URL)
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("name", "Unknown Release"), data.get("zipball_url", None)
+        os.link(src, dst, follow_symlinks=False)
+    except OSError:  # another filesystem, protected_hardlinks...
+        shutil.copy2(src, dst, follow_symlinks=False)
+
+
+def _write_json(path, data):
+    """Write a JSON file in one rename, so it is never found half written."""
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+
+def launcher_running():
+    """True when a launcher answers on the control socket (see control.py)."""
+    from control import connect
+    client = connect(timeout=1.0)
+    if client is None:
+        return False
+    client.close()
+    return True
+
+
+def parse_checksums(text, name=None):
+    """Hash of name in sha256sum output ('<hex>  <file>' lines), or the only hash listed."""
+    found = []
+    for line in text.splitlines():
+        parts = line.split()
+        if not parts or len(parts[0]) != 64:
+            continue
+        digest = parts[0].lower()
+        listed = parts[1].lstrip("*") if len(parts) > 1 else None
+        if name is not None and listed == name:
+            return digest
+        found.append(digest)
+    return found[0] if len(found) == 1 else None
+
+
+class Release:
+    def __init__(self, name, url, sha256=None, size=None, tag=None):
+        self.name = name
+        self.url = url
+        self.sha256 = sha256    # None when the release publishes no checksum
+        self.size = size
+        self.tag = tag          # where its files are looked up one by one
+
+
+class Updater:
+    """
+    Release lookup, download, verification, install and rollback, without
+    any UI: progress(done, total) and is_cancelled() are called while
+    downloading (total is None when the server doesn't say).
+    """
+
+    def __init__(self, api_url=GITHUB_API_RELEASES_URL, install_dir=INSTALL_DIR, download_dir=None,
+                 session=None, timeout=TIMEOUT, retries=RETRIES, retry_delay=RETRY_DELAY, raw_url=GITHUB_RAW_URL):
+        self.api_url = api_url
+        self.raw_url = raw_url
+        self.install_dir = os.path.realpath(install_dir)
+        parent, name = os.path.split(self.install_dir)
+        self.staging_dir = os.path.join(parent, f".{name}.staging")     # the files of the new version
+        self.undo_dir = os.path.join(parent, f".{name}.undo")           # the install files being replaced
+        self.previous_dir = os.path.join(parent, f".{name}.previous")   # the files before the last update
+        self.download_dir = download_dir or cache_dir()
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", "SoberLauncher-updater")
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+    # ---- release ----
+
+    def latest_release(self):
+        response = self.session.get(self.api_url, timeout=self.timeout,
+                                    headers={"Accept": "application/vnd.github+json"})
+        if response.status_code != 200:
+            raise UpdateError(f"Release information unavailable (HTTP {response.status_code})")
+        data = response.json()
+        name = data.get("name") or data.get("tag_name") or "Unknown Release"
+        tag = data.get("tag_name")
+        assets = data.get("assets") or []
+        archive = next((a for a in assets if a.get("name", "").endswith(".zip")), None)
+        if archive is None:
+            if not data.get("zipball_url"):
+                raise UpdateError("The latest release has no archive")
+            return Release(name, data["zipball_url"], tag=tag)
+
+        sha256 = None
+        digest = archive.get("digest") or ""
+        if digest.startswith("sha256:"):
+            sha256 = digest[len("sha256:"):].lower()
         else:
-            return "Unknown Release", None
-    except Exception as e:
-        QMessageBox.critical(None, "Error", f"Error fetching release information: {e}")
-        return "Unknown Release", None
+            sums = next((a for a in assets
+                         if a.get("name") in CHECKSUM_ASSETS or a.get("name") == archive["name"] + ".sha256"), None)
+            if sums is not None:
+                response = self.session.get(sums["browser_download_url"], timeout=self.timeout)
+                if response.status_code == 200:
+                    sha256 = parse_checksums(response.text, archive["name"])
+        return Release(name, archive["browser_download_url"], sha256, archive.get("size"), tag)
 
-def download_and_extract_zip(url):
-    """Download and extract the latest release ZIP file."""
-    try:
-        response = requests.get(url, stream=True)
-        if response.status_code == 200:
-            zip_path = os.path.join(CURRENT_DIRECTORY, "update.zip")
-            with open(zip_path, "wb") as f:
-                f.write(response.content)
-
-            # Extract the ZIP file
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall("update_temp")
-
-            # Locate the extracted folder (e.g., Taboulet-SoberLauncher-<hash>)
-            extracted_folder = next(
-                (os.path.join("update_temp", d) for d in os.listdir("update_temp") if os.path.isdir(os.path.join("update_temp", d))),
-                None
-            )
-
-            if not extracted_folder:
-                QMessageBox.critical(None, "Error", "Failed to locate the extracted update folder.")
-                return
+    def release_files(self, release):
+        """
+        The release's files from the repository tree at its tag:
+        {path: (blob sha1, size, executable)}. None when the tree can't be had.
+        """
+        if not release.tag:
+            return None
+        url = f"{self.api_url.rsplit('/releases/', 1)[0]}/git/trees/{quote(release.tag, safe='')}?recursive=1"
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers={"Accept": "application/vnd.github+json"})
+            if response.status_code != 200:
+                return None
+            data = response.json()
+        except (requests.RequestException, ValueError):
+            return None
+        if data.get("truncated"):
+            return None
+        return {entry["path"]: (entry["sha"], entry.get("size", 0), entry["mode"] == "100755")
+                for entry in data.get("tree", []) if entry.get("type") == "blob" and entry.get("mode") in FILE_MODES}
+
+    @staticmethod
+    def folder_files(folder):
+        """The same as release_files for an extracted archive."""
+        files = {}
+        for root, _, names in os.walk(folder):
+            for name in names:
+                path = os.path.join(root, name)
+                if os.path.isfile(path) and not os.path.islink(path):
+                    files[os.path.relpath(path, folder)] = (blob_sha1(path), os.path.getsize(path),
+                                                            bool(os.stat(path).st_mode & 0o100))
+        return files
+
+    def changed_files(self, files):
+        """The paths of files whose content differs from the installed one (or that aren't installed)."""
+        changed = []
+        for path, (sha, size, _) in sorted(files.items()):
+            local = os.path.join(self.install_dir, path)
+            if (os.path.islink(local) or not os.path.isfile(local)
+                    or os.path.getsize(local) != size or blob_sha1(local) != sha):
+                changed.append(path)
+        return changed
+
+    # ---- download ----
 
-            # Move extracted files to the current directory
-            files_replaced = False
-            for root, dirs, files in os.walk(extracted_folder):
-                for file in files:
-                    src_path = os.path.join(root, file)
-                    rel_path = os.path.relpath(src_path, extracted_folder)
-                    dest_path = os.path.join(CURRENT_DIRECTORY, rel_path)
-
-                    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-                    shutil.move(src_path, dest_path)
-                    files_replaced = True
-
-            # Make the updater and launcher executable
-            launcher_path = os.path.join(CURRENT_DIRECTORY, "SoberLauncher.py")
-            updater_path = os.path.join(CURRENT_DIRECTORY, "update.py")
-            if os.path.exists(launcher_path):
-                os.chmod(launcher_path, 0o755)  # Make executable
-            if os.path.exists(updater_path):
-                os.chmod(updater_path, 0o755)  # Make executable
-
-            # Cleanup
-            os.remove(zip_path)
-            shutil.rmtree("update_temp")
-
-            if files_replaced:
-                QMessageBox.information(None, "Update", "Update completed successfully.")
+    def partial_path(self, url):
+        return os.path.join(self.download_dir, hashlib.sha256(url.encode()).hexdigest()[:16] + ".zip.part")
+
+    def download(self, release, progress=None, is_cancelled=None):
+        """Download release.url (resuming a previous partial file). Return the path once verified."""
+        os.makedirs(self.download_dir, exist_ok=True)
+        part = self.partial_path(release.url)
+        meta = self._load_meta(part)
+        if meta.get("url") != release.url or meta.get("sha256") != release.sha256:
+            self.discard(part)  # another release (or its checksum changed): start over
+            meta = {"url": release.url, "sha256": release.sha256, "validator": None}
+
+        self._retry(lambda: self._fetch(release.url, part, meta, progress, is_cancelled))
+        if release.sha256:
+            actual = file_sha256(part)
+            if actual != release.sha256:
+                self.discard(part)
+                raise UpdateError(f"Checksum mismatch: expected {release.sha256}, got {actual}")
+        return part
+
+    def _retry(self, func):
+        """Run func again (with a growing delay) while it fails on an interruption."""
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except TRANSIENT_ERRORS as e:
+                attempt += 1
+                if attempt > self.retries:
+                    raise UpdateError(f"Download interrupted {attempt} times, giving up: {e}")
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+
+    def _fetch(self, url, part, meta, progress, is_cancelled):
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {}
+        if offset and meta.get("validator"):
+            # If-Range: the rest of the same file, or the whole (new) file with a 200
+            headers = {"Range": f"bytes={offset}-", "If-Range": meta["validator"]}
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416:
+                # Nothing left after offset: complete if the size matches, else start over
+                total = response.headers.get("Content-Range", "").rpartition("/")[2]
+                if total.isdigit() and int(total) == offset:
+                    return
+                self.discard(part)
+                raise requests.ConnectionError("Range not satisfiable, restarting the download")
+            if response.status_code == 206:
+                start = response.headers.get("Content-Range", "").partition(" ")[2].partition("-")[0]
+                if start != str(offset):
+                    self.discard(part)
+                    raise requests.ConnectionError("Unexpected Content-Range, restarting the download")
+                mode, done = "ab", offset
+            elif response.status_code == 200:
+                mode, done = "wb", 0
+                meta["validator"] = self._validator(response)
+                self._save_meta(part, meta)
             else:
-                QMessageBox.warning(None, "Update", "No files were replaced during the update.")
-        else:
-            QMessageBox.critical(None, "Error", "Failed to download the update.")
-    except Exception as e:
-        QMessageBox.critical(None, "Error", f"Error during update: {e}")
+                raise UpdateError(f"Download failed (HTTP {response.status_code})")
+            length = response.headers.get("Content-Length")
+            total = done + int(length) if length and length.isdigit() else None
+            if progress:
+                progress(done, total)
+            with open(part, mode) as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    done += len(chunk)
+                    if progress:
+                        progress(done, total)
+                    if is_cancelled and is_cancelled():
+                        raise UpdateCancelled("Update canceled")
+            if total is not None and done < total:
+                raise requests.ConnectionError(f"Connection closed after {done} of {total} bytes")
+
+    def fetch_file(self, release, path, entry, dest, progress=None, is_cancelled=None):
+        """Download one file of the release at its tag into dest and check it against its blob hash."""
+        sha, size, _ = entry
+        url = f"{self.raw_url}/{quote(release.tag, safe='')}/{quote(path)}"
+        with self.session.get(url, stream=True, timeout=self.timeout) as response:
+            if response.status_code != 200:
+                raise UpdateError(f"{path}: download failed (HTTP {response.status_code})")
+            digest = hashlib.sha1(b"blob %d\0" % size)
+            done = 0
+            with open(dest, "wb") as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    done += len(chunk)
+                    if progress:
+                        progress(done)
+                    if is_cancelled and is_cancelled():
+                        raise UpdateCancelled("Update canceled")
+        if done < size:
+            raise requests.ConnectionError(f"{path}: connection closed after {done} of {size} bytes")
+        if digest.hexdigest() != sha:
+            raise UpdateError(f"{path}: checksum mismatch, expected {sha}, got {digest.hexdigest()}")
+
+    @staticmethod
+    def _validator(response):
+        # A weak ETag can't be used with If-Range (RFC 9110), Last-Modified then
+        etag = response.headers.get("ETag")
+        if etag and not etag.startswith("W/"):
+            return etag
+        return response.headers.get("Last-Modified")
+
+    @staticmethod
+    def _load_meta(part):
+        try:
+            with open(part + ".json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _save_meta(part, meta):
+        with open(part + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @staticmethod
+    def discard(part):
+        for path in (part, part + ".json"):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    # ---- install ----
+
+    @staticmethod
+    def extract(zip_path, dest):
+        """Extract the archive into dest. Return the release's root folder."""
+        with zipfile.ZipFile(zip_path, "r") as archive:
+            archive.extractall(dest)
+        # zipball: everything under Taboulet-SoberLauncher-<hash>/
+        entries = os.listdir(dest)
+        if len(entries) == 1 and os.path.isdir(os.path.join(dest, entries[0])):
+            return os.path.join(dest, entries[0])
+        return dest
+
+    @staticmethod
+    def manifest(folder):
+        try:
+            with open(os.path.join(folder, RELEASE_MANIFEST), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def stage(self, release, files, changed, fetch):
+        """
+        Put the new version's files in the staging directory: the changed
+        ones, written by fetch(path, dest), the new manifest, and the list
+        of the files an earlier release had but this one dropped. Nothing
+        else of the install is copied.
+        """
+        self._remove(self.staging_dir)  # left by an interrupted update
+        dropped = set(self.manifest(self.install_dir).get("files", {})) - set(files)
+        os.makedirs(self.staging_dir)
+        for path in changed:
+            dest = os.path.join(self.staging_dir, path)
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            fetch(path, dest)
+            executable = files[path][2] or os.path.basename(path) in EXECUTABLES
+            os.chmod(dest, 0o755 if executable else 0o644)
+        with open(os.path.join(self.staging_dir, RELEASE_MANIFEST), "w", encoding="utf-8") as f:
+            json.dump({"name": release.name, "tag": release.tag,
+                       "files": {path: entry[0] for path, entry in files.items()}}, f)
+        _write_json(os.path.join(self.staging_dir, REMOVED_LIST), sorted(dropped))
+
+    @staticmethod
+    def version_files(folder):
+        """(files to put in the install, install files to delete) of a staged or previous version."""
+        files = []
+        for root, _, names in os.walk(folder):
+            files += [os.path.relpath(os.path.join(root, name), folder) for name in names]
+        try:
+            with open(os.path.join(folder, REMOVED_LIST), "r", encoding="utf-8") as f:
+                removed = json.load(f)
+        except FileNotFoundError:
+            removed = []
+        return sorted(set(files) - {REMOVED_LIST, REMOVED_LIST + ".tmp"}), removed
+
+    def go_live(self, source=None):
+        """
+        Put the files of a staged or previous version (source, the staging
+        directory by default) in the install, each with an atomic rename,
+        and delete the ones it drops. The install files they replace are
+        hardlinked into the undo directory first; any failure puts them back
+        before it is raised. On success the undo directory becomes the
+        previous version. source itself is left as it is.
+        """
+        source = source or self.staging_dir
+        self.recover()
+        files, removed = self.version_files(source)
+        os.makedirs(self.undo_dir)
+        try:
+            added = []
+            for path in files + removed:
+                live = os.path.join(self.install_dir, path)
+                if os.path.lexists(live) and not os.path.isdir(live):
+                    os.makedirs(os.path.dirname(os.path.join(self.undo_dir, path)), exist_ok=True)
+                    _link_or_copy(live, os.path.join(self.undo_dir, path))
+                else:
+                    added.append(path)
+            _write_json(os.path.join(self.undo_dir, REMOVED_LIST), added)
+
+            for path in files:
+                self._put(os.path.join(source, path), path)
+            for path in removed:
+                self._delete(path)
+        except BaseException:
+            self.recover()
+            raise
+        self._remove(self.previous_dir)
+        os.rename(self.undo_dir, self.previous_dir)
+
+    def recover(self):
+        """
+        Put back the install files saved in the undo directory by an update
+        or rollback that didn't finish (failed, or killed halfway), and
+        delete the ones it had added. Return True if there was one.
+        """
+        if not os.path.isdir(self.undo_dir):
+            return False
+        files, added = self.version_files(self.undo_dir)
+        for path in files:
+            self._put(os.path.join(self.undo_dir, path), path)
+        for path in added:
+            self._delete(path)
+        self._remove(self.undo_dir)
+        return True
+
+    def rollback(self):
+        """
+        Put the previous files back; the ones they replace become the
+        previous version, so a second rollback undoes the first. Return the
+        name of the release now installed (None if unknown).
+        """
+        self.recover()
+        if not os.path.isdir(self.previous_dir):
+            raise UpdateError("No previous version to roll back to")
+        self.go_live(self.previous_dir)
+        return self.manifest(self.install_dir).get("name")
+
+    def _put(self, src, path):
+        """Replace the install's path with a link of src in one rename; src stays."""
+        live = os.path.join(self.install_dir, path)
+        try:
+            if os.path.samestat(os.lstat(src), os.lstat(live)):
+                return  # already in place (and rename() between two links of a file does nothing)
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(live), exist_ok=True)
+        tmp = os.path.join(os.path.dirname(live), f".{os.path.basename(live)}.sl_update")
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        _link_or_copy(src, tmp)
+        try:
+            os.replace(tmp, live)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _delete(self, path):
+        live = os.path.join(self.install_dir, path)
+        try:
+            os.unlink(live)
+        except FileNotFoundError:
+            pass
+        self._prune(os.path.dirname(live))
+
+    def _prune(self, folder):
+        """Remove folder and its parents inside the install while they are empty."""
+        while folder.startswith(self.install_dir + os.sep):
+            try:
+                os.rmdir(folder)
+            except OSError:
+                return
+            folder = os.path.dirname(folder)
+
+    @staticmethod
+    def _remove(folder):
+        try:
+            shutil.rmtree(folder)
+        except FileNotFoundError:
+            pass
+
+    def update(self, release, progress=None, is_cancelled=None):
+        """
+        Fetch the files of release that changed, stage them and put them
+        in place. Return the number of files replaced (0: already up to
+        date, nothing touched).
+        """
+        self.recover()
+        files = self.release_files(release)
+        if files is not None:
+            changed = self.changed_files(files)
+            if changed:
+                total = sum(files[path][1] for path in changed)
+                done = [0]
+
+                def fetch(path, dest):
+                    def file_progress(written):
+                        if progress:
+                            progress(done[0] + written, total)
+                    self._retry(lambda: self.fetch_file(release, path, files[path], dest, file_progress, is_cancelled))
+                    done[0] += files[path][1]
+                self._install(release, files, changed, fetch)
+            return len(changed)
+
+        # No tree: the whole archive, and the files that differ from it
+        part = self.download(release, progress, is_cancelled)
+        extracted = tempfile.mkdtemp(prefix="extract-", dir=self.download_dir)
+        try:
+            try:
+                folder = self.extract(part, extracted)
+            except zipfile.BadZipFile:
+                self.discard(part)  # unverified and damaged: not resumed next time
+                raise UpdateError("The downloaded archive is damaged")
+            files = self.folder_files(folder)
+            changed = self.changed_files(files)
+            if changed:
+                self._install(release, files, changed,
+                              lambda path, dest: shutil.move(os.path.join(folder, path), dest))
+        finally:
+            shutil.rmtree(extracted, ignore_errors=True)
+        self.discard(part)
+        return len(changed)
+
+    def _install(self, release, files, changed, fetch):
+        try:
+            self.stage(release, files, changed, fetch)
+            self.go_live()
+        except (shutil.Error, OSError) as e:
+            # go_live() has already put the install back as it was
+            raise UpdateError(f"Can't install the update: {e}")
+        finally:
+            self._remove(self.staging_dir)
+
 
 def main():
-    app = QApplication([])
+    parser = argparse.ArgumentParser(description="Update Sober Launcher to its latest release.")
+    parser.add_argument("--rollback", action="store_true",
+                        help="go back to the version installed before the last update (again to undo)")
+    args = parser.parse_args()
+    if args.rollback:
+        if launcher_running():
+            print("update.py: Sober Launcher is running, close it before rolling back", file=sys.stderr)
+            sys.exit(1)
+        try:
+            name = Updater().rollback()
+        except (UpdateError, OSError) as e:
+            print(f"update.py: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Rolled back to {name or 'the previous version'}. Run it again to undo.")
+        return
 
-    latest_release_title, zip_url = get_latest_release()
-    if not zip_url:
-        QMessageBox.critical(None, "Error", "Failed to fetch the latest release.")
-        sys.exit()
+    from PyQt6.QtWidgets import QApplication, QMessageBox, QProgressDialog
+    from PyQt6.QtCore import Qt
 
+    app = QApplication(sys.argv)
+    updater = Updater()
+    try:
+        release = updater.latest_release()
+    except (UpdateError, requests.RequestException, ValueError) as e:
+        QMessageBox.critical(None, "Error", f"Error fetching release information: {e}")
+        sys.exit(1)
+
+    question = f"The latest release is: {release.name}.\nWould you like to update?"
+    if not release.sha256:
+        question += "\n\nThis release publishes no SHA-256 checksum: the download can't be verified."
     reply = QMessageBox.question(
         None,
         "Update Available",
-        f"The latest release is: {latest_release_title}.\nWould you like to update?",
+        question,
         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
     )
-    if reply == QMessageBox.StandardButton.Yes:
-        download_and_extract_zip(zip_url)
-    else:
+    if reply != QMessageBox.StandardButton.Yes:
         QMessageBox.information(None, "Update", "Update canceled.")
+        return
+
+    dialog = QProgressDialog("Downloading the update...", "Cancel", 0, 0)
+    dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
+    dialog.setMinimumDuration(0)
+    last = [0.0]
+
+    def progress(done, total):
+        now = time.monotonic()
+        if now - last[0] < 0.1 and done != total:
+            return
+        last[0] = now
+        if total:
+            dialog.setMaximum(100)
+            dialog.setValue(int(done * 100 / total))
+            dialog.setLabelText(f"Downloading the update... {done / 1024 ** 2:.1f} / {total / 1024 ** 2:.1f} MB")
+        else:
+            dialog.setLabelText(f"Downloading the update... {done / 1024 ** 2:.1f} MB")
+        app.processEvents()
+
+    try:
+        replaced = updater.update(release, progress, dialog.wasCanceled)
+    except UpdateCancelled:
+        dialog.close()
+        QMessageBox.information(None, "Update", "Update canceled, the installed version is unchanged.")
+        return
+    except (UpdateError, requests.RequestException, OSError) as e:
+        dialog.close()
+        QMessageBox.critical(None, "Error", f"Error during update: {e}")
+        sys.exit(1)
+    dialog.close()
+
+    if replaced and launcher_running():
+        # The running launcher still has the old version loaded: it offers to restart
+        QMessageBox.information(None, "Update", f"Update completed successfully ({replaced} files replaced).\n"
+                                "Sober Launcher is running: restart it to use the new version.")
+        sys.exit(EXIT_RESTART)
+    if replaced:
+        QMessageBox.information(None, "Update", f"Update completed successfully ({replaced} files replaced).\n"
+                                "Restart Sober Launcher to use it; update.py --rollback returns to the previous version.")
+    else:
+        QMessageBox.information(None, "Update", "Sober Launcher is already up to date.")
 
-    app.exec()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()